@@ -0,0 +1,165 @@
+"""
+Small caching building blocks shared by the PDF, extraction, analysis and search caches.
+LRUCache is an in-process tier bounded by entry count and size; DiskCache is a
+size-capped directory of files that survives restarts.
+"""
+import os
+import time
+import zlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """In-memory LRU keyed by string, bounded by entry count and total size."""
+
+    def __init__(self, max_items: int = 256, max_bytes: int = None, ttl: float = None, sizeof=len):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.bytes = 0
+        # key -> (value, size, expires_at or None)
+        self._entries: OrderedDict[str, tuple[object, int, float | None]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, size, expires_at = entry
+        if expires_at is not None and time.time() > expires_at:
+            self.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value, ttl: float = None):
+        """Stores a value. `ttl` overrides the cache-wide TTL for this entry."""
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self.pop(key)
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._entries[key] = (value, size, expires_at)
+        self.bytes += size
+        while len(self._entries) > self.max_items or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            _, (_, old_size, _) = self._entries.popitem(last=False)
+            self.bytes -= old_size
+
+    def pop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self.bytes -= entry[1]
+        return entry[0]
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+
+class DiskCache:
+    """
+    Size-capped on-disk store, one file per key. Least recently used files are
+    evicted once the directory grows past `max_bytes`. Calls are blocking, so
+    async callers should go through asyncio.to_thread; the index and byte count
+    are guarded by a lock, since those calls run on several worker threads.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, compress: bool = False, ttl: float = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.ttl = ttl
+        self.bytes = 0
+        self._index: OrderedDict[str, int] = OrderedDict()
+        # Reentrant: pop() and _evict() run both on their own and inside get()/set()
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _load_index(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self.bytes += size
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            if key not in self._index:
+                return None
+        path = self._path(key)
+        try:
+            if self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl:
+                self.pop(key)
+                return None
+            with open(path, "rb") as f:
+                data = f.read()
+            if self.ttl is None:
+                # mtime doubles as the LRU clock when entries don't expire
+                os.utime(path)
+        except OSError:
+            with self._lock:
+                self._forget(key)
+            return None
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+        return zlib.decompress(data) if self.compress else data
+
+    def set(self, key: str, data: bytes):
+        payload = zlib.compress(data) if self.compress else data
+        if len(payload) > self.max_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._forget(key)
+            self._index[key] = len(payload)
+            self.bytes += len(payload)
+            self._evict()
+
+    def pop(self, key: str):
+        with self._lock:
+            if key in self._index:
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+                self._forget(key)
+
+    def _forget(self, key: str):
+        size = self._index.pop(key, None)
+        if size is not None:
+            self.bytes -= size
+
+    def _evict(self):
+        with self._lock:
+            while self.bytes > self.max_bytes and self._index:
+                oldest = next(iter(self._index))
+                self.pop(oldest)
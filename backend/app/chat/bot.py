@@ -4,15 +4,14 @@ Searches the user's stored lease clauses from Sanity and answers based on actual
 """
 from google import genai
 from google.genai import types
-from app.config import settings
 import json
 
 
 class LegalChatBot:
-    def __init__(self):
-        if not settings.GEMINI_API_KEY:
+    def __init__(self, client: genai.Client | None):
+        if client is None:
             raise ValueError("Gemini API Key is missing")
-        self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        self.client = client
         self.model = "gemini-3-flash-preview"
         
         self.generic_system = """
@@ -26,10 +25,10 @@ class LegalChatBot:
         - Keep answers concise (max 3-4 sentences) suitable for voice conversation.
         """
 
-    def get_legal_answer(self, user_query: str) -> str:
+    async def get_legal_answer(self, user_query: str) -> str:
         """Generic legal Q&A without lease context."""
         try:
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model=self.model,
                 contents=user_query,
                 config=types.GenerateContentConfig(
@@ -41,7 +40,7 @@ class LegalChatBot:
             print(f"LLM Error: {e}")
             return "I'm sorry, I'm having trouble right now. Please try again."
 
-    def get_lease_answer(self, user_query: str, clauses: list, state: str = "CA") -> str:
+    async def get_lease_answer(self, user_query: str, clauses: list, state: str = "CA") -> str:
         """
         Lease-context-aware Q&A. Searches the user's actual lease clauses and answers
         based on what their specific lease says.
@@ -67,7 +66,7 @@ class LegalChatBot:
         """
         
         try:
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model=self.model,
                 contents=user_query,
                 config=types.GenerateContentConfig(
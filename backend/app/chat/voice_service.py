@@ -2,26 +2,38 @@
 Enhanced Deepgram Voice Service — uses Nova-3 for STT and Aura-2 for TTS.
 Supports pre-recorded audio, text-to-speech, and read-aloud functionality.
 """
-from deepgram import DeepgramClient
-from app.config import settings
+from typing import AsyncIterator
+from deepgram import AsyncDeepgramClient
 import tempfile
 import os
 
+AUDIO_CHUNK = 64 * 1024
+
+
+async def _audio_body(audio: bytes | memoryview) -> AsyncIterator[bytes]:
+    # httpx sends bytes or iterators of bytes; stream a memoryview in chunks rather than copy it whole
+    for start in range(0, len(audio), AUDIO_CHUNK):
+        yield bytes(audio[start:start + AUDIO_CHUNK])
+
+
+def _request_body(audio: bytes | memoryview):
+    return _audio_body(audio) if isinstance(audio, memoryview) else audio
+
 
 class DeepgramService:
-    def __init__(self):
-        if not settings.DEEPGRAM_API_KEY:
+    def __init__(self, client: AsyncDeepgramClient | None):
+        if client is None:
             raise ValueError("Deepgram API Key not set")
-        self.client = DeepgramClient(api_key=settings.DEEPGRAM_API_KEY)
+        self.client = client
 
-    def transcribe_audio(self, audio_bytes: bytes, mimetype: str = "audio/webm") -> str:
+    async def transcribe_audio(self, audio_bytes: bytes | memoryview, mimetype: str = "audio/webm") -> str:
         """
         Transcribes audio bytes to text using Deepgram Nova-3 model.
         Best for: pre-recorded voice notes, uploaded audio files.
         """
         try:
-            response = self.client.listen.v1.media.transcribe_file(
-                request=audio_bytes,
+            response = await self.client.listen.v1.media.transcribe_file(
+                request=_request_body(audio_bytes),
                 model="nova-3",
                 smart_format=True,
                 punctuate=True,
@@ -34,7 +46,7 @@ class DeepgramService:
             print(f"Deepgram STT Error: {e}")
             raise e
 
-    def transcribe_with_intelligence(self, audio_bytes: bytes, mimetype: str = "audio/webm") -> dict:
+    async def transcribe_with_intelligence(self, audio_bytes: bytes | memoryview, mimetype: str = "audio/webm") -> dict:
         """
         Transcribes audio with Deepgram Audio Intelligence features:
         - Summarization
@@ -43,8 +55,8 @@ class DeepgramService:
         Best for: maintenance requests where we need structured data.
         """
         try:
-            response = self.client.listen.v1.media.transcribe_file(
-                request=audio_bytes,
+            response = await self.client.listen.v1.media.transcribe_file(
+                request=_request_body(audio_bytes),
                 model="nova-3",
                 smart_format=True,
                 punctuate=True,
@@ -80,41 +92,53 @@ class DeepgramService:
             print(f"Deepgram Intelligence Error: {e}")
             # Fallback to basic transcription
             return {
-                "transcript": self.transcribe_audio(audio_bytes, mimetype),
+                "transcript": await self.transcribe_audio(audio_bytes, mimetype),
                 "summary": "",
                 "topics": [],
                 "intents": [],
             }
 
-    def generate_speech(self, text: str) -> bytes:
+    async def stream_speech(self, text: str) -> AsyncIterator[bytes]:
         """
-        Generates speech (TTS) from text using Deepgram Aura-2 model.
-        Returns audio bytes (mp3).
+        Streams speech (TTS) for text using Deepgram Aura-2, chunk by chunk as
+        Deepgram produces it (mp3).
         Model: aura-2-thalia-en (natural female voice, latest quality).
         """
         try:
             # Generate speech streaming iterator using Aura-2
-            generator = self.client.speak.v1.audio.generate(
+            async for chunk in self.client.speak.v1.audio.generate(
                 text=text,
                 model="aura-2-thalia-en",
                 encoding="mp3"
-            )
-            
-            # Read bytes into memory
-            audio_bytes = b"".join(chunk for chunk in generator)
-            return audio_bytes
+            ):
+                yield chunk
 
         except Exception as e:
             print(f"Deepgram TTS Error: {e}")
             raise e
 
-    def read_aloud(self, text: str, max_chars: int = 5000) -> bytes:
+    async def generate_speech(self, text: str) -> bytes:
         """
-        Read aloud any text content (analysis results, counter-letters, rights summaries).
-        Truncates long text to keep TTS reasonable.
+        Generates speech (TTS) from text using Deepgram Aura-2 model.
+        Returns audio bytes (mp3).
         """
+        return b"".join([chunk async for chunk in self.stream_speech(text)])
+
+    def _truncate_for_speech(self, text: str, max_chars: int) -> str:
         # Truncate if too long for TTS
         if len(text) > max_chars:
             text = text[:max_chars] + "... Content has been shortened for audio playback."
-        
-        return self.generate_speech(text)
+        return text
+
+    async def read_aloud(self, text: str, max_chars: int = 5000) -> bytes:
+        """
+        Read aloud any text content (analysis results, counter-letters, rights summaries).
+        Truncates long text to keep TTS reasonable.
+        """
+        return await self.generate_speech(self._truncate_for_speech(text, max_chars))
+
+    def read_aloud_stream(self, text: str, max_chars: int = 5000) -> AsyncIterator[bytes]:
+        """
+        Streaming variant of read_aloud.
+        """
+        return self.stream_speech(self._truncate_for_speech(text, max_chars))
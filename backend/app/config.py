@@ -16,12 +16,60 @@ class Settings(BaseSettings):
     FOXIT_CLIENT_SECRET: Optional[str] = None
     
     YOU_COM_API_KEY: Optional[str] = None
+    YOU_COM_BASE_URL: str = "https://chat-api.you.com/smart"
+    # Shared You.com rate limit (searches per second, with bursts of up to YOU_COM_BURST)
+    YOU_COM_RATE: float = 5.0
+    YOU_COM_BURST: int = 10
     
     # Sanity Config
     SANITY_PROJECT_ID: Optional[str] = None
     SANITY_DATASET: str = "production"
     SANITY_API_TOKEN: Optional[str] = None
 
+    # Generated PDF cache
+    PDF_CACHE_DIR: str = "/tmp/leaseguard/pdf-cache"
+    PDF_CACHE_MEMORY_BYTES: int = 32 * 1024 * 1024
+    PDF_CACHE_DISK_BYTES: int = 256 * 1024 * 1024
+
+    # Extracted lease text, keyed by the uploaded PDF's SHA-256
+    EXTRACT_CACHE_DIR: str = "/tmp/leaseguard/extract-cache"
+    EXTRACT_CACHE_MEMORY_BYTES: int = 16 * 1024 * 1024
+    EXTRACT_CACHE_DISK_BYTES: int = 128 * 1024 * 1024
+
+    # Local PDF text extraction: worker processes (0 = one per CPU, max 4) and per-page limit in seconds
+    PDF_EXTRACT_WORKERS: int = 0
+    PDF_EXTRACT_PAGE_TIMEOUT: float = 5.0
+    # Head start local extraction gets before Foxit is asked too (scanned or slow PDFs)
+    PDF_EXTRACT_HEDGE_DELAY: float = 1.0
+
+    # Lease analysis: leases longer than this are analyzed in parallel chunks
+    ANALYSIS_CHUNK_CHARS: int = 24000
+    ANALYSIS_CONCURRENCY: int = 4
+    # Finished analyses, keyed by lease text, state, model and prompt version
+    ANALYSIS_CACHE_DIR: str = "/tmp/leaseguard/analysis-cache"
+    ANALYSIS_CACHE_MEMORY_ITEMS: int = 256
+    ANALYSIS_CACHE_DISK_BYTES: int = 64 * 1024 * 1024
+    ANALYSIS_CACHE_TTL: float = 7 * 24 * 3600
+
+    # You.com search results (per-kind TTLs in app/search_cache.py); no directory = memory only
+    SEARCH_CACHE_MEMORY_ITEMS: int = 1024
+    SEARCH_CACHE_DIR: str = "/tmp/leaseguard/search-cache"
+    SEARCH_CACHE_DISK_BYTES: int = 32 * 1024 * 1024
+
+    # Batch verification of an analysis' flagged clauses: overall and per-query deadlines in seconds, and fan-out
+    VERIFY_BATCH_DEADLINE: float = 20.0
+    VERIFY_QUERY_TIMEOUT: float = 10.0
+    VERIFY_BATCH_CONCURRENCY: int = 8
+
+    # Uploads: bytes kept in memory before spooling to a temp file, and per-type size limits
+    UPLOAD_SPOOL_BYTES: int = 1024 * 1024
+    UPLOAD_MAX_PDF_BYTES: int = 25 * 1024 * 1024
+    UPLOAD_MAX_AUDIO_BYTES: int = 25 * 1024 * 1024
+    UPLOAD_MAX_VIDEO_BYTES: int = 200 * 1024 * 1024
+
+    # PDF rendering backend: "auto" (fastest available), "foxit" or "local"
+    PDF_RENDERER: str = "auto"
+
     class Config:
         env_file = ".env"
 
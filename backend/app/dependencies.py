@@ -0,0 +1,189 @@
+"""
+App-scoped upstream clients.
+Created once in the FastAPI lifespan hook and handed to routes as dependencies,
+so every request reuses the same keep-alive connection pools and Foxit token.
+"""
+import asyncio
+import httpx
+from fastapi import Depends, Request
+from google import genai
+from google.genai import types
+from deepgram import AsyncDeepgramClient
+from app.config import settings
+from app.documents.foxit_auth import FoxitAuth
+from app.documents.foxit_tasks import FoxitTaskTracker
+from app.documents.foxit_extract import FoxitClient
+from app.documents.local_extract import LocalPdfExtractor
+from app.documents.extract_cache import ExtractionCache
+from app.documents.foxit_docgen import FoxitDocGenClient
+from app.documents.pdf_cache import PdfCache
+from app.documents.templating import TemplateRegistry
+from app.sanity_client.client import SanityClient
+from app.law_engine.youcom_legal import YouComLegalSearch
+from app.law_engine.state_laws import StateLawRegistry
+from app.law_engine.batch_verify import BatchVerifier
+from app.rate_limit import TokenBucket
+from app.search_cache import SearchCache
+from app.rent_radar.comparables import RentRadar
+from app.lease_analysis.analyzer import LeaseAnalyzer, PROMPT_VERSION
+from app.lease_analysis.result_cache import AnalysisCache
+from app.lease_analysis.red_flags import RedFlagRegistry
+from app.chat.bot import LegalChatBot
+from app.chat.voice_service import DeepgramService
+from app.voice_qa.maintenance import MaintenanceDocumenter
+from app.deposit_defender.defect_detector import DefectDetector
+from app.deposit_defender.report_builder import ReportBuilder
+
+
+class Upstreams:
+    def __init__(self):
+        self.http = httpx.AsyncClient(
+            timeout=httpx.Timeout(60, connect=10),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=120),
+        )
+        self.gemini = None
+        if settings.GEMINI_API_KEY:
+            self.gemini = genai.Client(
+                api_key=settings.GEMINI_API_KEY,
+                http_options=types.HttpOptions(httpx_async_client=self.http),
+            )
+        self.deepgram = None
+        if settings.DEEPGRAM_API_KEY:
+            self.deepgram = AsyncDeepgramClient(api_key=settings.DEEPGRAM_API_KEY, httpx_client=self.http)
+
+        self.foxit_auth = FoxitAuth(self.http)
+        self.foxit_tasks = FoxitTaskTracker(self.http, self.foxit_auth)
+        self.local_extractor = LocalPdfExtractor(settings.PDF_EXTRACT_WORKERS, settings.PDF_EXTRACT_PAGE_TIMEOUT)
+        self.extract_cache = ExtractionCache(
+            settings.EXTRACT_CACHE_DIR,
+            memory_bytes=settings.EXTRACT_CACHE_MEMORY_BYTES,
+            disk_bytes=settings.EXTRACT_CACHE_DISK_BYTES,
+        )
+        self.foxit = FoxitClient(self.http, self.foxit_auth, self.foxit_tasks, self.local_extractor, self.extract_cache)
+        self.pdf_cache = PdfCache(
+            settings.PDF_CACHE_DIR,
+            memory_bytes=settings.PDF_CACHE_MEMORY_BYTES,
+            disk_bytes=settings.PDF_CACHE_DISK_BYTES,
+        )
+        self.sanity = SanityClient(self.http)
+        self.templates = TemplateRegistry(self.sanity)
+        self.red_flags = RedFlagRegistry(self.sanity)
+        self.docgen = FoxitDocGenClient(self.http, self.foxit_auth, self.foxit_tasks, self.pdf_cache, self.templates)
+        self.search_cache = SearchCache(
+            settings.SEARCH_CACHE_MEMORY_ITEMS,
+            settings.SEARCH_CACHE_DIR or None,
+            disk_bytes=settings.SEARCH_CACHE_DISK_BYTES,
+        )
+        self.state_laws = StateLawRegistry(self.sanity)
+        # One You.com quota, shared by legal research and rent radar
+        self.you_com_limiter = TokenBucket(settings.YOU_COM_RATE, settings.YOU_COM_BURST, name="you_com.rate_limit")
+        self.legal_search = YouComLegalSearch(self.http, self.search_cache, self.state_laws, self.you_com_limiter)
+        self.batch_verifier = BatchVerifier(
+            self.legal_search,
+            deadline=settings.VERIFY_BATCH_DEADLINE,
+            concurrency=settings.VERIFY_BATCH_CONCURRENCY,
+            query_timeout=settings.VERIFY_QUERY_TIMEOUT,
+        )
+        self.analysis_cache = AnalysisCache(
+            settings.ANALYSIS_CACHE_DIR,
+            PROMPT_VERSION,
+            memory_items=settings.ANALYSIS_CACHE_MEMORY_ITEMS,
+            disk_bytes=settings.ANALYSIS_CACHE_DISK_BYTES,
+            ttl=settings.ANALYSIS_CACHE_TTL,
+        )
+        self.rent_radar = RentRadar(self.http, self.gemini, self.search_cache, self.you_com_limiter)
+
+    async def start(self):
+        """Pre-opens connections to each upstream and starts the Foxit token and state law refreshers."""
+        origins = []
+        if self.gemini:
+            origins.append("https://generativelanguage.googleapis.com")
+        if self.deepgram:
+            origins.append("https://api.deepgram.com")
+        if settings.YOU_COM_API_KEY:
+            origins.append(settings.YOU_COM_BASE_URL)
+        if settings.FOXIT_CLIENT_ID:
+            origins.append(settings.FOXIT_API_BASE_URL)
+        if settings.SANITY_PROJECT_ID:
+            origins.append(f"https://{settings.SANITY_PROJECT_ID}.api.sanity.io")
+        await asyncio.gather(*(self._warm(origin) for origin in origins))
+        if settings.FOXIT_CLIENT_ID:
+            self.foxit_auth.start()
+        self.state_laws.start()
+
+    async def _warm(self, origin: str):
+        # Any response (even 404) leaves a TLS connection in the keep-alive pool
+        try:
+            await self.http.head(origin, timeout=5)
+        except Exception as e:
+            print(f"Connection warm-up failed for {origin}: {e}")
+
+    async def aclose(self):
+        await self.state_laws.aclose()
+        await self.foxit_tasks.aclose()
+        await self.foxit_auth.aclose()
+        self.local_extractor.shutdown()
+        await self.http.aclose()
+
+
+def get_upstreams(request: Request) -> Upstreams:
+    return request.app.state.upstreams
+
+
+def get_foxit(upstreams: Upstreams = Depends(get_upstreams)) -> FoxitClient:
+    return upstreams.foxit
+
+
+def get_docgen(upstreams: Upstreams = Depends(get_upstreams)) -> FoxitDocGenClient:
+    return upstreams.docgen
+
+
+def get_sanity(upstreams: Upstreams = Depends(get_upstreams)) -> SanityClient:
+    return upstreams.sanity
+
+
+def get_red_flags(upstreams: Upstreams = Depends(get_upstreams)) -> RedFlagRegistry:
+    return upstreams.red_flags
+
+
+def get_legal_search(upstreams: Upstreams = Depends(get_upstreams)) -> YouComLegalSearch:
+    return upstreams.legal_search
+
+
+def get_batch_verifier(upstreams: Upstreams = Depends(get_upstreams)) -> BatchVerifier:
+    return upstreams.batch_verifier
+
+
+def get_rent_radar(upstreams: Upstreams = Depends(get_upstreams)) -> RentRadar:
+    return upstreams.rent_radar
+
+
+def get_gemini(upstreams: Upstreams = Depends(get_upstreams)) -> genai.Client | None:
+    return upstreams.gemini
+
+
+# The service wrappers below hold no connections of their own, so they are cheap
+# to build per request; they still raise ValueError when their API key is missing.
+
+def get_lease_analyzer(upstreams: Upstreams = Depends(get_upstreams)) -> LeaseAnalyzer:
+    return LeaseAnalyzer(upstreams.gemini, upstreams.analysis_cache)
+
+
+def get_chat_bot(upstreams: Upstreams = Depends(get_upstreams)) -> LegalChatBot:
+    return LegalChatBot(upstreams.gemini)
+
+
+def get_maintenance_documenter(upstreams: Upstreams = Depends(get_upstreams)) -> MaintenanceDocumenter:
+    return MaintenanceDocumenter(upstreams.gemini)
+
+
+def get_defect_detector(upstreams: Upstreams = Depends(get_upstreams)) -> DefectDetector:
+    return DefectDetector(upstreams.gemini)
+
+
+def get_deepgram(upstreams: Upstreams = Depends(get_upstreams)) -> DeepgramService:
+    return DeepgramService(upstreams.deepgram)
+
+
+def get_report_builder(upstreams: Upstreams = Depends(get_upstreams)) -> ReportBuilder:
+    return ReportBuilder(upstreams.sanity)
@@ -1,19 +1,18 @@
 from google import genai
 from google.genai import types
-from app.config import settings
 import json
 import PIL.Image
 import io
 import traceback
 
 class DefectDetector:
-    def __init__(self):
-        if not settings.GEMINI_API_KEY:
+    def __init__(self, client: genai.Client | None):
+        if client is None:
              raise ValueError("Gemini API Key is missing")
-        self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        self.client = client
         self.model = "gemini-3.1-pro-preview"
 
-    def analyze_frame(self, frame_bytes: bytes, timestamp: float) -> dict | None:
+    async def analyze_frame(self, frame_bytes: bytes, timestamp: float) -> dict | None:
         """
         Sends a frame to Gemini 3 Flash Preview to detect defects.
         Returns defect dict if found, else None.
@@ -37,7 +36,7 @@ class DefectDetector:
             # Convert bytes to PIL Image (Gemini requirement)
             image = PIL.Image.open(io.BytesIO(frame_bytes))
             
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model=self.model,
                 contents=[prompt, image],
                 config=types.GenerateContentConfig(
@@ -64,7 +63,7 @@ class DefectDetector:
             traceback.print_exc()
             return None
 
-    def analyze_frames(self, frames: list[tuple[float, bytes]]) -> list[dict]:
+    async def analyze_frames(self, frames: list[tuple[float, bytes]]) -> list[dict]:
         """
         Analyze a list of frames and aggregate defects.
         """
@@ -82,7 +81,7 @@ class DefectDetector:
             frames_to_process = frames[::step][:PROCESS_LIMIT]
 
         for timestamp, frame_bytes in frames_to_process:
-            defect = self.analyze_frame(frame_bytes, timestamp)
+            defect = await self.analyze_frame(frame_bytes, timestamp)
             if defect:
                 # Add the image bytes to the result so we can upload it later/display it
                 defect["image_bytes"] = frame_bytes 
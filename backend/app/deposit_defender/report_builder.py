@@ -1,15 +1,16 @@
-import requests
+import asyncio
 import base64
 import uuid
 from datetime import datetime
 from app.sanity_client.client import SanityClient
+from app.deposit_defender.thumbnails import make_thumbnail
 from app.config import settings
 
 class ReportBuilder:
-    def __init__(self):
-        self.sanity = SanityClient()
+    def __init__(self, sanity: SanityClient):
+        self.sanity = sanity
 
-    def upload_image_asset(self, image_bytes: bytes) -> str:
+    async def upload_image_asset(self, image_bytes: bytes) -> str:
         """
         Uploads an image to Sanity asset pipeline and returns the asset ID.
         """
@@ -19,28 +20,51 @@ class ReportBuilder:
             "Content-Type": "image/jpeg"
         }
         
-        response = requests.post(url, headers=headers, data=image_bytes)
+        response = await self.sanity.http.post(url, headers=headers, content=image_bytes)
         response.raise_for_status()
         return response.json()["document"]["_id"]
 
-    def create_report(self, defects: list[dict], video_url: str = None) -> str:
+    async def upload_defect_images(self, image_bytes: bytes) -> tuple[dict | None, dict | None]:
+        """
+        Uploads a defect screenshot together with a thumbnail for the PDF report.
+        Returns (screenshot, thumbnail) image references; either may be None.
+        """
+        try:
+            thumbnail_bytes = await asyncio.to_thread(make_thumbnail, image_bytes)
+        except Exception as e:
+            print(f"Thumbnail generation failed: {e}")
+            thumbnail_bytes = None
+
+        uploads = [self.upload_image_asset(image_bytes)]
+        if thumbnail_bytes is not None:
+            uploads.append(self.upload_image_asset(thumbnail_bytes))
+        results = await asyncio.gather(*uploads, return_exceptions=True)
+
+        refs = []
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Failed to upload asset: {result}")
+                refs.append(None)
+            else:
+                refs.append({"_type": "image", "asset": {"_ref": result}})
+        refs += [None] * (2 - len(refs))
+        return refs[0], refs[1]
+
+    async def create_report(self, defects: list[dict], video_url: str = None) -> str:
         """
         Creates a Condition Report in Sanity.
         """
-        # Upload screenshots for each defect
+        # Upload screenshots (and their thumbnails) for all defects concurrently
+        async def no_images():
+            return None, None
+
+        images = await asyncio.gather(*(
+            self.upload_defect_images(d.pop("image_bytes")) if "image_bytes" in d else no_images()
+            for d in defects
+        ))
+
         processed_defects = []
-        for d in defects:
-            asset_ref = None
-            if "image_bytes" in d:
-                try:
-                    asset_id = self.upload_image_asset(d.pop("image_bytes"))
-                    asset_ref = {
-                        "_type": "image",
-                        "asset": {"_ref": asset_id}
-                    }
-                except Exception as e:
-                    print(f"Failed to upload asset: {e}")
-            
+        for d, (screenshot_ref, thumbnail_ref) in zip(defects, images):
             processed_defects.append({
                 "_type": "defect", # Actually mapped to object in schema array
                 "_key": str(d.get("timestamp")), # Unique key
@@ -50,7 +74,8 @@ class ReportBuilder:
                 "severity": d.get("severity"),
                 "timestamp": d.get("timestamp"),
                 "confidence": d.get("confidence"),
-                "screenshot": asset_ref # Store as image type
+                "screenshot": screenshot_ref, # Store as image type
+                "thumbnail": thumbnail_ref # Small copy embedded in the PDF report
             })
 
         report_id = str(uuid.uuid4())
@@ -71,6 +96,6 @@ class ReportBuilder:
         }
         url = f"https://{self.sanity.project_id}.api.sanity.io/v2024-02-18/data/mutate/{self.sanity.dataset}"
         
-        response = requests.post(url, headers=headers, json=mutations)
+        response = await self.sanity.http.post(url, headers=headers, json=mutations)
         response.raise_for_status()
         return report_id
@@ -0,0 +1,31 @@
+"""
+Thumbnails for defect screenshots embedded in condition reports.
+Full video frames are far larger than the ~300px slot they fill in the PDF, so
+reports embed a resized, recompressed copy instead of the original.
+"""
+import io
+import urllib.parse
+from PIL import Image
+
+THUMBNAIL_MAX_PX = 480
+THUMBNAIL_QUALITY = 70
+
+
+def make_thumbnail(image_bytes: bytes, max_px: int = THUMBNAIL_MAX_PX, quality: int = THUMBNAIL_QUALITY) -> bytes:
+    """
+    Returns a baseline JPEG no larger than max_px on either side.
+    CPU-bound; async callers should run it via asyncio.to_thread.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image.thumbnail((max_px, max_px))
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, format="JPEG", quality=quality, optimize=True)
+        return out.getvalue()
+
+
+def sanity_rendition_url(asset_url: str, max_px: int = THUMBNAIL_MAX_PX, quality: int = THUMBNAIL_QUALITY) -> str:
+    """Asks the Sanity image CDN for a resized JPEG rendition of an asset."""
+    params = urllib.parse.urlencode({"w": max_px, "h": max_px, "fit": "max", "fm": "jpg", "q": quality})
+    return f"{asset_url}{'&' if '?' in asset_url else '?'}{params}"
@@ -0,0 +1,56 @@
+"""
+Content-addressed cache for PDF text extraction.
+Keyed by the SHA-256 of the uploaded PDF bytes, so re-uploading the same lease
+(retries, shared property-manager templates, trying another state) never goes
+through Foxit again. Each entry records which extractor produced the text.
+"""
+import asyncio
+import hashlib
+import json
+from app.cache import LRUCache, DiskCache
+from app.metrics import metrics
+
+
+class ExtractionCache:
+    def __init__(self, directory: str, memory_bytes: int, disk_bytes: int):
+        # Memory tier holds (text, extractor); the disk tier stores it as compressed JSON
+        self.memory = LRUCache(max_items=256, max_bytes=memory_bytes, sizeof=lambda entry: len(entry[0]))
+        self.disk = DiskCache(directory, max_bytes=disk_bytes, compress=True)
+        metrics.gauge("extract_cache.hit_rate", self.hit_rate)
+        metrics.gauge("extract_cache.memory_bytes", lambda: self.memory.bytes)
+        metrics.gauge("extract_cache.disk_bytes", lambda: self.disk.bytes)
+
+    @staticmethod
+    def key(pdf_bytes: bytes) -> str:
+        return hashlib.sha256(pdf_bytes).hexdigest()
+
+    def hit_rate(self) -> float:
+        hits = metrics.counters["extract_cache.hits"]
+        total = hits + metrics.counters["extract_cache.misses"]
+        return round(hits / total, 4) if total else 0.0
+
+    async def get(self, key: str) -> tuple[str, str] | None:
+        """Returns (text, extractor) or None."""
+        entry = self.memory.get(key)
+        if entry is None:
+            data = await asyncio.to_thread(self.disk.get, key)
+            if data is not None:
+                try:
+                    stored = json.loads(data)
+                    entry = (stored["text"], stored["extractor"])
+                    self.memory.set(key, entry)
+                except (ValueError, KeyError) as e:
+                    print(f"Extraction cache entry {key} unreadable: {e}")
+        if entry is None:
+            metrics.incr("extract_cache.misses")
+            return None
+        metrics.incr("extract_cache.hits")
+        return entry
+
+    async def put(self, key: str, text: str, extractor: str):
+        self.memory.set(key, (text, extractor))
+        data = json.dumps({"text": text, "extractor": extractor}).encode("utf-8")
+        try:
+            await asyncio.to_thread(self.disk.set, key, data)
+        except OSError as e:
+            print(f"Extraction cache disk write failed: {e}")
@@ -0,0 +1,112 @@
+"""
+Shared Foxit OAuth token for the extraction and document generation clients.
+Fetched once at startup, refreshed in the background before it expires, and
+remembers which token endpoint worked so refreshes are a single round-trip.
+"""
+import asyncio
+import time
+import httpx
+from app.config import settings
+
+
+class FoxitAuth:
+    # Refresh this many seconds before the token expires
+    REFRESH_MARGIN = 60
+    # Used when the token response has no expires_in
+    DEFAULT_TTL = 3600
+    # Retry delay when every endpoint failed
+    RETRY_INTERVAL = 30
+
+    def __init__(self, http: httpx.AsyncClient):
+        self.http = http
+        self.base_url = settings.FOXIT_API_BASE_URL
+        self.client_id = settings.FOXIT_CLIENT_ID
+        self.client_secret = settings.FOXIT_CLIENT_SECRET
+        self.endpoints = [
+            f"{self.base_url}/api/v1/oauth2/token",
+            "https://na1.foxitesign.foxit.com/api/oauth2/access_token", # Common OAuth
+            f"{self.base_url}/oauth/token"
+        ]
+        self.endpoint = None
+        self.token = None
+        self.expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresher = None
+
+    async def get_token(self) -> str:
+        """Returns a valid token, fetching one if we don't have it yet."""
+        if self.token is None or time.monotonic() >= self.expires_at:
+            async with self._lock:
+                if self.token is None or time.monotonic() >= self.expires_at:
+                    await self.refresh()
+        return self.token
+
+    async def headers(self) -> dict:
+        """Auth headers expected by every PDF Services call."""
+        return {
+            "Authorization": f"Bearer {await self.get_token()}",
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+        }
+
+    async def refresh(self):
+        """
+        Exchanges client credentials for a token, trying the endpoint that
+        worked last time before the others.
+        """
+        payload = {
+            "grant_type": "client_credentials",
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "scope": "pdf-services"
+        }
+        endpoints = self.endpoints
+        if self.endpoint:
+            endpoints = [self.endpoint] + [url for url in self.endpoints if url != self.endpoint]
+
+        for url in endpoints:
+            try:
+                response = await self.http.post(url, data=payload)
+                if response.is_success:
+                    data = response.json()
+                    if url != self.endpoint:
+                        print(f"Foxit Auth Success at {url}")
+                    self.endpoint = url
+                    self.token = data.get("access_token")
+                    ttl = float(data.get("expires_in") or self.DEFAULT_TTL)
+                    self.expires_at = time.monotonic() + ttl
+                    return
+            except Exception as e:
+                print(f"Auth attempt failed at {url}: {e}")
+
+        print("Foxit Auth Failed on all endpoints.")
+        # Keep the old behaviour of a placeholder token, but retry soon
+        self.token = self.token or "mock_token"
+        self.expires_at = time.monotonic() + self.RETRY_INTERVAL
+
+    def start(self):
+        """Starts the background refresh loop."""
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                async with self._lock:
+                    await self.refresh()
+                delay = max(self.expires_at - time.monotonic() - self.REFRESH_MARGIN, self.RETRY_INTERVAL)
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Foxit token refresh error: {e}")
+                await asyncio.sleep(self.RETRY_INTERVAL)
+
+    async def aclose(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
@@ -1,92 +1,69 @@
-import requests
-import time
+import asyncio
+import httpx
 import os
+import time
 from app.config import settings
+from app.documents.foxit_auth import FoxitAuth
+from app.documents.foxit_tasks import FoxitTaskTracker
+from app.documents.local_extract import LocalPdfExtractor, looks_complete
+from app.documents.extract_cache import ExtractionCache
+from app.metrics import metrics
 
 import base64
 
 class FoxitClient:
-    def __init__(self):
+    # Foxit extraction time assumed until one has been timed
+    FOXIT_EXPECTED_LATENCY = 8.0
+    EWMA_ALPHA = 0.3
+
+    def __init__(self, http: httpx.AsyncClient, auth: FoxitAuth, tasks: FoxitTaskTracker, local: LocalPdfExtractor,
+                 cache: ExtractionCache = None):
+        self.http = http
+        self.auth = auth
+        self.tasks = tasks
+        self.local = local
+        self.cache = cache
         self.base_url = settings.FOXIT_API_BASE_URL
-        self.client_id = settings.FOXIT_CLIENT_ID
-        self.client_secret = settings.FOXIT_CLIENT_SECRET
-        self.token = self._get_access_token()
-        
-        self.headers = {
-            "Authorization": f"Bearer {self.token}",
-            "client_id": self.client_id,
-            "client_secret": self.client_secret,
-            # "Content-Type": "application/json" # Do not set specific content type globally if uploading files
-        }
+        self.foxit_latency = None
+        metrics.gauge("extract.foxit_latency_ms", lambda: round(self.foxit_estimate() * 1000, 1))
 
-    def _get_access_token(self) -> str:
-        # Try different token endpoints 
-        endpoints = [
-            f"{self.base_url}/api/v1/oauth2/token",
-            "https://na1.foxitesign.foxit.com/api/oauth2/access_token", # Common OAuth
-            f"{self.base_url}/oauth/token"
-        ]
-        
-        payload = {
-            "grant_type": "client_credentials",
-            "client_id": self.client_id,
-            "client_secret": self.client_secret,
-            "scope": "pdf-services"
-        }
-        
-        for url in endpoints:
-            try:
-                # Try sending as data (form-urlencoded) first, then json
-                response = requests.post(url, data=payload)
-                if response.ok:
-                    print(f"Foxit Auth Success at {url}")
-                    return response.json().get("access_token")
-            except Exception as e:
-                print(f"Auth attempt failed at {url}: {e}")
-                
-        print("Foxit Auth Failed on all endpoints.")
-        return "mock_token"
-
-    def upload_pdf(self, file_content: bytes, filename: str) -> str:
+    async def upload_pdf(self, file_content: bytes | memoryview, filename: str) -> str:
         """
         Uploads a PDF file and returns the document ID.
         """
         # Corrected URL path based on documentation
-        url = f"{self.base_url}/pdf-services/api/documents/upload" 
-        
-        # Copy headers but remove Content-Type if present so requests can set boundary
-        headers = self.headers.copy()
-        if "Content-Type" in headers:
-            del headers["Content-Type"]
-        
-        files = {'file': (filename, file_content, 'application/pdf')}
-        
+        url = f"{self.base_url}/pdf-services/api/documents/upload"
+
+        # httpx only sends bytes (or file objects) as multipart content
+        files = {'file': (filename, bytes(file_content), 'application/pdf')}
+
         try:
-            response = requests.post(url, headers=headers, files=files)
+            # No JSON Content-Type here so httpx can set the multipart boundary
+            response = await self.http.post(url, headers=await self.auth.headers(), files=files)
             response.raise_for_status()
             return response.json().get("documentId")
         except Exception as e:
-            if hasattr(e, 'response') and e.response is not None:
+            if isinstance(e, httpx.HTTPStatusError):
                 print(f"Foxit Upload Error Body: {e.response.text}")
             print(f"Foxit Upload Error: {e}")
             # Mock for development if API fails
             return "mock_doc_id"
 
-    def start_extraction(self, document_id: str) -> str:
+    async def start_extraction(self, document_id: str) -> str:
         """
         Starts the text extraction process and returns a task ID.
         """
         # Confirmed endpoint from documentation
         url = f"{self.base_url}/pdf-services/api/documents/convert/pdf-to-text"
-        
+
         payload = {
             "documentId": document_id
         }
-        
+
         try:
             print(f"Starting extraction at: {url}")
-            response = requests.post(url, headers=self.headers, json=payload)
-            if response.ok:
+            response = await self.http.post(url, headers=await self.auth.headers(), json=payload)
+            if response.is_success:
                 print(f"Extraction started successfully.")
                 return response.json().get("taskId")
             else:
@@ -96,87 +73,143 @@ class FoxitClient:
             print(f"Start Extraction Error: {e}")
             return "mock_task_id" # Return mock to trigger fallback in extract_text
 
-    def poll_status(self, task_id: str, max_retries=60, interval=2) -> str:
+    async def poll_status(self, task_id: str, timeout: float = 120) -> str:
         """
-        Polls the extraction task status and returns the extracted text when complete.
+        Waits for the extraction task via the shared tracker and returns the extracted text.
         """
-        # Confirmed endpoint from documentation
-        url = f"{self.base_url}/pdf-services/api/tasks/{task_id}"
-        
-        for _ in range(max_retries):
-            try:
-                response = requests.get(url, headers=self.headers)
-            
-                if not response.ok:
-                     print(f"Polling Status Failed: {response.status_code} - {response.text}")
-                     time.sleep(interval)
-                     continue
-
-                data = response.json()
-                status = data.get("status")
-                print(f"Polling Task {task_id}: {status}") 
-                print(f"Extraction Completed Data: {data}")
-                
-                if status == "COMPLETED" or status == "SUCCEEDED": # Handle potential variations
-                    if "downloadUrl" in data:
-                        print(f"Downloading result from: {data['downloadUrl']}")
-                        text_resp = requests.get(data["downloadUrl"])
-                        return text_resp.text
-                    elif "resultDocumentId" in data:
-                        # Construct download URL for result document
-                        result_doc_id = data["resultDocumentId"]
-                        download_url = f"{self.base_url}/pdf-services/api/documents/{result_doc_id}/download"
-                        print(f"Downloading result from document ID: {result_doc_id}")
-                        # Provide headers (auth) for this request
-                        text_resp = requests.get(download_url, headers=self.headers)
-                        return text_resp.text 
-                    
-                    # Sometimes result might be directly in 'text' or check other fields
-                    return data.get("text", "") # Fallback if direct text
-                elif status == "FAILED":
-                    raise Exception(f"PDF Extraction failed: {data}")
-                
-                time.sleep(interval)
-            except Exception as e:
-                print(f"Polling Status Error: {e}")
-                # Do NOT mock. We need to know if it fails.
-                time.sleep(interval)
-                continue
-            
-        raise Exception("PDF Extraction timed out")
-
-    def extract_text_local(self, file_content: bytes) -> str:
+        data = await self.tasks.wait(task_id, timeout)
+
+        if "downloadUrl" in data:
+            text_resp = await self.http.get(data["downloadUrl"])
+            return text_resp.text
+        elif "resultDocumentId" in data:
+            # Construct download URL for result document
+            result_doc_id = data["resultDocumentId"]
+            download_url = f"{self.base_url}/pdf-services/api/documents/{result_doc_id}/download"
+            # Provide headers (auth) for this request
+            text_resp = await self.http.get(download_url, headers=await self.auth.headers())
+            return text_resp.text
+
+        # Sometimes result might be directly in 'text' or check other fields
+        return data.get("text", "") # Fallback if direct text
+
+    async def extract_text(self, file_content: bytes | memoryview, filename: str, content_hash: str = None) -> str:
         """
-        Fallback extraction using local pypdf library.
+        Convenience method to handle the full extraction flow.
+        Results are cached by the PDF's content hash, so a re-upload skips extraction.
+        `content_hash` is the SHA-256 of file_content when the caller already has it.
         """
-        try:
-            import io
-            from pypdf import PdfReader
-            
-            print("Falling back to local pypdf extraction...")
-            reader = PdfReader(io.BytesIO(file_content))
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text
-        except Exception as e:
-            print(f"Local Extraction Failed: {e}")
-            return ""
+        key = None
+        if self.cache:
+            key = content_hash or self.cache.key(file_content)
+            cached = await self.cache.get(key)
+            if cached:
+                text, extractor = cached
+                print(f"Extraction cache hit ({extractor}, {len(text)} chars)")
+                return text
+
+        text, extractor = await self._extract_uncached(file_content, filename)
+        # Empty text means every extractor failed, and a low-quality local fallback
+        # means Foxit did; either way let the next upload try again
+        if self.cache and text and extractor != "local_fallback":
+            await self.cache.put(key, text, extractor)
+        return text
+
+    def foxit_estimate(self) -> float:
+        return self.foxit_latency if self.foxit_latency is not None else self.FOXIT_EXPECTED_LATENCY
+
+    async def extract_text_foxit(self, file_content: bytes, filename: str) -> str:
+        """Upload -> pdf-to-text -> download through Foxit. Raises if any step fails."""
+        start = time.perf_counter()
+        doc_id = await self.upload_pdf(file_content, filename)
+        if not doc_id or doc_id == "mock_doc_id":
+            raise Exception("Foxit upload failed")
+        task_id = await self.start_extraction(doc_id)
+        if not task_id or task_id == "mock_task_id":
+            raise Exception("Foxit extraction did not start")
+        text = await self.poll_status(task_id)
+        elapsed = time.perf_counter() - start
+        if self.foxit_latency is None:
+            self.foxit_latency = elapsed
+        else:
+            self.foxit_latency = self.EWMA_ALPHA * elapsed + (1 - self.EWMA_ALPHA) * self.foxit_latency
+        return text
 
-    def extract_text(self, file_content: bytes, filename: str) -> str:
+    async def _extract_uncached(self, file_content: bytes, filename: str) -> tuple[str, str]:
         """
-        Convenience method to handle the full extraction flow.
+        Hedged extraction. Local pypdf starts right away and wins if its text
+        passes the quality check; Foxit is only started if local hasn't produced
+        a good result within PDF_EXTRACT_HEDGE_DELAY, after which the first good
+        result from either wins. A losing Foxit request is cancelled; a losing
+        local extraction is only abandoned, since its pypdf job can't be stopped
+        and runs to completion, holding a process pool worker until it finishes.
+        Returns (text, name of the extractor that produced it).
         """
+        start = time.perf_counter()
+        local = asyncio.create_task(self.local.extract(file_content))
+        foxit = None
+        fallback = ""
         try:
-            doc_id = self.upload_pdf(file_content, filename)
-            if doc_id and doc_id != "mock_doc_id":
-                task_id = self.start_extraction(doc_id)
-                if task_id and task_id != "mock_task_id":
-                    return self.poll_status(task_id)
-            
-            # If API flow failed or mocked, fall back
-            raise Exception("Foxit API flow incomplete")
-            
+            done, _ = await asyncio.wait({local}, timeout=settings.PDF_EXTRACT_HEDGE_DELAY)
+            pending = {local} - done
+            if local in done:
+                fallback, ok = self._check_local(local)
+                if ok:
+                    return self._won("local", fallback, start, foxit_started=False)
+
+            foxit = asyncio.create_task(self.extract_text_foxit(file_content, filename))
+            pending.add(foxit)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if local in done:
+                    fallback, ok = self._check_local(local)
+                    if ok:
+                        return self._won("local", fallback, start, foxit_started=True)
+                if foxit in done:
+                    try:
+                        text = foxit.result()
+                    except Exception as e:
+                        metrics.incr("extract.foxit_failures")
+                        print(f"Foxit Cloud Extraction failed: {e}")
+                        continue
+                    if text:
+                        return self._won("foxit", text, start, foxit_started=True)
+        finally:
+            # Cancelling local stops the wait, not the pool job behind it
+            for task in (local, foxit):
+                if task is not None and not task.done():
+                    task.cancel()
+
+        # Neither produced a good result; a poor local text still beats nothing,
+        # but it is not a win and is not cached
+        if not fallback:
+            return "", "none"
+        print("Using low-quality local extraction, Foxit produced nothing")
+        metrics.incr("extract.local_fallbacks")
+        return fallback, "local_fallback"
+
+    def _check_local(self, task: asyncio.Task) -> tuple[str, bool]:
+        try:
+            extracted = task.result()
         except Exception as e:
-            print(f"Foxit Cloud Extraction failed: {e}")
-            return self.extract_text_local(file_content)
+            metrics.incr("extract.local_failures")
+            print(f"Local Extraction Failed: {e}")
+            return "", False
+        ok, reason = looks_complete(extracted)
+        if not ok:
+            metrics.incr("extract.local_rejected")
+            print(f"Local extraction rejected ({reason}), waiting for Foxit")
+        return extracted.text, ok
+
+    def _won(self, extractor: str, text: str, start: float, foxit_started: bool) -> tuple[str, str]:
+        elapsed = time.perf_counter() - start
+        metrics.incr(f"extract.wins.{extractor}")
+        metrics.incr(f"extract.{extractor}_ms", elapsed * 1000)
+        if extractor == "local":
+            # Time the Foxit round trip would have taken, by its observed average
+            saved = max(self.foxit_estimate() - elapsed, 0)
+            metrics.incr("extract.latency_saved_ms", saved * 1000)
+            if not foxit_started:
+                metrics.incr("extract.foxit_calls_avoided")
+        print(f"Extraction won by {extractor} in {elapsed * 1000:.0f}ms")
+        return text, extractor
@@ -0,0 +1,128 @@
+"""
+Shared tracker for in-flight Foxit PDF Services tasks.
+A single background loop checks the status of every pending task, polling
+quickly at first and backing off for long-running ones, and resolves a
+per-task future when the task finishes.
+"""
+import asyncio
+import time
+import httpx
+from app.config import settings
+from app.documents.foxit_auth import FoxitAuth
+
+
+class FoxitTaskFailed(Exception):
+    pass
+
+
+class _TrackedTask:
+    def __init__(self, task_id: str, future: asyncio.Future, deadline: float, first_poll: float):
+        self.task_id = task_id
+        self.future = future
+        self.deadline = deadline
+        self.next_poll = first_poll
+        self.interval = FoxitTaskTracker.INITIAL_INTERVAL
+
+
+class FoxitTaskTracker:
+    # Most HTML conversions finish in well under a second, so check early
+    INITIAL_INTERVAL = 0.1
+    BACKOFF = 1.5
+    MAX_INTERVAL = 1.0
+    # Tasks due within this window are checked in the same batch
+    BATCH_WINDOW = 0.05
+
+    def __init__(self, http: httpx.AsyncClient, auth: FoxitAuth):
+        self.http = http
+        self.auth = auth
+        self.base_url = settings.FOXIT_API_BASE_URL
+        self.tasks: dict[str, _TrackedTask] = {}
+        self._wakeup = asyncio.Event()
+        self._loop_task = None
+
+    def track(self, task_id: str, timeout: float = 120) -> asyncio.Future:
+        """
+        Registers a task and returns a future resolved with the final task
+        payload once Foxit reports it COMPLETED/SUCCEEDED.
+        """
+        tracked = self.tasks.get(task_id)
+        if tracked is None:
+            now = time.monotonic()
+            future = asyncio.get_running_loop().create_future()
+            tracked = _TrackedTask(task_id, future, now + timeout, now + self.INITIAL_INTERVAL)
+            self.tasks[task_id] = tracked
+            self._wakeup.set()
+            if self._loop_task is None or self._loop_task.done():
+                self._loop_task = asyncio.create_task(self._run())
+        return tracked.future
+
+    async def wait(self, task_id: str, timeout: float = 120) -> dict:
+        """Tracks a task and waits for its final payload."""
+        return await self.track(task_id, timeout)
+
+    async def _run(self):
+        while self.tasks:
+            # Drop tasks whose waiter went away (cancelled request)
+            for task_id in [t.task_id for t in self.tasks.values() if t.future.done()]:
+                del self.tasks[task_id]
+            if not self.tasks:
+                break
+
+            now = time.monotonic()
+            due = [t for t in self.tasks.values() if t.next_poll <= now + self.BATCH_WINDOW]
+            if due:
+                headers = await self.auth.headers()
+                await asyncio.gather(*(self._check(t, headers) for t in due))
+                continue
+
+            self._wakeup.clear()
+            next_poll = min(t.next_poll for t in self.tasks.values())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(next_poll - now, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _check(self, tracked: _TrackedTask, headers: dict):
+        url = f"{self.base_url}/pdf-services/api/tasks/{tracked.task_id}"
+        try:
+            response = await self.http.get(url, headers=headers)
+            if response.is_success:
+                data = response.json()
+                status = data.get("status")
+                if status == "COMPLETED" or status == "SUCCEEDED":
+                    self._finish(tracked, result=data)
+                    return
+                if status == "FAILED":
+                    self._finish(tracked, error=FoxitTaskFailed(f"Foxit task {tracked.task_id} failed: {data}"))
+                    return
+            else:
+                print(f"Polling Status Failed: {response.status_code} - {response.text}")
+        except Exception as e:
+            print(f"Polling Status Error ({tracked.task_id}): {e}")
+
+        now = time.monotonic()
+        if now >= tracked.deadline:
+            self._finish(tracked, error=TimeoutError(f"Foxit task {tracked.task_id} timed out"))
+            return
+        tracked.next_poll = min(now + tracked.interval, tracked.deadline)
+        tracked.interval = min(tracked.interval * self.BACKOFF, self.MAX_INTERVAL)
+
+    def _finish(self, tracked: _TrackedTask, result: dict = None, error: Exception = None):
+        self.tasks.pop(tracked.task_id, None)
+        if tracked.future.done():
+            return
+        if error is not None:
+            tracked.future.set_exception(error)
+        else:
+            tracked.future.set_result(result)
+
+    async def aclose(self):
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+        for tracked in list(self.tasks.values()):
+            tracked.future.cancel()
+        self.tasks.clear()
@@ -0,0 +1,157 @@
+"""
+Local PDF text extraction, parallel by page.
+Pages are spread across a process pool (each worker parses the PDF once and takes
+every n-th page), each page gets a time limit, and the page texts are joined
+once at the end with the offset where each page starts.
+"""
+import asyncio
+import bisect
+import io
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+# A text-layer PDF yields at least this much per page; scans yield little or nothing
+MIN_CHARS_PER_PAGE = 200
+# Broken font encodings come out as control characters and replacement glyphs
+MIN_PRINTABLE_RATIO = 0.9
+MAX_FAILED_PAGE_RATIO = 0.1
+
+
+class PageTimeout(Exception):
+    pass
+
+
+class ExtractedText:
+    def __init__(self, text: str, page_offsets: list[int], failed_pages: list[int] = None):
+        self.text = text
+        # page_offsets[i] is where page i starts in text
+        self.page_offsets = page_offsets
+        # Pages that errored or hit the per-page timeout (extracted as "")
+        self.failed_pages = failed_pages or []
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_offsets)
+
+    def page_of(self, offset: int) -> int:
+        """Returns the 0-based page containing a character offset of text."""
+        return max(bisect.bisect_right(self.page_offsets, offset) - 1, 0)
+
+
+def looks_complete(extracted: ExtractedText) -> tuple[bool, str]:
+    """
+    Quality check for a local extraction: whether the PDF has a usable text layer.
+    Returns (ok, reason) so callers can log why a result was rejected.
+    """
+    if not extracted.page_count:
+        return False, "no pages"
+    if len(extracted.failed_pages) > extracted.page_count * MAX_FAILED_PAGE_RATIO:
+        return False, f"{len(extracted.failed_pages)}/{extracted.page_count} pages failed"
+    content = len(extracted.text) - extracted.page_count
+    if content < extracted.page_count * MIN_CHARS_PER_PAGE:
+        return False, f"{content // extracted.page_count} chars/page"
+    printable = sum(1 for c in extracted.text if c.isprintable() or c in "\n\t")
+    if printable < len(extracted.text) * MIN_PRINTABLE_RATIO:
+        return False, f"{printable / len(extracted.text):.0%} printable"
+    return True, ""
+
+
+def _on_timeout(signum, frame):
+    raise PageTimeout()
+
+
+def _extract_page(page, timeout: float) -> str | None:
+    # SIGALRM only works on a process's main thread, which is where pool workers run tasks
+    use_timer = bool(timeout) and hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    if use_timer:
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return page.extract_text() or ""
+    except Exception:
+        return None
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def extract_page_stride(pdf_bytes: bytes, start: int, step: int, page_timeout: float) -> tuple[int, list]:
+    """
+    Worker entry point: extracts pages start, start + step, ... of the PDF.
+    Returns (page count, [(page index, text or None on failure)]).
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    pages = reader.pages
+    results = []
+    for index in range(start, len(pages), step):
+        try:
+            text = _extract_page(pages[index], page_timeout)
+        except PageTimeout:
+            # The alarm went off just as the page finished
+            text = None
+        results.append((index, text))
+    return len(pages), results
+
+
+def join_pages(page_count: int, parts: list[list]) -> ExtractedText:
+    texts: list[str | None] = [None] * page_count
+    for results in parts:
+        for index, text in results:
+            texts[index] = text
+
+    offsets, chunks, failed, position = [], [], [], 0
+    for index, text in enumerate(texts):
+        if text is None:
+            failed.append(index)
+            text = ""
+        offsets.append(position)
+        chunks.append(text)
+        chunks.append("\n")
+        position += len(text) + 1
+    return ExtractedText("".join(chunks), offsets, failed)
+
+
+class LocalPdfExtractor:
+    def __init__(self, workers: int = 0, page_timeout: float = 5.0):
+        self.workers = workers or min(os.cpu_count() or 1, 4)
+        self.page_timeout = page_timeout
+        self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Never fork the server process itself: it has live threads and sockets
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+        return self._pool
+
+    async def extract(self, pdf_bytes: bytes | memoryview) -> ExtractedText:
+        loop = asyncio.get_running_loop()
+        if isinstance(pdf_bytes, memoryview):
+            # Sending to the workers pickles the argument, which needs bytes
+            pdf_bytes = pdf_bytes.tobytes()
+        try:
+            pool = self._get_pool()
+            parts = await asyncio.gather(*(
+                loop.run_in_executor(pool, extract_page_stride, pdf_bytes, start, self.workers, self.page_timeout)
+                for start in range(self.workers)
+            ))
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM-killed); start a fresh pool next time and finish this one on a thread
+            print(f"PDF extraction pool broke, extracting in-process: {e}")
+            self._pool = None
+            parts = [await loop.run_in_executor(None, extract_page_stride, pdf_bytes, 0, 1, 0)]
+
+        page_count = parts[0][0]
+        return join_pages(page_count, [results for _, results in parts])
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,560 @@
+"""
+In-process HTML/CSS to PDF rendering for LeaseGuard's letter templates.
+Pure Python: html.parser for the markup, a tiny CSS subset (tag/class rules and
+inline styles for color, font-size, font-weight, font-style, text-align,
+text-transform, borders and page breaks), the standard Helvetica fonts, JPEG
+images given as data URIs, and a minimal PDF writer. Good enough for text
+letters and thumbnail reports, not a general browser engine.
+"""
+import base64
+import re
+import zlib
+from html.parser import HTMLParser
+
+PAGE_WIDTH = 612  # US Letter, points
+PAGE_HEIGHT = 792
+MARGIN = 64
+BASE_FONT_SIZE = 11
+LINE_HEIGHT = 1.35
+IMAGE_MAX_WIDTH = 240
+
+# Helvetica / Helvetica-Bold advance widths for ASCII 32..126 (1/1000 em).
+# The oblique variants share their upright widths.
+_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_HELVETICA_BOLD = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+# A few WinAnsi characters outside ASCII that show up in our templates
+_EXTRA_WIDTHS = {0x95: 350, 0x96: 556, 0x97: 1000, 0x91: 222, 0x92: 222, 0x93: 333, 0x94: 333, 0xA0: 278}
+
+FONTS = {
+    (False, False): ("F1", "Helvetica", _HELVETICA),
+    (True, False): ("F2", "Helvetica-Bold", _HELVETICA_BOLD),
+    (False, True): ("F3", "Helvetica-Oblique", _HELVETICA),
+    (True, True): ("F4", "Helvetica-BoldOblique", _HELVETICA_BOLD),
+}
+
+BLOCK_TAGS = {
+    "html", "body", "div", "p", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote",
+    "ul", "ol", "li", "section", "article", "header", "footer", "table", "tr", "hr",
+}
+SKIP_TAGS = {"head", "style", "script", "title"}
+
+# Default presentation per tag: block spacing in points, font tweaks
+TAG_STYLES = {
+    "h1": {"font_size": 20, "bold": True, "margin_top": 10, "margin_bottom": 10},
+    "h2": {"font_size": 15, "bold": True, "margin_top": 12, "margin_bottom": 6},
+    "h3": {"font_size": 12.5, "bold": True, "margin_top": 10, "margin_bottom": 4},
+    "h4": {"bold": True, "margin_top": 8, "margin_bottom": 4},
+    "p": {"margin_bottom": 8},
+    "div": {"margin_bottom": 2},
+    "blockquote": {"italic": True, "indent": 24, "margin_top": 4, "margin_bottom": 8},
+    "li": {"indent": 16, "bullet": True, "margin_bottom": 3},
+    "b": {"bold": True},
+    "strong": {"bold": True},
+    "i": {"italic": True},
+    "em": {"italic": True},
+    "small": {"font_scale": 0.85},
+}
+
+INHERITED = ("font_size", "bold", "italic", "color", "uppercase", "align", "line_height")
+
+
+def _encode(text: str) -> bytes:
+    # Standard fonts use WinAnsiEncoding; anything outside it (emoji) is dropped
+    return text.encode("cp1252", errors="ignore")
+
+
+def text_width(text: str, bold: bool, italic: bool, size: float) -> float:
+    widths = FONTS[(bold, italic)][2]
+    total = 0
+    for byte in _encode(text):
+        if 32 <= byte <= 126:
+            total += widths[byte - 32]
+        else:
+            total += _EXTRA_WIDTHS.get(byte, 556)
+    return total * size / 1000
+
+
+def _parse_color(value: str):
+    value = value.strip().lower()
+    named = {"red": (0.86, 0.15, 0.15), "orange": (0.96, 0.55, 0.04), "green": (0.13, 0.6, 0.3),
+             "black": (0, 0, 0), "white": (1, 1, 1), "gray": (0.5, 0.5, 0.5), "grey": (0.5, 0.5, 0.5)}
+    if value in named:
+        return named[value]
+    match = re.fullmatch(r"#([0-9a-f]{3}|[0-9a-f]{6})", value)
+    if not match:
+        return None
+    hex_value = match.group(1)
+    if len(hex_value) == 3:
+        hex_value = "".join(c * 2 for c in hex_value)
+    return tuple(int(hex_value[i:i + 2], 16) / 255 for i in (0, 2, 4))
+
+
+def _parse_length(value: str, font_size: float):
+    match = re.match(r"([\d.]+)\s*(px|pt|em|rem)?", value.strip())
+    if not match:
+        return None
+    number = float(match.group(1))
+    unit = match.group(2) or "px"
+    if unit == "px":
+        return number * 0.75
+    if unit in ("em", "rem"):
+        return number * font_size
+    return number
+
+
+def parse_declarations(css: str, font_size: float = BASE_FONT_SIZE) -> dict:
+    """Maps the CSS properties we understand onto layout style keys."""
+    style = {}
+    for declaration in css.split(";"):
+        if ":" not in declaration:
+            continue
+        prop, value = (part.strip().lower() for part in declaration.split(":", 1))
+        value = value.replace("!important", "").strip()
+        if prop == "color":
+            color = _parse_color(value)
+            if color is not None:
+                style["color"] = color
+        elif prop == "font-size":
+            size = _parse_length(value, font_size)
+            if size:
+                style["font_size"] = size
+        elif prop == "font-weight":
+            style["bold"] = value in ("bold", "bolder") or (value.isdigit() and int(value) >= 600)
+        elif prop == "font-style":
+            style["italic"] = value in ("italic", "oblique")
+        elif prop == "text-align" and value in ("left", "center", "right"):
+            style["align"] = value
+        elif prop == "text-transform":
+            style["uppercase"] = value == "uppercase"
+        elif prop == "line-height":
+            try:
+                style["line_height"] = float(value)
+            except ValueError:
+                pass
+        elif prop in ("border-bottom", "border-top") and value not in ("none", "0"):
+            style[prop.replace("-", "_")] = _parse_color(value.split()[-1]) or (0.8, 0.8, 0.8)
+        elif prop in ("page-break-before", "break-before") and value in ("always", "page"):
+            style["page_break_before"] = True
+    return style
+
+
+def parse_stylesheet(css: str) -> dict:
+    """Parses `selector { ... }` rules, keeping simple tag, .class and tag.class selectors."""
+    rules = {}
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    for selectors, body in re.findall(r"([^{}]+)\{([^}]*)\}", css):
+        declarations = parse_declarations(body)
+        for selector in selectors.split(","):
+            selector = selector.strip().lower()
+            if re.fullmatch(r"[a-z0-9]*(\.[a-z0-9_-]+)?", selector) and selector:
+                rules.setdefault(selector, {}).update(declarations)
+    return rules
+
+
+def jpeg_info(data: bytes):
+    """Returns (width, height, components) from a JPEG's SOF marker, or None."""
+    if data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            i += 2
+            continue
+        if marker in (0xC0, 0xC1, 0xC2):
+            height = int.from_bytes(data[i + 5:i + 7], "big")
+            width = int.from_bytes(data[i + 7:i + 9], "big")
+            return width, height, data[i + 9]
+        i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+    return None
+
+
+def decode_data_uri_jpeg(src: str):
+    """Decodes a data:image/jpeg;base64 URI into (bytes, info), or None if unsupported."""
+    prefix, _, payload = (src or "").partition(",")
+    if prefix.strip().lower() not in ("data:image/jpeg;base64", "data:image/jpg;base64"):
+        return None
+    try:
+        data = base64.b64decode(payload)
+    except ValueError:
+        return None
+    info = jpeg_info(data)
+    # Gray and RGB map onto PDF color spaces directly; CMYK JPEGs are left out
+    if info is None or info[2] not in (1, 3):
+        return None
+    return data, info
+
+
+class _Image:
+    def __init__(self, name: str, data: bytes, width: int, height: int, components: int):
+        self.name = name
+        self.data = data
+        self.width = width
+        self.height = height
+        self.components = components
+
+
+class _Block:
+    def __init__(self, style: dict, runs: list, bullet: bool = False, image: _Image = None):
+        self.style = style
+        self.runs = runs
+        self.bullet = bullet
+        self.image = image
+
+
+class _LayoutParser(HTMLParser):
+    """Flattens the DOM into styled blocks of text runs."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rules = {}
+        self.blocks: list[_Block] = []
+        self.stack = [{"tag": "root", "font_size": BASE_FONT_SIZE, "bold": False, "italic": False,
+                       "color": (0, 0, 0), "indent": 0, "align": "left", "uppercase": False,
+                       "line_height": LINE_HEIGHT}]
+        self.runs = []
+        self.skip_depth = 0
+        self.in_style = False
+        self.css = []
+        self.pending_margin = 0
+        self.pending_page_break = False
+        self.images: list[_Image] = []
+
+    # -- style resolution -------------------------------------------------
+    def _computed(self, tag: str, attrs: dict) -> dict:
+        parent = self.stack[-1]
+        style = {key: parent[key] for key in INHERITED}
+        style["indent"] = parent["indent"]
+        style["tag"] = tag
+        defaults = dict(TAG_STYLES.get(tag, {}))
+        if "font_scale" in defaults:
+            style["font_size"] = parent["font_size"] * defaults.pop("font_scale")
+        if "indent" in defaults:
+            style["indent"] += defaults.pop("indent")
+        style.update(defaults)
+
+        classes = (attrs.get("class") or "").lower().split()
+        for selector in [tag] + [f".{c}" for c in classes] + [f"{tag}.{c}" for c in classes]:
+            style.update(self.rules.get(selector, {}))
+        if attrs.get("style"):
+            style.update(parse_declarations(attrs["style"], parent["font_size"]))
+        return style
+
+    # -- parser callbacks --------------------------------------------------
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in SKIP_TAGS:
+            if tag == "style":
+                self.in_style = True
+            self.skip_depth += 1
+            return
+        if self.skip_depth:
+            return
+        if tag == "br":
+            self.runs.append(("\n", self.stack[-1]))
+            return
+        if tag == "img":
+            self._image(attrs)
+            return
+        style = self._computed(tag, attrs)
+        if tag == "hr":
+            self._flush(self.stack[-1])
+            self.blocks.append(_Block({**style, "border_bottom": (0.8, 0.8, 0.8),
+                                       "margin_top": max(self.pending_margin, 6)}, []))
+            self.pending_margin = 6
+            return
+        if tag in BLOCK_TAGS:
+            self._flush(self.stack[-1])
+            self.pending_margin = max(self.pending_margin, style.get("margin_top", 0))
+            if style.get("page_break_before"):
+                self.pending_page_break = True
+        self.stack.append(style)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in ("br", "img", "hr") and tag not in SKIP_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            if tag == "style":
+                self.in_style = False
+                self.rules = parse_stylesheet("".join(self.css))
+            self.skip_depth = max(self.skip_depth - 1, 0)
+            return
+        if self.skip_depth or tag in ("br", "img", "hr"):
+            return
+        # Pop back to the matching tag, tolerating unclosed children
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth]["tag"] == tag:
+                break
+        else:
+            return
+        while len(self.stack) > depth:
+            style = self.stack.pop()
+            if style["tag"] in BLOCK_TAGS:
+                self._flush(style)
+                self.pending_margin = max(self.pending_margin, style.get("margin_bottom", 0))
+
+    def handle_data(self, data):
+        if self.in_style:
+            self.css.append(data)
+            return
+        if self.skip_depth:
+            return
+        self.runs.append((data, self.stack[-1]))
+
+    def close(self):
+        super().close()
+        self._flush(self.stack[-1])
+
+    def _image(self, attrs: dict):
+        decoded = decode_data_uri_jpeg(attrs.get("src"))
+        if decoded is None:
+            return
+        data, (width, height, components) = decoded
+        image = _Image(f"Im{len(self.images) + 1}", data, width, height, components)
+        self.images.append(image)
+        # Images are laid out as their own block
+        self._flush(self.stack[-1])
+        style = dict(self.stack[-1])
+        style["margin_top"] = max(self.pending_margin, 6)
+        style["page_break_before"] = self.pending_page_break
+        self.pending_margin = 6
+        self.pending_page_break = False
+        self.blocks.append(_Block(style, [], image=image))
+
+    def _flush(self, block_style: dict):
+        runs, self.runs = self.runs, []
+        if not "".join(text for text, _ in runs).strip():
+            return
+        style = dict(block_style)
+        style["margin_top"] = self.pending_margin
+        style["page_break_before"] = self.pending_page_break
+        self.pending_margin = 0
+        self.pending_page_break = False
+        self.blocks.append(_Block(style, runs, bullet=block_style.get("bullet", False)))
+
+
+class _Page:
+    def __init__(self):
+        self.ops: list[bytes] = []
+        self.images: list[str] = []
+
+
+class _Layout:
+    """Breaks blocks into lines and places them on pages."""
+
+    def __init__(self):
+        self.pages = [_Page()]
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def new_page(self):
+        self.pages.append(_Page())
+        self.y = PAGE_HEIGHT - MARGIN
+
+    @property
+    def page(self) -> _Page:
+        return self.pages[-1]
+
+    def _words(self, block: _Block):
+        """Yields (word, style, leading_space) with HTML whitespace collapsing; '\\n' forces a break."""
+        pending_space = False
+        at_start = True
+        for text, style in block.runs:
+            if text == "\n":
+                yield "\n", style, False
+                pending_space = False
+                at_start = True
+                continue
+            if style.get("uppercase"):
+                text = text.upper()
+            parts = re.split(r"(\s+)", text)
+            for part in parts:
+                if not part:
+                    continue
+                if part.isspace():
+                    pending_space = not at_start
+                    continue
+                yield part, style, pending_space
+                pending_space = False
+                at_start = False
+
+    def _lines(self, block: _Block, width: float):
+        lines, line, line_width = [], [], 0.0
+        for word, style, space in self._words(block):
+            if word == "\n":
+                lines.append(line)
+                line, line_width = [], 0.0
+                continue
+            size = style["font_size"]
+            word_width = text_width(word, style["bold"], style["italic"], size)
+            space_width = text_width(" ", style["bold"], style["italic"], size) if space and line else 0
+            if line and line_width + space_width + word_width > width:
+                lines.append(line)
+                line, line_width, space_width = [], 0.0, 0
+            line.append((word, style, space_width > 0, word_width, space_width))
+            line_width += space_width + word_width
+        if line:
+            lines.append(line)
+        return lines
+
+    def place(self, block: _Block):
+        style = block.style
+        if style.get("page_break_before") and self.page.ops:
+            self.new_page()
+        elif self.page.ops:
+            self.y -= style.get("margin_top", 0)
+
+        left = MARGIN + style.get("indent", 0)
+        width = PAGE_WIDTH - MARGIN - left
+
+        if block.image is not None:
+            self._place_image(block.image, left, width)
+            return
+
+        if style.get("border_top"):
+            self._rule(left, self.y + 2, width, style["border_top"])
+
+        for index, line in enumerate(self._lines(block, width)):
+            size = max((item[1]["font_size"] for item in line), default=style["font_size"])
+            height = size * style.get("line_height", LINE_HEIGHT)
+            if self.y - height < MARGIN:
+                self.new_page()
+            self.y -= height
+            baseline = self.y + (height - size) / 2 + size * 0.22
+            line_width = sum(item[3] + item[4] for item in line)
+            x = left
+            if style.get("align") == "center":
+                x = left + (width - line_width) / 2
+            elif style.get("align") == "right":
+                x = left + width - line_width
+            if block.bullet and index == 0:
+                self._text("\x95", x - 10, baseline, style)
+            for word, word_style, has_space, word_width, space_width in line:
+                x += space_width
+                self._text(word, x, baseline, word_style)
+                x += word_width
+
+        if style.get("border_bottom"):
+            self.y -= 3
+            self._rule(left, self.y, width, style["border_bottom"])
+
+    def _place_image(self, image: _Image, left: float, width: float):
+        # CSS pixels to points, capped to the column and one page of height
+        draw_width = min(image.width * 0.75, IMAGE_MAX_WIDTH, width)
+        draw_height = draw_width * image.height / image.width
+        max_height = PAGE_HEIGHT - 2 * MARGIN
+        if draw_height > max_height:
+            draw_width, draw_height = draw_width * max_height / draw_height, max_height
+        if self.y - draw_height < MARGIN:
+            self.new_page()
+        self.y -= draw_height
+        self.page.images.append(image.name)
+        self.page.ops.append(
+            b"q %.2f 0 0 %.2f %.2f %.2f cm /%s Do Q" % (draw_width, draw_height, left, self.y, image.name.encode())
+        )
+
+    def _text(self, text: str, x: float, y: float, style: dict):
+        font = FONTS[(style["bold"], style["italic"])][0]
+        r, g, b = style.get("color") or (0, 0, 0)
+        escaped = _encode(text).replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+        self.page.ops.append(
+            b"%.3f %.3f %.3f rg BT /%s %.2f Tf %.2f %.2f Td (" % (r, g, b, font.encode(), style["font_size"], x, y)
+            + escaped + b") Tj ET"
+        )
+
+    def _rule(self, x: float, y: float, width: float, color):
+        r, g, b = color
+        self.page.ops.append(b"%.3f %.3f %.3f RG 0.75 w %.2f %.2f m %.2f %.2f l S" % (r, g, b, x, y, x + width, y))
+
+
+def _write_pdf(pages: list[_Page], images: list[_Image], title: str = "") -> bytes:
+    objects: list[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog_id = add(b"")  # filled in once the page tree exists
+    pages_id = add(b"")
+    font_ids = {}
+    for name, base_font, _ in FONTS.values():
+        font_ids[name] = add(
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base_font.encode()
+        )
+    font_resources = b" ".join(b"/%s %d 0 R" % (name.encode(), oid) for name, oid in font_ids.items())
+    image_ids = {}
+    for image in images:
+        color_space = b"/DeviceRGB" if image.components == 3 else b"/DeviceGray"
+        image_ids[image.name] = add(
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s /BitsPerComponent 8 "
+            b"/Filter /DCTDecode /Length %d >>\nstream\n" % (image.width, image.height, color_space, len(image.data))
+            + image.data + b"\nendstream"
+        )
+
+    page_ids = []
+    for page in pages:
+        stream = zlib.compress(b"\n".join(page.ops))
+        content_id = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        resources = b"/Font << %s >>" % font_resources
+        if page.images:
+            resources += b" /XObject << %s >>" % b" ".join(
+                b"/%s %d 0 R" % (name.encode(), image_ids[name]) for name in page.images
+            )
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources << %s >> /Contents %d 0 R >>"
+            % (pages_id, PAGE_WIDTH, PAGE_HEIGHT, resources, content_id)
+        ))
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % oid for oid in page_ids), len(page_ids)
+    )
+    objects[catalog_id - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+    title_escaped = _encode(title).replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+    info_id = add(b"<< /Producer (LeaseGuard local renderer) /Title (%s) >>" % title_escaped)
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog_id, info_id, xref_offset
+    )
+    return bytes(out)
+
+
+def render_html_to_pdf(html: str, title: str = "") -> bytes:
+    """Renders an HTML document to PDF bytes."""
+    parser = _LayoutParser()
+    parser.feed(html)
+    parser.close()
+
+    layout = _Layout()
+    # Vertical margins were already collapsed into each block's margin_top
+    for block in parser.blocks:
+        layout.place(block)
+    return _write_pdf(layout.pages, parser.images, title)
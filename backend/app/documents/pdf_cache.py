@@ -0,0 +1,48 @@
+"""
+Content-addressed cache for generated PDFs.
+Keyed by the SHA-256 of the final rendered HTML, so regenerating an identical
+letter never reaches Foxit. Letters carry the current date, which makes the key
+change once per day and keeps each day's rendering cached on its own.
+"""
+import asyncio
+import hashlib
+from app.cache import LRUCache, DiskCache
+from app.metrics import metrics
+
+
+class PdfCache:
+    def __init__(self, directory: str, memory_bytes: int, disk_bytes: int):
+        self.memory = LRUCache(max_items=512, max_bytes=memory_bytes)
+        self.disk = DiskCache(directory, max_bytes=disk_bytes)
+        metrics.gauge("pdf_cache.hit_rate", self.hit_rate)
+        metrics.gauge("pdf_cache.memory_bytes", lambda: self.memory.bytes)
+        metrics.gauge("pdf_cache.disk_bytes", lambda: self.disk.bytes)
+
+    @staticmethod
+    def key(html: str) -> str:
+        return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+    def hit_rate(self) -> float:
+        hits = metrics.counters["pdf_cache.hits"]
+        total = hits + metrics.counters["pdf_cache.misses"]
+        return round(hits / total, 4) if total else 0.0
+
+    async def get(self, key: str) -> bytes | None:
+        pdf = self.memory.get(key)
+        if pdf is None:
+            pdf = await asyncio.to_thread(self.disk.get, key)
+            if pdf is not None:
+                self.memory.set(key, pdf)
+        if pdf is None:
+            metrics.incr("pdf_cache.misses")
+            return None
+        metrics.incr("pdf_cache.hits")
+        metrics.incr("pdf_cache.bytes_saved", len(pdf))
+        return pdf
+
+    async def put(self, key: str, pdf: bytes):
+        self.memory.set(key, pdf)
+        try:
+            await asyncio.to_thread(self.disk.set, key, pdf)
+        except OSError as e:
+            print(f"PDF cache disk write failed: {e}")
@@ -0,0 +1,162 @@
+"""
+PDF rendering backends for generated documents.
+FoxitRenderer runs the upload -> convert -> download flow against Foxit PDF
+Services; LocalRenderer lays the HTML out in-process with app.documents.local_pdf.
+RendererRouter picks a backend per document by availability and observed
+latency, and falls through to the next one when a render fails.
+"""
+import asyncio
+import re
+import time
+from typing import AsyncIterator
+from app.config import settings
+from app.documents.local_pdf import render_html_to_pdf
+from app.metrics import metrics
+
+
+_IMG_SRC = re.compile(r"""<img\b[^>]*?\bsrc\s*=\s*["']([^"']*)["']""", re.IGNORECASE)
+
+
+class RenderError(Exception):
+    pass
+
+
+class PdfRenderer:
+    name = "renderer"
+    # Latency assumed until a render has actually been timed
+    expected_latency = 1.0
+    # Consecutive failures before the backend is skipped for COOLDOWN seconds
+    FAILURE_THRESHOLD = 3
+    COOLDOWN = 60
+    EWMA_ALPHA = 0.3
+
+    def __init__(self):
+        self.latency = None
+        self.failures = 0
+        self.disabled_until = 0.0
+
+    def available(self) -> bool:
+        return time.monotonic() >= self.disabled_until
+
+    def supports(self, html: str) -> bool:
+        """Whether this backend renders the document faithfully."""
+        return True
+
+    def score(self) -> float:
+        return self.latency if self.latency is not None else self.expected_latency
+
+    async def render(self, html: str) -> bytes:
+        raise NotImplementedError
+
+    async def stream(self, html: str) -> AsyncIterator[bytes]:
+        """Yields the PDF in chunks; backends that can't stream yield it whole."""
+        yield await self.render(html)
+
+    def record_success(self, elapsed: float):
+        self.failures = 0
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency = self.EWMA_ALPHA * elapsed + (1 - self.EWMA_ALPHA) * self.latency
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.FAILURE_THRESHOLD:
+            self.disabled_until = time.monotonic() + self.COOLDOWN
+            self.failures = 0
+
+
+class FoxitRenderer(PdfRenderer):
+    name = "foxit"
+    expected_latency = 2.0
+
+    def __init__(self, client):
+        # client: FoxitDocGenClient (upload, conversion, result wait, download)
+        super().__init__()
+        self.client = client
+
+    def available(self) -> bool:
+        return bool(settings.FOXIT_CLIENT_ID) and super().available()
+
+    async def render(self, html: str) -> bytes:
+        return b"".join([chunk async for chunk in self.stream(html)])
+
+    async def stream(self, html: str) -> AsyncIterator[bytes]:
+        doc_id = await self.client.upload_file(html.encode("utf-8"), "template.html", "text/html")
+        if not doc_id:
+            raise RenderError("Foxit upload failed")
+        task_id = await self.client.start_html_conversion(doc_id)
+        if not task_id:
+            raise RenderError("Foxit conversion start failed")
+        result_doc_id = await self.client.wait_for_result(task_id)
+        async for chunk in self.client.download_stream(result_doc_id):
+            yield chunk
+
+
+class LocalRenderer(PdfRenderer):
+    name = "local"
+    expected_latency = 0.05
+
+    def supports(self, html: str) -> bool:
+        # Only inline JPEGs are embedded locally; remote images need Foxit to fetch them
+        return all(
+            src.lower().startswith(("data:image/jpeg;base64,", "data:image/jpg;base64,"))
+            for src in _IMG_SRC.findall(html)
+        )
+
+    async def render(self, html: str) -> bytes:
+        # Layout is CPU-bound, keep it off the event loop
+        return await asyncio.to_thread(render_html_to_pdf, html)
+
+
+class RendererRouter:
+    """
+    Chooses the backend for each document.
+    policy "auto" orders backends by observed latency; a backend name ("foxit",
+    "local") puts that one first. Either way, backends that are unavailable
+    (not configured or cooling down after failures) are skipped, and a backend
+    that can't render the document faithfully is only used as a last resort.
+    """
+
+    def __init__(self, renderers: list[PdfRenderer], policy: str = "auto"):
+        self.renderers = renderers
+        self.policy = policy
+        for renderer in renderers:
+            metrics.gauge(f"pdf_render.{renderer.name}.latency_ms",
+                          lambda r=renderer: round(r.latency * 1000, 1) if r.latency is not None else 0.0)
+
+    def candidates(self, html: str) -> list[PdfRenderer]:
+        if self.policy == "auto":
+            ordered = sorted(self.renderers, key=lambda r: r.score())
+        else:
+            ordered = sorted(self.renderers, key=lambda r: r.name != self.policy)
+        usable = [r for r in ordered if r.available()] or ordered
+        return [r for r in usable if r.supports(html)] + [r for r in usable if not r.supports(html)]
+
+    async def render(self, html: str) -> bytes:
+        return b"".join([chunk async for chunk in self.stream(html)])
+
+    async def stream(self, html: str) -> AsyncIterator[bytes]:
+        """
+        Streams the PDF from the first backend that produces a first chunk.
+        Falling through to the next backend is only possible before that point.
+        """
+        errors = []
+        for renderer in self.candidates(html):
+            start = time.perf_counter()
+            chunks = renderer.stream(html)
+            try:
+                first = await anext(chunks, b"")
+            except Exception as e:
+                renderer.record_failure()
+                metrics.incr(f"pdf_render.{renderer.name}.failures")
+                print(f"PDF render via {renderer.name} failed: {e}")
+                errors.append(f"{renderer.name}: {e}")
+                continue
+            renderer.record_success(time.perf_counter() - start)
+            metrics.incr(f"pdf_render.{renderer.name}.renders")
+            yield first
+            async for chunk in chunks:
+                yield chunk
+            return
+        raise RenderError("All PDF renderers failed (" + "; ".join(errors) + ")")
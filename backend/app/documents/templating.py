@@ -0,0 +1,178 @@
+"""
+Letter templating for generated documents.
+A small mustache-style language, compiled once and rendered in a single pass:
+  {{name}} / {{a.b}}   value, HTML-escaped (unless compiled with escape=False)
+  {{{name}}}           value, inserted raw
+  {{#name}}..{{/name}} section: repeated per list item, entered for a truthy value
+  {{^name}}..{{/name}} inverted section: rendered when the value is falsy/empty
+  {{.}}                the current item inside a section
+Bundled templates live in app/documents/templates/; per-clause counter-letter
+templates come from the `counterTemplate` field of leaseClause documents in
+Sanity and are recompiled only when the document's _rev changes.
+"""
+import asyncio
+import html
+import os
+import re
+import time
+from functools import lru_cache
+from app.config import settings
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+_TAG = re.compile(r"\{\{\{\s*([\w.]+)\s*\}\}\}|\{\{\s*([#^/]?)\s*([\w.]+|\.)\s*\}\}")
+
+
+class TemplateError(ValueError):
+    pass
+
+
+def _lookup(stack: list, name: str):
+    if name == ".":
+        return stack[-1]
+    first, *rest = name.split(".")
+    for scope in reversed(stack):
+        if isinstance(scope, dict) and first in scope:
+            value = scope[first]
+            break
+    else:
+        return None
+    for part in rest:
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+class Template:
+    def __init__(self, nodes: list, escape: bool):
+        self.nodes = nodes
+        self.escape = escape
+
+    def render(self, context: dict) -> str:
+        out = []
+        self._render(self.nodes, [context], out)
+        return "".join(out)
+
+    def _render(self, nodes: list, stack: list, out: list):
+        for node in nodes:
+            kind = node[0]
+            if kind == "text":
+                out.append(node[1])
+            elif kind == "var":
+                value = _lookup(stack, node[1])
+                if value is None or value is False:
+                    continue
+                value = str(value)
+                out.append(html.escape(value) if node[2] and self.escape else value)
+            else:
+                _, name, children, inverted = node
+                value = _lookup(stack, name)
+                if inverted:
+                    if not value:
+                        self._render(children, stack, out)
+                elif isinstance(value, (list, tuple)):
+                    for item in value:
+                        stack.append(item)
+                        self._render(children, stack, out)
+                        stack.pop()
+                elif value:
+                    stack.append(value)
+                    self._render(children, stack, out)
+                    stack.pop()
+
+
+def compile_template(source: str, escape: bool = True) -> Template:
+    """Parses a template into a node tree; raises TemplateError on unbalanced sections."""
+    root = []
+    open_sections = [("", root)]
+    position = 0
+    for match in _TAG.finditer(source):
+        nodes = open_sections[-1][1]
+        if match.start() > position:
+            nodes.append(("text", source[position:match.start()]))
+        position = match.end()
+        raw_name, sigil, name = match.groups()
+        if raw_name:
+            nodes.append(("var", raw_name, False))
+        elif sigil in ("#", "^"):
+            children = []
+            nodes.append(("section", name, children, sigil == "^"))
+            open_sections.append((name, children))
+        elif sigil == "/":
+            if len(open_sections) == 1 or open_sections[-1][0] != name:
+                raise TemplateError(f"Unexpected closing tag {{{{/{name}}}}}")
+            open_sections.pop()
+        else:
+            nodes.append(("var", name, True))
+    if len(open_sections) > 1:
+        raise TemplateError(f"Unclosed section {{{{#{open_sections[-1][0]}}}}}")
+    if position < len(source):
+        open_sections[-1][1].append(("text", source[position:]))
+    return Template(root, escape)
+
+
+@lru_cache(maxsize=None)
+def builtin_template(name: str) -> Template:
+    """Compiles a bundled template from app/documents/templates/ once per process."""
+    with open(os.path.join(TEMPLATE_DIR, f"{name}.html"), encoding="utf-8") as f:
+        return compile_template(f.read())
+
+
+def render_template(name: str, context: dict) -> str:
+    return builtin_template(name).render(context)
+
+
+def normalize_clause_type(clause_type: str) -> str:
+    """Maps analyzer labels like "Late Fee" onto the library's values ("late_fee")."""
+    return re.sub(r"[^a-z0-9]+", "_", (clause_type or "").lower()).strip("_")
+
+
+class TemplateRegistry:
+    """
+    Compiled per-clause counter-letter templates from the Sanity clause library.
+    The library is re-checked at most every REFRESH_INTERVAL seconds, and a
+    template is only recompiled when its document's _rev has changed.
+    """
+
+    REFRESH_INTERVAL = 60
+
+    def __init__(self, sanity=None):
+        self.sanity = sanity
+        # clause type -> (_rev, compiled template)
+        self.clause_templates: dict[str, tuple[str, Template]] = {}
+        self._checked_at = None
+        self._lock = asyncio.Lock()
+
+    async def clause_template(self, clause_type: str) -> Template | None:
+        await self._refresh()
+        entry = self.clause_templates.get(normalize_clause_type(clause_type))
+        return entry[1] if entry else None
+
+    async def _refresh(self):
+        if self.sanity is None or not settings.SANITY_PROJECT_ID:
+            return
+        if self._checked_at is not None and time.monotonic() - self._checked_at < self.REFRESH_INTERVAL:
+            return
+        async with self._lock:
+            if self._checked_at is not None and time.monotonic() - self._checked_at < self.REFRESH_INTERVAL:
+                return
+            # Stamp first so a failing Sanity isn't hit on every letter
+            self._checked_at = time.monotonic()
+            try:
+                docs = await self.sanity.get_counter_templates()
+            except Exception as e:
+                print(f"Counter template refresh failed: {e}")
+                return
+
+            templates = {}
+            for doc in docs:
+                clause_type = normalize_clause_type(doc.get("clauseType"))
+                cached = self.clause_templates.get(clause_type)
+                if cached and cached[0] == doc.get("_rev"):
+                    templates[clause_type] = cached
+                    continue
+                try:
+                    # Plain text in Sanity; escaping happens when it lands in the letter HTML
+                    templates[clause_type] = (doc.get("_rev"), compile_template(doc["counterTemplate"], escape=False))
+                except TemplateError as e:
+                    print(f"Skipping counter template for {clause_type}: {e}")
+            self.clause_templates = templates
@@ -0,0 +1,79 @@
+"""
+Batch verification of an analysis' flagged clauses against You.com.
+All red and yellow clauses are verified concurrently instead of one at a time
+as letters are requested. The searches go through YouComLegalSearch, so they
+share its cache and the process-wide You.com rate limit. Every query has its
+own deadline, the sooner of the per-query timeout and the end of the batch: a
+clause that can't get a rate limit token by then fails straight away as
+"rate_limited", and one whose search runs past it is reported as "timeout",
+instead of either holding up the others.
+"""
+import asyncio
+import hashlib
+import time
+from app.law_engine.youcom_legal import YouComLegalSearch
+from app.metrics import metrics
+from app.rate_limit import RateLimited
+
+
+def clause_id(clause: dict) -> str:
+    """Sanity's array _key when the clause has one, else a hash of its type and text."""
+    if clause.get("_key"):
+        return clause["_key"]
+    text = f"{clause.get('clauseType', '')}\x00{clause.get('originalText', '')}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class BatchVerifier:
+    def __init__(self, legal_search: YouComLegalSearch, deadline: float, concurrency: int, query_timeout: float):
+        self.legal_search = legal_search
+        self.deadline = deadline
+        self.concurrency = concurrency
+        self.query_timeout = query_timeout
+
+    async def verify(self, clauses: list[dict], state: str, levels: tuple[str, ...] = ("red", "yellow")) -> dict[str, dict]:
+        """
+        Verifies every clause whose riskLevel is in `levels`. Returns
+        {clause_id: result}, where result is verify_red_flag's answer plus a
+        "status" of "verified", "unverified" (no sources found), "rate_limited",
+        "timeout" or "error".
+        """
+        targets = {}
+        for clause in clauses:
+            if clause.get("riskLevel") in levels:
+                targets.setdefault(clause_id(clause), clause)
+        if not targets:
+            return {}
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        batch_deadline = time.monotonic() + self.deadline
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self._verify_one(c, state, batch_deadline, semaphore) for c in targets.values()))
+        metrics.incr("verify_batch.batches")
+        metrics.incr("verify_batch.clauses", len(targets))
+        metrics.incr("verify_batch.elapsed_ms", (time.perf_counter() - start) * 1000)
+        return dict(zip(targets, results))
+
+    async def _verify_one(self, clause: dict, state: str, batch_deadline: float, semaphore: asyncio.Semaphore) -> dict:
+        async with semaphore:
+            timeout = min(self.query_timeout, batch_deadline - time.monotonic())
+            try:
+                if timeout <= 0:
+                    raise TimeoutError
+                async with asyncio.timeout(timeout):
+                    result = await self.legal_search.verify_red_flag(
+                        state, clause.get("clauseType", ""), clause.get("originalText", ""),
+                        deadline=time.monotonic() + timeout,
+                    )
+            except RateLimited:
+                metrics.incr("verify_batch.rate_limited")
+                return {"status": "rate_limited", "verified": False, "sources": []}
+            except TimeoutError:
+                metrics.incr("verify_batch.timeouts")
+                return {"status": "timeout", "verified": False, "sources": []}
+            except Exception as e:
+                print(f"You.com verification failed for {clause.get('clauseType')}: {e}")
+                metrics.incr("verify_batch.errors")
+                return {"status": "error", "verified": False, "sources": []}
+        found = result.get("sources") or result.get("legal_analysis")
+        return {**result, "status": "verified" if found else "unverified"}
@@ -0,0 +1,106 @@
+"""
+In-memory table of state lease law, keyed by (state, clause type).
+Built from the bundled state_laws.json plus the stateRules of the Sanity
+clause library (Sanity wins where both have an entry), so statute lookups for
+common clauses are answered without a web search. A background task polls a
+cheap version query and rebuilds the table when the clause library changes.
+"""
+import asyncio
+import json
+import os
+from app.config import settings
+from app.documents.templating import normalize_clause_type
+from app.metrics import metrics
+
+SEED_PATH = os.path.join(os.path.dirname(__file__), "state_laws.json")
+
+
+class StateLawTable:
+    def __init__(self, entries: list[dict]):
+        self.entries: dict[tuple[str, str], dict] = {}
+        for entry in entries:
+            key = (entry["state"].strip().upper(), normalize_clause_type(entry["clauseType"]))
+            self.entries[key] = {**self.entries.get(key, {}), **entry}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, state: str, clause_type: str) -> dict | None:
+        entry = self.entries.get(((state or "").strip().upper(), normalize_clause_type(clause_type)))
+        metrics.incr("state_laws.hits" if entry else "state_laws.misses")
+        return entry
+
+
+def load_seed(path: str = SEED_PATH) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def entries_from_clauses(docs: list[dict]) -> list[dict]:
+    """Flattens leaseClause documents' stateRules into table entries."""
+    entries = []
+    for doc in docs:
+        for state, rule in (doc.get("stateRules") or {}).items():
+            if not isinstance(rule, dict) or not rule.get("statute"):
+                continue
+            entries.append({
+                **rule,
+                "state": state,
+                "clauseType": doc.get("clauseType") or "",
+                "commonName": doc.get("commonName") or "",
+            })
+    return entries
+
+
+class StateLawRegistry:
+    """
+    The current StateLawTable. The seed table is available immediately; start()
+    loads the Sanity clause library and keeps checking it every REFRESH_INTERVAL
+    seconds.
+    """
+
+    REFRESH_INTERVAL = 300
+
+    def __init__(self, sanity=None):
+        self.sanity = sanity
+        self.seed = load_seed()
+        self.table = StateLawTable(self.seed)
+        self._version = None
+        self._refresher = None
+        metrics.gauge("state_laws.entries", lambda: len(self.table))
+
+    def lookup(self, state: str, clause_type: str) -> dict | None:
+        return self.table.lookup(state, clause_type)
+
+    def start(self):
+        """Starts the background refresh loop."""
+        if self._refresher is None and self.sanity is not None and settings.SANITY_PROJECT_ID:
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"State law table refresh failed: {e}")
+            await asyncio.sleep(self.REFRESH_INTERVAL)
+
+    async def refresh(self):
+        version = await self.sanity.get_clause_library_version()
+        if version and version == self._version:
+            return
+        docs = await self.sanity.get_state_rules()
+        self.table = StateLawTable(self.seed + entries_from_clauses(docs))
+        self._version = version
+        print(f"State law table rebuilt: {len(self.table)} entries")
+
+    async def aclose(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
@@ -2,20 +2,39 @@
 State Law Engine — You.com Search API for real-time tenant law verification.
 Searches for actual statutes and citations to verify/augment Gemini analysis.
 """
-import requests
+import httpx
 from app.config import settings
+from app.law_engine.state_laws import StateLawRegistry
+from app.rate_limit import RateLimited, TokenBucket
+from app.search_cache import SearchCache
+from app.single_flight import SingleFlight
 
 
 class YouComLegalSearch:
-    def __init__(self):
+    def __init__(self, http: httpx.AsyncClient, cache: SearchCache = None, laws: StateLawRegistry = None,
+                 limiter: TokenBucket = None):
+        self.http = http
+        self.cache = cache
+        self.laws = laws
+        self.limiter = limiter
+        self.flights = SingleFlight("you_com_legal")
         self.api_key = settings.YOU_COM_API_KEY
-        self.base_url = "https://chat-api.you.com/smart"
+        self.base_url = settings.YOU_COM_BASE_URL
 
-    def search_statute(self, state: str, clause_type: str, clause_text: str) -> dict:
+    async def search_statute(self, state: str, clause_type: str, clause_text: str) -> dict:
         """
         Searches You.com for the specific state law related to a lease clause.
-        Returns citation, URL, and explanation.
+        Returns citation, URL, and explanation. Clauses covered by the state law
+        table are answered from it without a web search.
         """
+        law = self._lookup(state, clause_type)
+        if law:
+            return {
+                "citation": law["statute"],
+                "explanation": law.get("summary") or law.get("maxLateFee", ""),
+                "sources": [{"title": law["statute"], "url": law["url"]}] if law.get("url") else [],
+            }
+
         if not self.api_key:
             return {"citation": "", "explanation": "", "sources": []}
 
@@ -24,7 +43,7 @@ class YouComLegalSearch:
             f"residential lease statute code section 2025 2026"
         )
 
-        result = self._search(query)
+        result = await self._search(query, "statute")
 
         return {
             "citation": self._extract_citation(result),
@@ -35,13 +54,25 @@ class YouComLegalSearch:
             ]
         }
 
-    def verify_red_flag(self, state: str, clause_type: str, clause_text: str) -> dict:
+    async def verify_red_flag(self, state: str, clause_type: str, clause_text: str, deadline: float = None) -> dict:
         """
         Verifies whether a flagged clause actually violates state law.
-        Returns verification result with real legal sources.
+        Returns verification result with real legal sources. Clause types covered
+        by the state law table are answered from it without a web search. With a
+        `deadline` (time.monotonic()), raises RateLimited if the search can't
+        start before it.
         """
+        law = self._lookup(state, clause_type)
+        if law:
+            return {
+                "verified": True,
+                "citation": law["statute"],
+                "legal_analysis": law.get("summary") or law.get("maxLateFee", ""),
+                "sources": [{"title": law["statute"], "url": law["url"]}] if law.get("url") else [],
+            }
+
         if not self.api_key:
-            return {"verified": False, "sources": []}
+            return {"verified": False, "sources": [], "citation": ""}
 
         query = (
             f"Is this lease clause legal in {state}? "
@@ -50,10 +81,11 @@ class YouComLegalSearch:
             f"Cite the specific statute or code section."
         )
 
-        result = self._search(query)
+        result = await self._search(query, "verify", deadline)
 
         return {
             "verified": True,
+            "citation": self._extract_citation(result),
             "legal_analysis": result.get("answer", ""),
             "sources": [
                 {"title": h.get("title", ""), "url": h.get("url", "")}
@@ -61,7 +93,7 @@ class YouComLegalSearch:
             ]
         }
 
-    def get_tenant_rights(self, state: str) -> dict:
+    async def get_tenant_rights(self, state: str) -> dict:
         """
         Gets a summary of key tenant rights for a specific state.
         """
@@ -73,7 +105,7 @@ class YouComLegalSearch:
             f"rent increase notice eviction protection 2025 2026"
         )
 
-        result = self._search(query)
+        result = await self._search(query, "tenant_rights")
 
         return {
             "summary": result.get("answer", ""),
@@ -83,8 +115,29 @@ class YouComLegalSearch:
             ]
         }
 
-    def _search(self, query: str) -> dict:
-        """Calls You.com Smart API."""
+    def _lookup(self, state: str, clause_type: str) -> dict | None:
+        return self.laws.lookup(state, clause_type) if self.laws else None
+
+    async def _search(self, query: str, kind: str, deadline: float = None) -> dict:
+        """
+        Calls You.com Smart API, through the shared search cache. Identical
+        searches made at the same time share one call (and the first caller's deadline).
+        """
+        return await self.flights.do(
+            SearchCache.key(kind, query), lambda: self._search_cached(query, kind, deadline)
+        )
+
+    async def _search_cached(self, query: str, kind: str, deadline: float = None) -> dict:
+        if self.cache:
+            cached = await self.cache.get(kind, query)
+            if cached is not None:
+                return cached
+        result = await self._search_uncached(query, deadline)
+        if self.cache:
+            await self.cache.put(kind, query, result)
+        return result
+
+    async def _search_uncached(self, query: str, deadline: float = None) -> dict:
         headers = {
             "X-API-Key": self.api_key,
             "Content-Type": "application/json"
@@ -95,9 +148,11 @@ class YouComLegalSearch:
             "chat_mode": "research"
         }
 
+        if self.limiter and not await self.limiter.acquire(deadline):
+            raise RateLimited(f"No You.com rate limit token before the deadline for: {query[:60]}")
         try:
-            response = requests.post(self.base_url, headers=headers, json=payload, timeout=30)
-            if response.ok:
+            response = await self.http.post(self.base_url, headers=headers, json=payload, timeout=30)
+            if response.is_success:
                 return response.json()
             else:
                 print(f"You.com Legal Search Error: {response.status_code} - {response.text}")
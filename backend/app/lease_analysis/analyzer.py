@@ -1,21 +1,20 @@
 from google import genai
 from google.genai import types
 from app.config import settings
+from app.lease_analysis.chunking import chunk_lease
+from app.lease_analysis.result_cache import AnalysisCache, prompt_version
+from app.lease_analysis.revisions import (
+    FULL_REANALYSIS_SHARE, assign_sections, change_report, fingerprint, plan_revision, rescore, section_hash,
+)
+from app.lease_analysis.stream_parser import AnalysisStreamParser
+from typing import AsyncIterator
+import asyncio
 import json
 import os
+import re
+import time
 
-class LeaseAnalyzer:
-    def __init__(self):
-        if not settings.GEMINI_API_KEY:
-            raise ValueError("Gemini API Key is missing")
-        self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
-        self.model = "gemini-3-flash-preview" # Updated to user-requested preview model
-
-    def analyze_lease(self, extracted_text: str, state: str) -> dict:
-        """
-        Analyzes the lease text using Gemini 1.5 Pro.
-        """
-        system_instruction = """You are a tenant rights attorney. Analyze this residential lease.
+SYSTEM_INSTRUCTION = """You are a tenant rights attorney. Analyze this residential lease.
 Identify key clauses, including both RISKS and NON-RISKY KEY TERMS (like Rent Amount, Deposit amount, Utilities, Pet Policy). 
 
 Be EXTREMELY concise but use plain English.
@@ -43,28 +42,139 @@ Return JSON:
   "summary": "string (Overall summary of the lease, including any highly unusual terms)"
 }
 """
-        
-        prompt = f"{system_instruction}\n\nThe tenant's state is: {state}\n\nThe lease text is:\n{extracted_text}"
+
+PART_NOTE = """This is part {part} of {parts} of a longer lease; analyze only the clauses in this part.
+Leave propertyAddress, landlordName or tenantName empty if they don't appear here.
+"""
+
+MERGE_INSTRUCTION = """You are a tenant rights attorney. Below are summaries of consecutive parts of one
+residential lease, followed by its high-risk clauses. Write a single overall summary of the lease
+(3-5 sentences, plain English), including any highly unusual terms. Return only the summary text."""
+
+_RISK_ORDER = {"green": 0, "yellow": 1, "red": 2}
+
+# Any change to the prompts or to how leases are chunked changes analysis results
+PROMPT_VERSION = prompt_version(SYSTEM_INSTRUCTION, PART_NOTE, MERGE_INSTRUCTION, str(settings.ANALYSIS_CHUNK_CHARS))
+
+
+class AnalysisTruncated(Exception):
+    pass
+
+
+class AnalysisIncomplete(Exception):
+    """Gemini's analysis failed or came back partial where only a complete one will do."""
+
+
+class LeaseAnalyzer:
+    def __init__(self, client: genai.Client | None, cache: AnalysisCache = None):
+        if client is None:
+            raise ValueError("Gemini API Key is missing")
+        self.client = client
+        self.cache = cache
+        self.model = "gemini-3-flash-preview" # Updated to user-requested preview model
+
+    # Rough Gemini tokenization for English prose, plus the instruction text below
+    CHARS_PER_TOKEN = 4
+    PROMPT_OVERHEAD_TOKENS = 350
+
+    def estimate_input_tokens(self, extracted_text: str) -> int:
+        """Approximate input tokens of an analyze_lease call, for cost accounting."""
+        return len(extracted_text) // self.CHARS_PER_TOKEN + self.PROMPT_OVERHEAD_TOKENS
+
+    async def analyze_lease(self, extracted_text: str, state: str) -> dict:
+        """
+        Analyzes the lease text using Gemini.
+        Leases longer than ANALYSIS_CHUNK_CHARS are split on section boundaries,
+        analyzed in parallel and merged, so the JSON output of one call never has
+        to cover the whole lease.
+        Complete results are cached by text, state, model and prompt version.
+        """
+        result, _ = await self._analyze_cached(extracted_text, state)
+        return result
+
+    async def _analyze_cached(self, extracted_text: str, state: str) -> tuple[dict, bool]:
+        """Returns (analysis, whether it is complete); cached results are always complete."""
+        key = None
+        if self.cache:
+            key = self.cache.key(extracted_text, state, self.model)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return cached, True
+
+        start = time.perf_counter()
+        result, complete = await self._analyze(extracted_text, state)
+        # Fallbacks, repaired JSON and partial chunk results are worth retrying next time
+        if self.cache and complete:
+            await self.cache.put(key, result, time.perf_counter() - start)
+        return result, complete
+
+    async def _analyze_complete(self, extracted_text: str, state: str) -> dict:
+        """
+        analyze_lease for revisions, where a fallback or partial result can't be
+        used: its missing clauses would be reported as removed and lower the score.
+        """
+        result, complete = await self._analyze_cached(extracted_text, state)
+        if not complete:
+            raise AnalysisIncomplete(result.get("summary") or "Gemini analysis incomplete")
+        return result
+
+    async def _analyze(self, extracted_text: str, state: str) -> tuple[dict, bool]:
+        """Returns (analysis, whether it is complete)."""
+        chunks = chunk_lease(extracted_text, settings.ANALYSIS_CHUNK_CHARS)
+        if len(chunks) > 1:
+            return await self._analyze_chunked(chunks, state)
 
         try:
-            # Increase output token limit to prevent JSON truncation
-            # and ensure structured output is enabled.
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    max_output_tokens=8192, # Ensure we have enough space for long leases
-                    temperature=0.1 # Lower temperature for more deterministic/valid JSON
-                )
-            )
-            
-            # The new SDK might return a parsed object if schema is defined, 
-            # but for raw JSON mode, we access .text
-            if not response.text:
-                raise ValueError("Empty response from Gemini")
+            return await self._analyze_text(extracted_text, state)
+        except AnalysisTruncated as e:
+            print(f"JSON Repair Failed: {e}")
+            # Fallback to returning standard error structure
+            return {
+                "extractedClauses": [],
+                "overallRiskScore": 0,
+                "summary": "Analysis too large. Please upload simpler lease."
+            }, False
+        except Exception as e:
+            print(f"Gemini Analysis Failed: {e}")
+            # Mock fallback if quota exceeded or error
+            return {
+                "extractedClauses": [],
+                "overallRiskScore": 0,
+                "summary": "Error analyzing lease. Please try again."
+            }, False
+
+    @staticmethod
+    def _prompt(text: str, state: str, part_note: str = "") -> str:
+        return f"{SYSTEM_INSTRUCTION}\n{part_note}\nThe tenant's state is: {state}\n\nThe lease text is:\n{text}"
+
+    @staticmethod
+    def _json_config() -> types.GenerateContentConfig:
+        # Increase output token limit to prevent JSON truncation
+        # and ensure structured output is enabled.
+        return types.GenerateContentConfig(
+            response_mime_type="application/json",
+            max_output_tokens=8192, # Ensure we have enough space for long leases
+            temperature=0.1 # Lower temperature for more deterministic/valid JSON
+        )
 
-            return json.loads(response.text)
+    async def _analyze_text(self, text: str, state: str, part_note: str = "") -> tuple[dict, bool]:
+        """
+        One Gemini call over `text`. Returns (analysis, False if the JSON had to be repaired).
+        Raises on errors and on unrepairable JSON.
+        """
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=self._prompt(text, state, part_note),
+            config=self._json_config(),
+        )
+
+        # The new SDK might return a parsed object if schema is defined,
+        # but for raw JSON mode, we access .text
+        if not response.text:
+            raise ValueError("Empty response from Gemini")
+
+        try:
+            return json.loads(response.text), True
         except json.JSONDecodeError:
             # Attempt to repair truncated JSON
             print("Warning: JSON Response truncated. Attempting repair.")
@@ -72,25 +182,245 @@ Return JSON:
                 text = response.text.strip()
                 # Naive repair: Close the array and object if missing
                 if not text.endswith("}"):
-                   text += "}]}" 
+                   text += "}]}"
                 if not text.endswith("]}"): # if only array was open
                    text += "]}"
                 if not text.endswith("}"): # if only object was open
                    text += "}"
-                return json.loads(text)
+                return json.loads(text), False
             except Exception as repair_error:
-                print(f"JSON Repair Failed: {repair_error}")
-                # Fallback to returning standard error structure
-                return {
-                    "extractedClauses": [],
-                    "overallRiskScore": 0,
-                    "summary": "Analysis too large. Please upload simpler lease."
-                }
-        except Exception as e:
-            print(f"Gemini Analysis Failed: {e}")
-            # Mock fallback if quota exceeded or error
+                raise AnalysisTruncated(str(repair_error))
+
+    async def _analyze_chunked(self, chunks: list[str], state: str) -> tuple[dict, bool]:
+        """Map: analyze each chunk under a concurrency cap. Reduce: merge clauses, scores and summaries."""
+        semaphore = asyncio.Semaphore(settings.ANALYSIS_CONCURRENCY)
+
+        async def analyze_part(index: int, chunk: str) -> tuple[dict, bool] | None:
+            async with semaphore:
+                try:
+                    note = PART_NOTE.format(part=index + 1, parts=len(chunks))
+                    return await self._analyze_text(chunk, state, note)
+                except Exception as e:
+                    print(f"Gemini Analysis of part {index + 1}/{len(chunks)} failed: {e}")
+                    return None
+
+        print(f"Analyzing lease in {len(chunks)} parts (largest {max(len(c) for c in chunks)} chars)")
+        results = await asyncio.gather(*(analyze_part(i, c) for i, c in enumerate(chunks)))
+        parts = [r[0] for r in results if r]
+        if not parts:
             return {
                 "extractedClauses": [],
                 "overallRiskScore": 0,
                 "summary": "Error analyzing lease. Please try again."
+            }, False
+
+        merged = merge_analyses(parts)
+        merged["summary"] = await self._merge_summary(parts, merged["extractedClauses"])
+        if len(parts) < len(chunks):
+            merged["summary"] += f" (Note: {len(chunks) - len(parts)} of {len(chunks)} parts of the lease could not be analyzed.)"
+        return merged, all(r and r[1] for r in results)
+
+    async def reanalyze_lease(self, extracted_text: str, state: str, previous: dict) -> tuple[dict, dict]:
+        """
+        Analyzes a revision of a previously analyzed lease. Clauses of sections
+        whose text is unchanged are taken from the stored analysis; only new or
+        edited sections are sent to Gemini. The overall score is the stored one
+        moved by the change in clause risk. Falls back to a full analysis when the
+        stored analysis has no section fingerprints, was for another state, or
+        most of the text changed. Returns (analysis, clause change report).
+        Raises AnalysisIncomplete if Gemini's part of the work fails or comes back
+        partial, rather than reporting the clauses it lost as removed.
+        """
+        previous_clauses = previous.get("extractedClauses") or []
+        sections, changed, reused = plan_revision(extracted_text, previous)
+        changed_chars = sum(len(sections[i]) for i in changed)
+        if (
+            not previous.get("sections")
+            or (previous.get("state") or state).strip().upper() != state.strip().upper()
+            or changed_chars > len(extracted_text) * FULL_REANALYSIS_SHARE
+        ):
+            print(f"Re-analyzing revised lease in full ({changed_chars}/{len(extracted_text)} chars changed)")
+            result = fingerprint(extracted_text, await self._analyze_complete(extracted_text, state))
+            changed = list(range(len(sections)))
+        else:
+            print(f"Re-analyzing {len(changed)}/{len(sections)} changed sections ({changed_chars} chars)")
+            part = {}
+            if changed:
+                part = await self._analyze_complete("\n".join(sections[i] for i in changed), state)
+            fresh = part.get("extractedClauses") or []
+            assign_sections([sections[i] for i in changed], fresh)
+            order = {section_hash(s): i for i, s in enumerate(sections)}
+            clauses = sorted(reused + fresh, key=lambda c: order.get(c.get("sectionHash"), len(sections)))
+
+            result = {f: part.get(f) or previous.get(f, "") for f in ("propertyAddress", "landlordName", "tenantName")}
+            result["extractedClauses"] = clauses
+            result["overallRiskScore"] = rescore(previous.get("overallRiskScore"), previous_clauses, clauses)
+            result["summary"] = previous.get("summary", "")
+            if changed:
+                result["summary"] = await self._merge_summary([previous, part], clauses)
+            result["sections"] = [section_hash(s) for s in sections]
+
+        report = change_report(previous_clauses, result["extractedClauses"])
+        report.update({
+            "sectionsReused": len(sections) - len(changed),
+            "sectionsAnalyzed": len(changed),
+            "scoreBefore": previous.get("overallRiskScore", 0),
+            "scoreAfter": result.get("overallRiskScore", 0),
+        })
+        return result, report
+
+    async def stream_lease(self, extracted_text: str, state: str) -> AsyncIterator[tuple[str, object]]:
+        """
+        Streams the analysis as it is generated. Yields ("clause", clause) for
+        each clause as soon as Gemini has finished writing it, ("field", (name,
+        value)) for the other top-level fields, and finally ("result", analysis).
+        Long leases stream all their chunks at once; clauses arrive in
+        completion order and the merged fields follow at the end.
+        Duplicates follow dedupe_clauses: a repeat is dropped, unless it is riskier
+        than the copy already sent, in which case ("clause_update", (index, clause))
+        replaces the index-th clause yielded.
+        """
+        key = None
+        if self.cache:
+            key = self.cache.key(extracted_text, state, self.model)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                for clause in cached.get("extractedClauses") or []:
+                    yield "clause", clause
+                for name, value in cached.items():
+                    if name != "extractedClauses":
+                        yield "field", (name, value)
+                yield "result", cached
+                return
+
+        start = time.perf_counter()
+        chunks = chunk_lease(extracted_text, settings.ANALYSIS_CHUNK_CHARS)
+        parsers = [AnalysisStreamParser() for _ in chunks]
+        failed = []
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(settings.ANALYSIS_CONCURRENCY)
+
+        async def stream_part(index: int, chunk: str):
+            note = PART_NOTE.format(part=index + 1, parts=len(chunks)) if len(chunks) > 1 else ""
+            async with semaphore:
+                try:
+                    stream = await self.client.aio.models.generate_content_stream(
+                        model=self.model, contents=self._prompt(chunk, state, note), config=self._json_config(),
+                    )
+                    async for response in stream:
+                        if response.text:
+                            for event in parsers[index].feed(response.text):
+                                queue.put_nowait(event)
+                except Exception as e:
+                    print(f"Gemini Analysis stream of part {index + 1}/{len(chunks)} failed: {e}")
+                    failed.append(index)
+
+        tasks = [asyncio.create_task(stream_part(i, c)) for i, c in enumerate(chunks)]
+        finished = asyncio.gather(*tasks)
+        finished.add_done_callback(lambda _: queue.put_nowait(None))
+        streamed: dict[tuple[str, str], int] = {}
+        sent: list[dict] = []
+        try:
+            while (event := await queue.get()) is not None:
+                kind, payload = event
+                if kind == "clause":
+                    clause_key = _clause_key(payload)
+                    index = streamed.get(clause_key)
+                    if index is None:
+                        streamed[clause_key] = len(sent)
+                        sent.append(payload)
+                        yield event
+                    elif _riskier(payload, sent[index]):
+                        sent[index] = payload
+                        yield "clause_update", (index, payload)
+                elif len(chunks) == 1:
+                    yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        parts = [p.result() for p in parsers if p.clauses or p.fields]
+        complete = not failed and all(p.complete for p in parsers)
+        if not parts:
+            result = {
+                "extractedClauses": [],
+                "overallRiskScore": 0,
+                "summary": "Error analyzing lease. Please try again."
             }
+            yield "field", ("summary", result["summary"])
+        elif len(chunks) == 1:
+            result = parts[0]
+            result["extractedClauses"] = dedupe_clauses(result.get("extractedClauses") or [])
+        else:
+            result = merge_analyses(parts)
+            result["summary"] = await self._merge_summary(parts, result["extractedClauses"])
+            for name in ("propertyAddress", "landlordName", "tenantName", "overallRiskScore", "summary"):
+                yield "field", (name, result[name])
+
+        if self.cache and complete:
+            await self.cache.put(key, result, time.perf_counter() - start)
+        yield "result", result
+
+    async def _merge_summary(self, parts: list[dict], clauses: list[dict]) -> str:
+        summaries = [p.get("summary", "") for p in parts if p.get("summary")]
+        red = [f"- {c.get('clauseType')}: {c.get('explanation', '')}" for c in clauses if c.get("riskLevel") == "red"]
+        prompt = (
+            f"{MERGE_INSTRUCTION}\n\nPART SUMMARIES:\n"
+            + "\n".join(f"{i + 1}. {s}" for i, s in enumerate(summaries))
+            + "\n\nHIGH-RISK CLAUSES:\n" + ("\n".join(red) or "None")
+        )
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config=types.GenerateContentConfig(max_output_tokens=512, temperature=0.2),
+            )
+            if response.text and response.text.strip():
+                return response.text.strip()
+        except Exception as e:
+            print(f"Summary merge failed, joining part summaries: {e}")
+        return " ".join(summaries)
+
+
+def _clause_key(clause: dict) -> tuple[str, str]:
+    text = re.sub(r"\W+", " ", (clause.get("originalText") or "").lower()).strip()
+    return (clause.get("clauseType") or "").strip().lower(), text[:120]
+
+
+def _riskier(clause: dict, existing: dict) -> bool:
+    return _RISK_ORDER.get(clause.get("riskLevel"), 0) > _RISK_ORDER.get(existing.get("riskLevel"), 0)
+
+
+def dedupe_clauses(clauses: list[dict]) -> list[dict]:
+    """
+    Collapses duplicate clauses (same type and quoted text) to the riskiest
+    copy, kept in the first copy's position. stream_lease applies the same rule
+    to the clauses it streams.
+    """
+    kept: dict[tuple[str, str], dict] = {}
+    for clause in clauses:
+        key = _clause_key(clause)
+        existing = kept.get(key)
+        if existing is None or _riskier(clause, existing):
+            # Dict keys keep their first position when the value is replaced
+            kept[key] = clause
+    return list(kept.values())
+
+
+def merge_analyses(parts: list[dict]) -> dict:
+    """
+    Combines per-chunk analyses: first non-empty party/address fields, clauses in
+    document order with duplicates (same type and quoted text, e.g. a clause on a
+    chunk seam or restated in an addendum) collapsed to the riskiest copy, and the
+    highest part risk score, since one dangerous section makes the whole lease risky.
+    """
+    merged = {"propertyAddress": "", "landlordName": "", "tenantName": ""}
+    for field in merged:
+        merged[field] = next((p[field] for p in parts if p.get(field)), "")
+
+    merged["extractedClauses"] = dedupe_clauses([c for p in parts for c in p.get("extractedClauses") or []])
+
+    scores = [p["overallRiskScore"] for p in parts if isinstance(p.get("overallRiskScore"), (int, float))]
+    merged["overallRiskScore"] = max(scores) if scores else 0
+    merged["summary"] = " ".join(p.get("summary", "") for p in parts if p.get("summary"))
+    return merged
@@ -0,0 +1,75 @@
+"""
+Splits lease text into chunks on section boundaries for map-reduce analysis.
+Sections are detected from heading lines ("12.", "Section 4", "ARTICLE IX",
+"PETS:", all-caps titles) and packed greedily into chunks of at most max_chars,
+so a clause is never cut in half unless a single section is itself too long.
+"""
+import re
+
+_HEADING = re.compile(
+    r"""^\s*(?:
+        (?:section|article|clause|paragraph)\s+[\dIVXLC]+\b   # Section 4 / ARTICLE IX
+        | \d{1,3}(?:\.\d{1,3})*[.)]\s+\S                      # 12. / 3.1) / 4.2.1.
+        | [A-Z][A-Z0-9 ,&/'-]{3,60}:?\s*$                     # RENT AND LATE FEES
+    )""",
+    re.IGNORECASE | re.VERBOSE,
+)
+_ALL_CAPS = re.compile(r"^\s*[A-Z][A-Z0-9 ,&/'-]{3,60}:?\s*$")
+
+
+def _is_heading(line: str) -> bool:
+    match = _HEADING.match(line)
+    if not match:
+        return False
+    # The case-insensitive pattern would accept any short line as an all-caps title
+    if not re.match(r"^\s*(?:section|article|clause|paragraph|\d)", line, re.IGNORECASE):
+        return bool(_ALL_CAPS.match(line))
+    return True
+
+
+def split_sections(text: str) -> list[str]:
+    """Splits text at heading lines; the preamble before the first heading is its own section."""
+    sections, current = [], []
+    for line in text.splitlines(keepends=True):
+        if current and _is_heading(line):
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return [s for s in sections if s.strip()]
+
+
+def _split_long(section: str, max_chars: int) -> list[str]:
+    """Breaks an oversized section at paragraph, then line, then hard boundaries."""
+    pieces = []
+    for separator in ("\n\n", "\n"):
+        parts = section.split(separator)
+        if all(len(p) <= max_chars for p in parts):
+            current = ""
+            for part in parts:
+                candidate = current + separator + part if current else part
+                if len(candidate) > max_chars and current:
+                    pieces.append(current)
+                    candidate = part
+                current = candidate
+            if current:
+                pieces.append(current)
+            return pieces
+    return [section[i:i + max_chars] for i in range(0, len(section), max_chars)]
+
+
+def chunk_lease(text: str, max_chars: int) -> list[str]:
+    """Packs consecutive sections into chunks of at most max_chars characters."""
+    if len(text) <= max_chars:
+        return [text]
+    chunks, current = [], ""
+    for section in split_sections(text):
+        for piece in ([section] if len(section) <= max_chars else _split_long(section, max_chars)):
+            if current and len(current) + len(piece) > max_chars:
+                chunks.append(current)
+                current = ""
+            current += piece
+    if current:
+        chunks.append(current)
+    return chunks
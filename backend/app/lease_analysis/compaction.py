@@ -0,0 +1,250 @@
+"""
+Normalizes extracted lease text before it is sent to Gemini.
+PDF text carries a lot that costs input tokens without saying anything about
+the lease: page headers and footers repeated on every page, page numbers,
+words broken across lines at a hyphen, runs of spaces and blank lines, and
+signature/initials lines that are mostly underscores. compact_lease() drops or
+collapses those and keeps a map from every compacted offset back to the
+original text, so clauses quoted from the compacted text can still be located
+in the document the user uploaded.
+"""
+import bisect
+import re
+
+# A short line seen next to a page break on at least REPEAT_MIN pages, and on
+# at least REPEAT_SHARE of all pages, is a running header/footer
+REPEAT_MIN = 3
+REPEAT_SHARE = 0.5
+REPEAT_MAX_CHARS = 100
+# How many non-blank lines from a page break (a page number line, a form
+# feed, or either end of the text) a header/footer can be
+PAGE_EDGE_LINES = 2
+
+# "Page 3", "Page 3 of 10", "3 of 10", "- 3 -": page numbers wherever they are
+_PAGE_LABEL = re.compile(
+    r"^(?:[-–\s]*(?:page\s*\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?|\d{1,4}\s+of\s+\d{1,4})[-–\s]*|[-–]\s*\d{1,4}\s*[-–])$",
+    re.IGNORECASE,
+)
+# A bare "3" may just as well be a filled-in form value ("in the amount of\n1800\ndollars"),
+# so it only counts as a page number next to a page break or as part of a 1, 2, 3... run
+_BARE_NUMBER = re.compile(r"^\d{1,4}$")
+# Lines that are only fill-in blanks with a short label ("Tenant Initials: ______").
+# Checked by splitting on the blanks, not with one regex: a repeated
+# label-then-blank pattern backtracks exponentially on a line that almost matches.
+_FILL_BLANK = re.compile(r"_{3,}|\.{5,}")
+_FILL_LABEL = re.compile(r"[\w' ]{0,30}:?")
+FILL_LINE_MAX_CHARS = 200
+_FILL_RUN = re.compile(r"_{4,}|\.{5,}")
+_TOKEN = re.compile(r"\S+")
+
+
+def _is_fill_line(stripped: str) -> bool:
+    """Blanks, each after an optional short label, and nothing after the last blank."""
+    if len(stripped) > FILL_LINE_MAX_CHARS:
+        return False
+    labels = _FILL_BLANK.split(stripped)
+    if len(labels) < 2 or labels[-1].strip():
+        return False
+    return all(_FILL_LABEL.fullmatch(label.strip()) for label in labels[:-1])
+
+
+def _page_numbers(lines: list[tuple[int, str]], content: list[int], form_feeds: set[int]) -> set[int]:
+    """Indices of the lines that are page numbers."""
+    found = set()
+    # Bare numbers in document order, chained while each is one more than the last
+    chains: dict[int, list[int]] = {}
+    for n, i in enumerate(content):
+        stripped = lines[i][1].strip()
+        if _PAGE_LABEL.match(stripped):
+            found.add(i)
+        elif _BARE_NUMBER.match(stripped):
+            at_page_edge = (n == 0 or n == len(content) - 1 or i in form_feeds or content[n - 1] in form_feeds)
+            if at_page_edge:
+                found.add(i)
+            value = int(stripped)
+            chain = chains.pop(value, [])
+            chain.append(i)
+            chains[value + 1] = chain
+    for chain in chains.values():
+        if len(chain) >= REPEAT_MIN:
+            found.update(chain)
+    return found
+
+
+def _line_key(line: str) -> str:
+    """Lines that differ only in numbers (page 3 / page 4) count as the same line."""
+    return re.sub(r"\d+", "#", " ".join(line.lower().split()))
+
+
+class CompactedText:
+    def __init__(self, text: str, original: str, compact_starts: list[int], original_starts: list[int],
+                 removed_lines: int, line_hyphens: list[int] = ()):
+        self.text = text
+        self.original = original
+        # Offsets in text of hyphens that ended a line before the word was rejoined
+        self.line_hyphens = list(line_hyphens)
+        # Segment i of text starts at compact_starts[i] and was copied from original_starts[i]
+        self._compact_starts = compact_starts
+        self._original_starts = original_starts
+        self.removed_lines = removed_lines
+
+    def original_offset(self, offset: int) -> int:
+        """Maps an offset in the compacted text to the matching offset in the original."""
+        if not self._compact_starts:
+            return 0
+        i = max(bisect.bisect_right(self._compact_starts, offset) - 1, 0)
+        return self._original_starts[i] + offset - self._compact_starts[i]
+
+    def original_span(self, start: int, end: int) -> tuple[int, int]:
+        if end <= start:
+            position = self.original_offset(start)
+            return position, position
+        return self.original_offset(start), self.original_offset(end - 1) + 1
+
+    def locate(self, quote: str) -> tuple[int, int] | None:
+        """
+        Finds a quoted passage (e.g. a clause's originalText) in the compacted
+        text, ignoring whitespace differences, and returns its span in the original.
+        """
+        words = quote.split()
+        if not words:
+            return None
+        pattern = re.compile(r"\s*".join(re.escape(word) for word in words))
+        match = pattern.search(self.text)
+        if match is not None:
+            return self.original_span(match.start(), match.end())
+        if not self.line_hyphens:
+            return None
+        # The quote may spell a word broken at a line ("hyph-\nenated") without its hyphen
+        match = pattern.search(self._without_line_hyphens())
+        if match is None:
+            return None
+        start, end = self._with_line_hyphens(match.start()), self._with_line_hyphens(match.end() - 1) + 1
+        return self.original_span(start, end)
+
+    def _without_line_hyphens(self) -> str:
+        pieces, previous = [], 0
+        for hyphen in self.line_hyphens:
+            pieces.append(self.text[previous:hyphen])
+            previous = hyphen + 1
+        pieces.append(self.text[previous:])
+        return "".join(pieces)
+
+    def _with_line_hyphens(self, offset: int) -> int:
+        """Maps an offset in _without_line_hyphens() back to text."""
+        # The k-th removed hyphen sat at offset hyphen - k of the shortened text
+        shifted = [hyphen - k for k, hyphen in enumerate(self.line_hyphens)]
+        return offset + bisect.bisect_right(shifted, offset)
+
+    def token_estimate(self, chars_per_token: int = 4) -> tuple[int, int]:
+        """Approximate tokens (before, after)."""
+        return len(self.original) // chars_per_token, len(self.text) // chars_per_token
+
+
+class _Builder:
+    def __init__(self):
+        self.parts: list[str] = []
+        self.length = 0
+        self.compact_starts: list[int] = []
+        self.original_starts: list[int] = []
+        self.line_hyphens: list[int] = []
+        self._original_end = None
+
+    def copy(self, piece: str, original_start: int):
+        # Extend the previous segment when both sides are contiguous
+        if original_start != self._original_end:
+            self.compact_starts.append(self.length)
+            self.original_starts.append(original_start)
+        self.parts.append(piece)
+        self.length += len(piece)
+        self._original_end = original_start + len(piece)
+
+    def insert(self, piece: str, original_start: int):
+        """Text that replaces something else in the original (a collapsed run, a newline)."""
+        self.compact_starts.append(self.length)
+        self.original_starts.append(original_start)
+        self.parts.append(piece)
+        self.length += len(piece)
+        self._original_end = None
+
+
+def compact_lease(text: str) -> CompactedText:
+    lines, form_feeds, position = [], set(), 0
+    for line in text.splitlines(keepends=True):
+        if line.endswith("\f"):
+            form_feeds.add(len(lines))
+        lines.append((position, line.rstrip("\r\n\f")))
+        position += len(line)
+
+    # Lines within PAGE_EDGE_LINES non-blank lines of a page break
+    content = [i for i, (_, line) in enumerate(lines) if line.strip()]
+    page_numbers = _page_numbers(lines, content, form_feeds)
+    breaks = [n for n, i in enumerate(content) if i in form_feeds or i in page_numbers]
+    breaks = [-1] + breaks + [len(content)]
+    near_break = set()
+    for b in breaks:
+        for n in range(max(b - PAGE_EDGE_LINES, 0), min(b + PAGE_EDGE_LINES + 1, len(content))):
+            near_break.add(content[n])
+
+    counts: dict[str, int] = {}
+    for i in near_break:
+        stripped = lines[i][1].strip()
+        # Lines starting lower-case continue a sentence; headers and footers don't
+        if len(stripped) <= REPEAT_MAX_CHARS and not stripped[0].islower():
+            key = _line_key(stripped)
+            counts[key] = counts.get(key, 0) + 1
+    pages = len(breaks) - 1
+    running = {key for key, count in counts.items() if count >= max(REPEAT_MIN, pages * REPEAT_SHARE)}
+
+    kept = []
+    removed = 0
+    for i, (start, line) in enumerate(lines):
+        stripped = line.strip()
+        if stripped and (
+            i in page_numbers
+            or _is_fill_line(stripped)
+            or (i in near_break and len(stripped) <= REPEAT_MAX_CHARS and _line_key(line) in running)
+        ):
+            removed += 1
+            continue
+        kept.append((start, line))
+
+    out = _Builder()
+    blank = True  # Also drops leading blank lines
+    join_next = False
+    for n, (start, line) in enumerate(kept):
+        tokens = list(_TOKEN.finditer(line))
+        if not tokens:
+            if not blank and not join_next:
+                out.insert("\n", start)
+                blank = True
+            continue
+        if out.parts and not join_next:
+            out.insert("\n", start)
+        blank = False
+        join_next = False
+
+        for i, token in enumerate(tokens):
+            if i:
+                gap_start = tokens[i - 1].end()
+                if line[gap_start:token.start()] == " ":
+                    out.copy(" ", start + gap_start)
+                else:
+                    out.insert(" ", start + gap_start)
+            word, offset = token.group(), start + token.start()
+            if _FILL_RUN.search(word):
+                out.insert(_FILL_RUN.sub(lambda m: m.group()[:3], word), offset)
+                continue
+            # "month-" at the end of a line followed by "to-month" on the next one: the
+            # word continues, but the hyphen stays, since a compound word ("well-known")
+            # can't be told from a hyphenated one and dropping it would change the quote
+            if (i == len(tokens) - 1 and len(word) > 2 and word[-1] == "-" and word[-2].isalpha()
+                    and n + 1 < len(kept) and kept[n + 1][1].lstrip()[:1].islower()):
+                out.copy(word, offset)
+                out.line_hyphens.append(out.length - 1)
+                join_next = True
+                continue
+            out.copy(word, offset)
+
+    return CompactedText("".join(out.parts).rstrip("\n"), text, out.compact_starts, out.original_starts, removed,
+                         out.line_hyphens)
@@ -0,0 +1,129 @@
+"""
+In-process lease / not-lease check for extracted document text.
+A small linear model over keyword and n-gram counts (landlord, tenant,
+premises, security deposit, ...) gives the probability that the text is a
+residential lease. Confident answers are returned directly; only documents in
+the uncertain middle band still need the Gemini yes/no call.
+"""
+import math
+import re
+
+# How much of the document is looked at; leases say what they are up front
+SAMPLE_CHARS = 6000
+
+# Below / above these probabilities the local answer is final
+REJECT_BELOW = 0.15
+ACCEPT_ABOVE = 0.85
+
+BIAS = -4.0
+
+# Weight per log(1 + occurrences) of each n-gram in the lower-cased text
+WEIGHTS = {
+    # Parties and the property
+    "landlord": 1.4,
+    "tenant": 1.4,
+    "tenants": 0.6,
+    "lessor": 1.2,
+    "lessee": 1.2,
+    "premises": 1.0,
+    "rental unit": 0.8,
+    "dwelling": 0.6,
+    "apartment": 0.4,
+    "occupants": 0.5,
+    # The agreement itself
+    "lease agreement": 1.8,
+    "rental agreement": 1.8,
+    "residential lease": 2.0,
+    "tenancy": 1.2,
+    "month-to-month": 1.0,
+    "lease term": 1.0,
+    "term of this lease": 1.2,
+    "this lease": 1.0,
+    # Money
+    "monthly rent": 1.4,
+    "rent": 0.6,
+    "security deposit": 1.6,
+    "late fee": 0.8,
+    "late charge": 0.6,
+    "pet deposit": 0.6,
+    # Typical clauses
+    "quiet enjoyment": 0.8,
+    "sublet": 0.8,
+    "subletting": 0.8,
+    "move-in": 0.5,
+    "move-out": 0.5,
+    "utilities": 0.4,
+    "habitability": 0.6,
+    "holdover": 0.6,
+    # Documents that mention rent or landlords without being a lease
+    "invoice": -1.6,
+    "amount due": -0.8,
+    "receipt": -1.0,
+    "purchase agreement": -2.0,
+    "purchase price": -1.4,
+    "buyer": -1.2,
+    "seller": -1.2,
+    "escrow": -0.8,
+    "closing date": -1.0,
+    "mortgage": -1.0,
+    "borrower": -1.4,
+    "lender": -1.2,
+    "loan": -0.8,
+    "employee": -1.2,
+    "employer": -1.2,
+    "salary": -1.2,
+    "resume": -1.2,
+    "experience": -0.6,
+    "terms of service": -1.6,
+    "privacy policy": -1.6,
+    "notice to quit": -1.4,
+    "eviction notice": -1.4,
+    "notice of eviction": -1.4,
+    "pay rent or quit": -1.4,
+    "listing": -0.8,
+    "for rent": -0.6,
+    "bedroom": -0.2,
+    "sq ft": -0.8,
+    "homeowners association": -0.8,
+    "hoa": -0.6,
+    "abstract": -1.0,
+    "syllabus": -1.4,
+    "recipe": -1.6,
+    "guest": -0.6,
+    "check-in": -1.0,
+    "reservation": -1.2,
+}
+
+# One regex over all n-grams, longest first, so "security deposit" and
+# "deposit"-style overlaps are each counted once
+_FEATURES = re.compile(
+    r"\b(" + "|".join(re.escape(f).replace(r"\ ", r"\s+") for f in sorted(WEIGHTS, key=len, reverse=True)) + r")\b"
+)
+
+
+class LeaseCheck:
+    def __init__(self, probability: float, features: dict[str, int]):
+        self.probability = probability
+        self.features = features
+
+    @property
+    def is_lease(self) -> bool | None:
+        """True / False when the local model is confident, None when Gemini should decide."""
+        if self.probability >= ACCEPT_ABOVE:
+            return True
+        if self.probability <= REJECT_BELOW:
+            return False
+        return None
+
+    @property
+    def leaning(self) -> bool:
+        return self.probability >= 0.5
+
+
+def classify_lease(text: str) -> LeaseCheck:
+    counts: dict[str, int] = {}
+    for match in _FEATURES.finditer(text[:SAMPLE_CHARS].lower()):
+        feature = " ".join(match.group(1).split())
+        counts[feature] = counts.get(feature, 0) + 1
+    score = BIAS + sum(WEIGHTS[f] * math.log1p(n) for f, n in counts.items())
+    return LeaseCheck(1 / (1 + math.exp(-score)), counts)
@@ -0,0 +1,236 @@
+"""
+Local red-flag pre-screen over extracted lease text.
+The redFlagPatterns of every leaseClause document (plus the seed library in
+red_flag_patterns.json) are compiled once into a combined matcher, so the whole
+lease is scanned in one pass and each match says which clause type and state
+rules it belongs to. Patterns are plain phrases matched case-insensitively with
+flexible whitespace; a "re:" prefix marks a raw regular expression.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+from app.config import settings
+
+SEED_PATH = os.path.join(os.path.dirname(__file__), "red_flag_patterns.json")
+
+# How far a hit's span is widened to the surrounding sentence
+SPAN_CONTEXT_CHARS = 300
+_SENTENCE_END = re.compile(r"[.;!?]\s|\n\s*\n")
+
+
+class RedFlagHit:
+    def __init__(self, clause_type: str, common_name: str, pattern: str, start: int, end: int,
+                 span_start: int, span_end: int, text: str, state_rule: dict | None):
+        self.clause_type = clause_type
+        self.common_name = common_name
+        self.pattern = pattern
+        # The matched pattern, and the sentence containing it
+        self.start = start
+        self.end = end
+        self.span_start = span_start
+        self.span_end = span_end
+        self.text = text
+        self.state_rule = state_rule
+
+    def to_dict(self) -> dict:
+        return {
+            "clauseType": self.common_name or self.clause_type,
+            "pattern": self.pattern,
+            "start": self.span_start,
+            "end": self.span_end,
+            "text": self.text,
+            "stateRule": self.state_rule,
+        }
+
+
+def _pattern_source(pattern: str) -> str:
+    if pattern.startswith("re:"):
+        return pattern[3:]
+    words = [re.escape(word) for word in pattern.split()]
+    # Word boundaries only where the phrase starts/ends with a word character
+    prefix = r"\b" if re.match(r"\w", pattern) else ""
+    suffix = r"\b" if re.search(r"\w$", pattern) else ""
+    return prefix + r"\s+".join(words) + suffix
+
+
+def _normalize_phrase(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _trie_regex(phrases: list[str]) -> str:
+    """
+    Prefix-factored alternation ("late (?:fee|charge) of"), so the regex engine
+    rejects most positions on the first character instead of trying every phrase.
+    """
+    trie: dict = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [(r"\s+" if ch == " " else re.escape(ch)) + build(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")" + ("?" if "" in node else "")
+
+    return build(trie)
+
+
+class RedFlagIndex:
+    """
+    Plain phrases (the bulk of the library) are compiled into one trie-shaped
+    regex and matched against the lower-cased text; "re:" patterns are combined
+    into a second alternation with one named group each. Each is one pass.
+    """
+
+    def __init__(self, clauses: list[dict]):
+        self.phrases: dict[str, tuple[dict, str]] = {}
+        self.patterns: list[tuple[dict, str]] = []
+        alternatives = []
+        for clause in clauses:
+            for pattern in clause.get("redFlagPatterns") or []:
+                pattern = (pattern or "").strip()
+                if not pattern:
+                    continue
+                phrase = _normalize_phrase(pattern)
+                if not pattern.startswith("re:") and re.fullmatch(r"\w(?:.*\w)?", phrase):
+                    self.phrases.setdefault(phrase, (clause, pattern))
+                    continue
+                source = _pattern_source(pattern)
+                try:
+                    re.compile(source)
+                except re.error as e:
+                    print(f"Skipping red-flag pattern {pattern!r} of {clause.get('clauseType')}: {e}")
+                    continue
+                alternatives.append(f"(?P<p{len(self.patterns)}>{source})")
+                self.patterns.append((clause, pattern))
+        self.phrase_regex = re.compile(r"\b" + _trie_regex(list(self.phrases)) + r"\b") if self.phrases else None
+        self.regex = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+
+    def __len__(self) -> int:
+        return len(self.phrases) + len(self.patterns)
+
+    def scan(self, text: str, state: str = None) -> list[RedFlagHit]:
+        """Hits in document order."""
+        state = (state or "").upper()
+        matches = []
+        if self.phrase_regex is not None:
+            lowered = text.lower()
+            # A few characters change length when lower-cased; offsets must stay aligned
+            if len(lowered) == len(text):
+                for match in self.phrase_regex.finditer(lowered):
+                    matches.append((match.start(), match.end(), self.phrases[_normalize_phrase(match.group())]))
+            else:
+                regex = re.compile(self.phrase_regex.pattern, re.IGNORECASE)
+                for match in regex.finditer(text):
+                    matches.append((match.start(), match.end(), self.phrases[_normalize_phrase(match.group())]))
+        if self.regex is not None:
+            for match in self.regex.finditer(text):
+                matches.append((match.start(), match.end(), self.patterns[int(match.lastgroup[1:])]))
+        matches.sort(key=lambda m: m[0])
+
+        hits = []
+        for start, end, (clause, pattern) in matches:
+            span_start, span_end = _sentence_around(text, start, end)
+            hits.append(RedFlagHit(
+                clause.get("clauseType") or "other",
+                clause.get("commonName") or "",
+                pattern,
+                start,
+                end,
+                span_start,
+                span_end,
+                " ".join(text[span_start:span_end].split()),
+                (clause.get("stateRules") or {}).get(state),
+            ))
+        return hits
+
+
+def _sentence_around(text: str, start: int, end: int) -> tuple[int, int]:
+    window_start = max(start - SPAN_CONTEXT_CHARS, 0)
+    before = list(_SENTENCE_END.finditer(text, window_start, start))
+    span_start = before[-1].end() if before else window_start
+    after = _SENTENCE_END.search(text, end, min(end + SPAN_CONTEXT_CHARS, len(text)))
+    span_end = after.start() + 1 if after else min(end + SPAN_CONTEXT_CHARS, len(text))
+    return span_start, span_end
+
+
+def prescreen(hits: list[RedFlagHit]) -> dict:
+    """
+    Instant preliminary risk view: one entry per clause type that had hits,
+    in document order, with the matched passages merged where they overlap.
+    """
+    by_type: dict[str, dict] = {}
+    for hit in hits:
+        entry = by_type.setdefault(hit.clause_type, {
+            "clauseType": hit.common_name or hit.clause_type,
+            "stateRule": hit.state_rule,
+            "passages": [],
+        })
+        passages = entry["passages"]
+        if passages and hit.span_start < passages[-1]["end"]:
+            passages[-1]["end"] = max(passages[-1]["end"], hit.span_end)
+            passages[-1]["patterns"].append(hit.pattern)
+            continue
+        passages.append({"start": hit.span_start, "end": hit.span_end, "text": hit.text, "patterns": [hit.pattern]})
+    return {"flagCount": len(hits), "flags": list(by_type.values())}
+
+
+def load_seed_clauses(path: str = SEED_PATH) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class RedFlagRegistry:
+    """
+    The compiled index for the current clause library: the seed patterns plus
+    Sanity's leaseClause documents (Sanity wins per clause type). Re-checked at
+    most every REFRESH_INTERVAL seconds and only recompiled when a document's
+    _rev changes.
+    """
+
+    REFRESH_INTERVAL = 300
+
+    def __init__(self, sanity=None):
+        self.sanity = sanity
+        self.seed = load_seed_clauses()
+        self.current = RedFlagIndex(self.seed)
+        self._revisions = None
+        self._checked_at = None
+        self._lock = asyncio.Lock()
+
+    async def index(self) -> RedFlagIndex:
+        await self._refresh()
+        return self.current
+
+    async def _refresh(self):
+        if self.sanity is None or not settings.SANITY_PROJECT_ID:
+            return
+        if self._checked_at is not None and time.monotonic() - self._checked_at < self.REFRESH_INTERVAL:
+            return
+        async with self._lock:
+            if self._checked_at is not None and time.monotonic() - self._checked_at < self.REFRESH_INTERVAL:
+                return
+            # Stamp first so a failing Sanity isn't hit on every request
+            self._checked_at = time.monotonic()
+            try:
+                docs = await self.sanity.get_red_flag_patterns()
+            except Exception as e:
+                print(f"Red-flag pattern refresh failed: {e}")
+                return
+
+            revisions = sorted((doc.get("_id"), doc.get("_rev")) for doc in docs)
+            if revisions == self._revisions:
+                return
+            sanity_types = {doc.get("clauseType") for doc in docs}
+            clauses = [c for c in self.seed if c["clauseType"] not in sanity_types] + docs
+            self.current = await asyncio.to_thread(RedFlagIndex, clauses)
+            self._revisions = revisions
+            print(f"Red-flag index rebuilt: {len(self.current)} patterns")
@@ -0,0 +1,69 @@
+"""
+Cache of finished lease analyses.
+The key combines a hash of the whitespace-normalized lease text, the state, the
+Gemini model and a hash of the prompts, so editing a prompt or switching models
+starts a fresh set of entries and the stale ones age out through LRU and TTL.
+A bounded in-memory tier sits in front of a compressed on-disk store.
+"""
+import asyncio
+import hashlib
+import json
+import re
+from app.cache import LRUCache, DiskCache
+from app.metrics import metrics
+
+
+def normalize_text(text: str) -> str:
+    """Collapses whitespace so re-extractions of the same PDF hash the same."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def prompt_version(*parts: str) -> str:
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+class AnalysisCache:
+    def __init__(self, directory: str, prompt_version: str, memory_items: int, disk_bytes: int, ttl: float):
+        self.prompt_version = prompt_version
+        self.memory = LRUCache(max_items=memory_items, ttl=ttl, sizeof=lambda entry: 1)
+        self.disk = DiskCache(directory, max_bytes=disk_bytes, compress=True, ttl=ttl)
+        metrics.gauge("analysis_cache.hit_rate", self.hit_rate)
+        metrics.gauge("analysis_cache.memory_items", lambda: len(self.memory))
+        metrics.gauge("analysis_cache.disk_bytes", lambda: self.disk.bytes)
+
+    def key(self, text: str, state: str, model: str) -> str:
+        text_hash = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return hashlib.sha256(
+            f"{text_hash}|{state.strip().upper()}|{model}|{self.prompt_version}".encode("utf-8")
+        ).hexdigest()
+
+    def hit_rate(self) -> float:
+        hits = metrics.counters["analysis_cache.hits"]
+        total = hits + metrics.counters["analysis_cache.misses"]
+        return round(hits / total, 4) if total else 0.0
+
+    async def get(self, key: str) -> dict | None:
+        entry = self.memory.get(key)
+        if entry is None:
+            data = await asyncio.to_thread(self.disk.get, key)
+            if data is not None:
+                try:
+                    entry = json.loads(data)
+                    self.memory.set(key, entry)
+                except ValueError as e:
+                    print(f"Analysis cache entry {key} unreadable: {e}")
+        if entry is None:
+            metrics.incr("analysis_cache.misses")
+            return None
+        metrics.incr("analysis_cache.hits")
+        metrics.incr("analysis_cache.seconds_saved", entry["elapsed"])
+        # Callers may annotate the result; don't let that leak into the cached copy
+        return json.loads(json.dumps(entry["result"]))
+
+    async def put(self, key: str, result: dict, elapsed: float):
+        entry = {"result": result, "elapsed": round(elapsed, 3)}
+        self.memory.set(key, json.loads(json.dumps(entry)))
+        try:
+            await asyncio.to_thread(self.disk.set, key, json.dumps(entry).encode("utf-8"))
+        except OSError as e:
+            print(f"Analysis cache disk write failed: {e}")
@@ -0,0 +1,138 @@
+"""
+Incremental re-analysis of revised leases.
+Saved analyses carry a fingerprint (hash) of every section of the lease text
+they were made from, and each clause records which section it was quoted
+from. A revision is split into sections the same way: clauses of sections
+whose hash is unchanged are reused as they are, and only new or edited
+sections go back to Gemini. The clause lists before and after are compared
+into a change report.
+"""
+import hashlib
+import re
+from app.lease_analysis.chunking import split_sections
+from app.lease_analysis.result_cache import normalize_text
+
+# Above this share of changed text a revision is simply analyzed in full
+FULL_REANALYSIS_SHARE = 0.6
+
+# Clause weights for re-scoring a revision relative to the stored score
+_RISK_POINTS = {"green": 0, "yellow": 5, "red": 15}
+
+_WORD = re.compile(r"\w+")
+
+
+def section_hash(section: str) -> str:
+    return hashlib.sha256(normalize_text(section).lower().encode("utf-8")).hexdigest()[:16]
+
+
+def _words(text: str) -> set[str]:
+    return set(_WORD.findall(text.lower()))
+
+
+def assign_sections(sections: list[str], clauses: list[dict]):
+    """
+    Sets each clause's sectionHash to the section it quotes: the one containing
+    its originalText, or failing that the one sharing most of its words.
+    Clauses come in document order, so a quote found in several sections (a
+    repeated boilerplate sentence) goes to the first one after the previous clause's.
+    """
+    hashes = [section_hash(s) for s in sections]
+    flat = [normalize_text(s).lower() for s in sections]
+    words = None
+    cursor = 0
+    for clause in clauses:
+        quote = normalize_text(clause.get("originalText") or "").lower()
+        order = list(range(cursor, len(flat))) + list(range(cursor))
+        index = next((i for i in order if quote and quote in flat[i]), None)
+        if index is None:
+            if words is None:
+                words = [_words(s) for s in sections]
+            quoted = _words(quote)
+            overlap = [len(quoted & w) for w in words]
+            index = max(range(len(sections)), key=overlap.__getitem__) if sections and max(overlap) else None
+        clause["sectionHash"] = hashes[index] if index is not None else None
+        if index is not None:
+            cursor = index + 1
+
+
+def fingerprint(text: str, analysis: dict) -> dict:
+    """Records the section hashes of the analyzed text, for a later revision to diff against."""
+    sections = split_sections(text)
+    analysis["sections"] = [section_hash(s) for s in sections]
+    assign_sections(sections, analysis.get("extractedClauses") or [])
+    return analysis
+
+
+def risk_points(clauses: list[dict]) -> int:
+    return sum(_RISK_POINTS.get(c.get("riskLevel"), 0) for c in clauses)
+
+
+def rescore(previous_score: float, previous_clauses: list[dict], clauses: list[dict]) -> int:
+    """
+    The stored overall score moved by the change in clause risk, so an unchanged
+    lease keeps Gemini's score and a redline that adds or removes a red clause
+    moves it accordingly.
+    """
+    score = (previous_score or 0) + risk_points(clauses) - risk_points(previous_clauses)
+    return int(min(max(score, 0), 100))
+
+
+def _clause_view(clause: dict) -> dict:
+    return {
+        "clauseType": clause.get("clauseType", ""),
+        "riskLevel": clause.get("riskLevel", ""),
+        "originalText": clause.get("originalText", ""),
+    }
+
+
+def _same_text(a: dict, b: dict) -> bool:
+    return normalize_text(a.get("originalText") or "").lower() == normalize_text(b.get("originalText") or "").lower()
+
+
+def change_report(previous: list[dict], current: list[dict]) -> dict:
+    """
+    Clause-level differences: clauses with the same quoted text are unchanged
+    (or re-rated, if the risk level moved); otherwise clauses of the same type are
+    paired up as modified, and the rest are added or removed.
+    """
+    removed = list(previous)
+    added, modified, rerated, unchanged = [], [], [], 0
+    for clause in current:
+        match = next((old for old in removed if _same_text(old, clause)), None)
+        if match is not None:
+            removed.remove(match)
+            if match.get("riskLevel") != clause.get("riskLevel"):
+                rerated.append({"before": _clause_view(match), "after": _clause_view(clause)})
+            else:
+                unchanged += 1
+            continue
+        added.append(clause)
+
+    for clause in list(added):
+        kind = (clause.get("clauseType") or "").strip().lower()
+        match = next((old for old in removed if (old.get("clauseType") or "").strip().lower() == kind), None)
+        if match is not None:
+            removed.remove(match)
+            added.remove(clause)
+            modified.append({"before": _clause_view(match), "after": _clause_view(clause)})
+
+    return {
+        "added": [_clause_view(c) for c in added],
+        "removed": [_clause_view(c) for c in removed],
+        "modified": modified + rerated,
+        "unchanged": unchanged,
+    }
+
+
+def plan_revision(text: str, previous: dict) -> tuple[list[str], list[int], list[dict]]:
+    """
+    Splits the revised text into sections and works out which need analysis.
+    Returns (sections, indices of changed sections, stored clauses that are reused).
+    """
+    sections = split_sections(text)
+    known = set(previous.get("sections") or [])
+    hashes = [section_hash(s) for s in sections]
+    changed = [i for i, h in enumerate(hashes) if h not in known]
+    unchanged = {h for h in hashes if h in known}
+    reused = [c for c in previous.get("extractedClauses") or [] if c.get("sectionHash") in unchanged]
+    return sections, changed, reused
@@ -0,0 +1,99 @@
+"""
+Incremental parser for the analysis JSON as Gemini streams it.
+Each element of "extractedClauses" is reported as soon as its closing brace
+arrives, and each other top-level field as soon as its value ends, so clauses
+can be shown while the rest is still being generated. A stream that is cut
+off keeps every clause that was completed, which is what the old
+truncated-JSON repair was trying (and often failing) to recover.
+"""
+import json
+
+CLAUSES_KEY = "extractedClauses"
+
+
+class AnalysisStreamParser:
+    def __init__(self):
+        self.text = ""
+        self.fields: dict = {}
+        self.clauses: list[dict] = []
+        self.complete = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect_key = True
+        self._key = None
+        self._value_start = None
+        self._item_start = None
+
+    def feed(self, chunk: str) -> list[tuple[str, object]]:
+        """
+        Consumes the next piece of output. Returns the events it completed:
+        ("clause", dict) and ("field", (name, value)).
+        """
+        events = []
+        self.text += chunk
+        text = self.text
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect_key:
+                        self._key = json.loads(text[self._string_start:i + 1])
+                continue
+
+            if self._depth == 1 and not self._expect_key and self._value_start is None and not c.isspace():
+                self._value_start = i
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                self._depth += 1
+                if self._depth == 3 and c == "{" and self._key == CLAUSES_KEY:
+                    self._item_start = i
+            elif c in "}]":
+                if self._depth == 3 and c == "}" and self._item_start is not None:
+                    clause = self._load(text[self._item_start:i + 1])
+                    if isinstance(clause, dict):
+                        self.clauses.append(clause)
+                        events.append(("clause", clause))
+                    self._item_start = None
+                if self._depth == 1:
+                    self._end_value(text, i, events)
+                    self.complete = True
+                self._depth -= 1
+            elif c == ":" and self._depth == 1:
+                self._expect_key = False
+            elif c == "," and self._depth == 1:
+                self._end_value(text, i, events)
+        self._pos = len(text)
+        return events
+
+    def _end_value(self, text: str, end: int, events: list):
+        key, start = self._key, self._value_start
+        self._key = None
+        self._value_start = None
+        self._expect_key = True
+        if key is None or start is None or key == CLAUSES_KEY:
+            return
+        value = self._load(text[start:end].strip())
+        self.fields[key] = value
+        events.append(("field", (key, value)))
+
+    @staticmethod
+    def _load(raw: str):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    def result(self) -> dict:
+        """The analysis assembled from everything completed so far."""
+        return {**self.fields, CLAUSES_KEY: list(self.clauses)}
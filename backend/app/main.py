@@ -1,12 +1,28 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.routes import upload, documents, deposit, chat, rent, maintenance
+from app.dependencies import Upstreams
+from app.routes import upload, documents, deposit, chat, rent, maintenance, metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared upstream clients live for the whole process
+    upstreams = Upstreams()
+    await upstreams.start()
+    app.state.upstreams = upstreams
+    try:
+        yield
+    finally:
+        await upstreams.aclose()
+
 
 app = FastAPI(
     title="LeaseGuard API",
     description="AI Tenant Protection Platform Backend",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS Configuration
@@ -24,11 +40,13 @@ app.include_router(deposit.router, prefix="/api/v1", tags=["Deposit Defender"])
 app.include_router(chat.router, prefix="/api/v1", tags=["Voice Chat"])
 app.include_router(rent.router, prefix="/api/v1", tags=["Rent Radar"])
 app.include_router(maintenance.router, prefix="/api/v1", tags=["Maintenance & TTS"])
+app.include_router(metrics.router, prefix="/api/v1", tags=["Metrics"])
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to LeaseGuard API", "status": "active"}
 
 @app.get("/health")
+@app.get(f"{settings.API_V1_STR}/health")
 async def health_check():
     return {"status": "ok"}
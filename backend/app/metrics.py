@@ -0,0 +1,29 @@
+"""
+Process-wide counters and gauges, exposed at GET /api/v1/metrics.
+"""
+from collections import defaultdict
+
+
+class Metrics:
+    def __init__(self):
+        self.counters: dict[str, float] = defaultdict(float)
+        self.gauges = {}
+
+    def incr(self, name: str, value: float = 1):
+        self.counters[name] += value
+
+    def gauge(self, name: str, fn):
+        """Registers a callable read at snapshot time (e.g. a cache size)."""
+        self.gauges[name] = fn
+
+    def snapshot(self) -> dict:
+        data = dict(self.counters)
+        for name, fn in self.gauges.items():
+            try:
+                data[name] = fn()
+            except Exception as e:
+                print(f"Metric gauge {name} failed: {e}")
+        return dict(sorted(data.items()))
+
+
+metrics = Metrics()
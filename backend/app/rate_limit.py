@@ -0,0 +1,51 @@
+"""
+Token-bucket rate limiting for calls to metered upstream APIs.
+"""
+import asyncio
+import time
+from app.metrics import metrics
+
+
+class RateLimited(Exception):
+    """No token could be had before the caller's deadline."""
+
+
+class TokenBucket:
+    """
+    `rate` tokens per second, up to `burst` saved up. A caller that finds the
+    bucket empty reserves the next token (the count goes negative) and sleeps
+    until it is due, so waiters are served in arrival order without a lock.
+    """
+
+    def __init__(self, rate: float, burst: int, name: str = "rate_limit"):
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _fill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, deadline: float = None) -> bool:
+        """
+        Waits for a token. Returns False straight away, without taking one, if
+        it would not be available before `deadline` (a time.monotonic() value).
+        """
+        now = time.monotonic()
+        self._fill(now)
+        wait = max(1 - self.tokens, 0) / self.rate
+        if deadline is not None and now + wait > deadline:
+            metrics.incr(f"{self.name}.rejected")
+            return False
+        self.tokens -= 1
+        if wait > 0:
+            metrics.incr(f"{self.name}.waited_ms", wait * 1000)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Hand the reserved token back to whoever is next
+                self.tokens += 1
+                raise
+        return True
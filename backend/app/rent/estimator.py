@@ -1,16 +1,15 @@
 from google import genai
 from google.genai import types
-from app.config import settings
 import json
 
 class RentEstimator:
-    def __init__(self):
-        if not settings.GEMINI_API_KEY:
+    def __init__(self, client: genai.Client | None):
+        if client is None:
             raise ValueError("Gemini API Key is missing")
-        self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        self.client = client
         self.model = "gemini-3-flash-preview" # Updated to user-requested preview model
 
-    def estimate_rent(self, zip_code: str, bedrooms: int, state: str) -> dict:
+    async def estimate_rent(self, zip_code: str, bedrooms: int, state: str) -> dict:
         """
         Estimates market rent using Gemini 3 Flash Preview knowledge.
         """
@@ -26,7 +25,7 @@ class RentEstimator:
         """
         
         try:
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model=self.model,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -2,29 +2,44 @@
 Rent Radar — You.com Search API integration for comparable rental listings.
 Searches live listings, calculates overpayment, and provides market context.
 """
-import requests
+import asyncio
+import httpx
 import json
 from app.config import settings
+from app.rate_limit import TokenBucket
+from app.search_cache import SearchCache
+from app.single_flight import SingleFlight
 from google import genai
 from google.genai import types
 
 
 class RentRadar:
-    def __init__(self):
+    def __init__(self, http: httpx.AsyncClient, gemini: genai.Client | None, cache: SearchCache = None,
+                 limiter: TokenBucket = None):
+        self.http = http
+        self.cache = cache
+        self.limiter = limiter
+        self.flights = SingleFlight("you_com_market")
+        # Whole comparables lookups (two searches and a Gemini parse) for the same area
+        self.comparables_flights = SingleFlight("rent_comparables")
         self.api_key = settings.YOU_COM_API_KEY
-        self.base_url = "https://chat-api.you.com/smart"
-        
-        if settings.GEMINI_API_KEY:
-            self.gemini = genai.Client(api_key=settings.GEMINI_API_KEY)
+        self.base_url = settings.YOU_COM_BASE_URL
+        self.gemini = gemini
 
-    def search_comparables(self, zip_code: str, bedrooms: int, state: str, city: str = None) -> dict:
+    async def search_comparables(self, zip_code: str, bedrooms: int, state: str, city: str = None) -> dict:
         """
         Uses You.com Search API to find comparable rental listings and market data.
-        Returns structured market analysis.
+        Returns structured market analysis. Concurrent lookups for the same area share one.
         """
+        key = "|".join(str(part).strip().lower() for part in (zip_code, bedrooms, state, city or ""))
+        return await self.comparables_flights.do(
+            key, lambda: self._search_comparables(zip_code, bedrooms, state, city)
+        )
+
+    async def _search_comparables(self, zip_code: str, bedrooms: int, state: str, city: str = None) -> dict:
         if not self.api_key:
             print("You.com API key missing, falling back to Gemini estimate")
-            return self._gemini_fallback(zip_code, bedrooms, state, city)
+            return await self._gemini_fallback(zip_code, bedrooms, state, city)
 
         location_str = f"{city + ', ' if city else ''}{state} {zip_code}"
 
@@ -39,13 +54,16 @@ class RentRadar:
             f"average rent {bedrooms} bedroom apartment {location_str} 2025 2026 median rent"
         )
 
-        listings_result = self._you_search(listings_query)
-        market_result = self._you_search(market_query)
+        # Both searches are independent, so run them concurrently
+        listings_result, market_result = await asyncio.gather(
+            self._you_search(listings_query, "listings"),
+            self._you_search(market_query, "market"),
+        )
 
         # Use Gemini to parse the search results into structured data
-        return self._parse_results(listings_result, market_result, zip_code, bedrooms, state, city)
+        return await self._parse_results(listings_result, market_result, zip_code, bedrooms, state, city)
 
-    def search_rent_laws(self, state: str, zip_code: str) -> dict:
+    async def search_rent_laws(self, state: str, zip_code: str) -> dict:
         """
         Searches for rent control / increase limits for the area.
         """
@@ -53,7 +71,7 @@ class RentRadar:
             return {"rent_control": "unknown", "sources": []}
 
         query = f"rent increase limits {state} tenant rights rent control laws 2025 2026 zip code {zip_code}"
-        result = self._you_search(query)
+        result = await self._you_search(query, "rent_laws")
         return {
             "raw_answer": result.get("answer", ""),
             "sources": [
@@ -62,10 +80,24 @@ class RentRadar:
             ]
         }
 
-    def _you_search(self, query: str) -> dict:
+    async def _you_search(self, query: str, kind: str) -> dict:
         """
-        Calls You.com Smart API (chat mode with web search).
+        Calls You.com Smart API (chat mode with web search), through the shared search cache.
+        Identical searches made at the same time share one call.
         """
+        return await self.flights.do(SearchCache.key(kind, query), lambda: self._you_search_cached(query, kind))
+
+    async def _you_search_cached(self, query: str, kind: str) -> dict:
+        if self.cache:
+            cached = await self.cache.get(kind, query)
+            if cached is not None:
+                return cached
+        result = await self._you_search_uncached(query)
+        if self.cache:
+            await self.cache.put(kind, query, result)
+        return result
+
+    async def _you_search_uncached(self, query: str) -> dict:
         headers = {
             "X-API-Key": self.api_key,
             "Content-Type": "application/json"
@@ -76,9 +108,11 @@ class RentRadar:
             "chat_mode": "research"
         }
 
+        if self.limiter:
+            await self.limiter.acquire()
         try:
-            response = requests.post(self.base_url, headers=headers, json=payload, timeout=30)
-            if response.ok:
+            response = await self.http.post(self.base_url, headers=headers, json=payload, timeout=30)
+            if response.is_success:
                 return response.json()
             else:
                 print(f"You.com API Error: {response.status_code} - {response.text}")
@@ -87,7 +121,7 @@ class RentRadar:
             print(f"You.com Search Error: {e}")
             return {"answer": "", "hits": []}
 
-    def _parse_results(self, listings: dict, market: dict, zip_code: str, bedrooms: int, state: str, city: str = None) -> dict:
+    async def _parse_results(self, listings: dict, market: dict, zip_code: str, bedrooms: int, state: str, city: str = None) -> dict:
         """
         Uses Gemini to extract structured rent data from You.com search results.
         """
@@ -121,7 +155,7 @@ class RentRadar:
         """
 
         try:
-            response = self.gemini.models.generate_content(
+            response = await self.gemini.aio.models.generate_content(
                 model="gemini-3-flash-preview",
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -132,9 +166,9 @@ class RentRadar:
             return json.loads(response.text)
         except Exception as e:
             print(f"Gemini parse error: {e}")
-            return self._gemini_fallback(zip_code, bedrooms, state)
+            return await self._gemini_fallback(zip_code, bedrooms, state)
 
-    def _gemini_fallback(self, zip_code: str, bedrooms: int, state: str, city: str = None) -> dict:
+    async def _gemini_fallback(self, zip_code: str, bedrooms: int, state: str, city: str = None) -> dict:
         """Fallback when You.com is unavailable."""
         location_str = f"{city + ', ' if city else ''}{state} {zip_code}"
         prompt = f"""
@@ -144,7 +178,7 @@ class RentRadar:
         "market_summary": "string"}}
         """
         try:
-            response = self.gemini.models.generate_content(
+            response = await self.gemini.aio.models.generate_content(
                 model="gemini-3-flash-preview",
                 contents=prompt,
                 config=types.GenerateContentConfig(response_mime_type="application/json")
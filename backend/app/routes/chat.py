@@ -1,15 +1,19 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi import APIRouter, HTTPException, Depends
 from app.chat.voice_service import DeepgramService
 from app.chat.bot import LegalChatBot
 from app.sanity_client.client import SanityClient
+from app.dependencies import get_deepgram, get_chat_bot, get_sanity
+from app.uploads import IngestedUpload, AUDIO_UPLOAD, ingest, multipart_openapi
 import base64
 
 router = APIRouter()
 
-@router.post("/chat/voice")
+@router.post("/chat/voice", openapi_extra=multipart_openapi(lease_id=False))
 async def voice_chat(
-    file: UploadFile = File(...),
-    lease_id: str = Form(None)
+    upload: IngestedUpload = Depends(ingest(AUDIO_UPLOAD)),
+    dg_service: DeepgramService = Depends(get_deepgram),
+    bot: LegalChatBot = Depends(get_chat_bot),
+    sanity: SanityClient = Depends(get_sanity),
 ):
     """
     Voice-enabled legal Q&A with optional lease context.
@@ -19,16 +23,12 @@ async def voice_chat(
     4. Generate speech response (Deepgram Aura)
     """
     
-    # 1. Read Audio
-    try:
-        audio_bytes = await file.read()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error reading audio: {e}")
+    # 1. Audio was streamed to a spool by the ingest dependency (size/type already checked)
+    lease_id = upload.fields.get("lease_id") or None
 
     # 2. Transcribe (STT)
-    dg_service = DeepgramService()
     try:
-        transcript = dg_service.transcribe_audio(audio_bytes, mimetype=file.content_type or "audio/webm")
+        transcript = await dg_service.transcribe_audio(upload.view(), mimetype=upload.content_type or "audio/webm")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"STT Failed: {e}")
 
@@ -36,27 +36,25 @@ async def voice_chat(
         raise HTTPException(status_code=400, detail="Could not understand audio.")
 
     # 3. Get Answer (LLM) — with or without lease context
-    bot = LegalChatBot()
     try:
         if lease_id:
             # Fetch the user's stored lease clauses from Sanity
-            sanity = SanityClient()
-            lease_data = sanity.get_analysis(lease_id)
+            lease_data = await sanity.get_analysis(lease_id)
             
             if lease_data:
                 clauses = lease_data.get("extractedClauses", [])
                 state = lease_data.get("state", "CA")
-                answer = bot.get_lease_answer(transcript, clauses, state)
+                answer = await bot.get_lease_answer(transcript, clauses, state)
             else:
-                answer = bot.get_legal_answer(transcript)
+                answer = await bot.get_legal_answer(transcript)
         else:
-            answer = bot.get_legal_answer(transcript)
+            answer = await bot.get_legal_answer(transcript)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"LLM Failed: {e}")
 
     # 4. Generate Speech (TTS)
     try:
-        audio_response_bytes = dg_service.generate_speech(answer)
+        audio_response_bytes = await dg_service.generate_speech(answer)
         audio_base64 = base64.b64encode(audio_response_bytes).decode("utf-8")
     except Exception as e:
         # Fallback to text-only if TTS fails
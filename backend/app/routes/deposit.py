@@ -1,37 +1,32 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from app.deposit_defender.video_processor import VideoProcessor
 from app.deposit_defender.defect_detector import DefectDetector
 from app.deposit_defender.report_builder import ReportBuilder
+from app.dependencies import get_defect_detector, get_report_builder
+from app.uploads import IngestedUpload, VIDEO_UPLOAD, ingest, multipart_openapi
 import shutil
-import tempfile
-import os
 import traceback
 
 router = APIRouter()
 
-@router.post("/deposit/upload")
-async def upload_video(file: UploadFile = File(...)):
+@router.post("/deposit/upload", openapi_extra=multipart_openapi())
+async def upload_video(
+    upload: IngestedUpload = Depends(ingest(VIDEO_UPLOAD)),
+    detector: DefectDetector = Depends(get_defect_detector),
+    builder: ReportBuilder = Depends(get_report_builder),
+):
     # ...
     
-    # 1. Read file
-    try:
-        file_bytes = await file.read()
-    except Exception as e:
-        print(f"Error reading file: {e}")
-        traceback.print_exc()
-        raise HTTPException(status_code=400, detail=f"Error reading file: {e}")
+    # 1. Video was streamed to a temp file by the ingest dependency (size/type already checked)
 
     # 2. Extract Key Frames (OpenCV)
     processor = VideoProcessor()
     try:
-        # Use temp file for OpenCV
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as temp:
-            temp.write(file_bytes)
-            temp_path = temp.name
-        
-        frames = processor.extract_key_frames(temp_path)
-        os.remove(temp_path)
-        
+        # OpenCV reads the spooled upload in place; decoding is CPU-bound, keep it off the event loop
+        video_path = await run_in_threadpool(upload.path)
+        frames = await run_in_threadpool(processor.extract_key_frames, video_path)
+
     except Exception as e:
         print(f"Video processing failed: {e}")
         traceback.print_exc()
@@ -40,7 +35,6 @@ async def upload_video(file: UploadFile = File(...)):
     # ...
 
     # 3. Detect Defects (GPT-4o Vision / Gemini)
-    detector = DefectDetector()
     try:
         # Limit frames for hackathon demo to avoid timeout/cost
         # Pick max 5 frames for now
@@ -51,7 +45,7 @@ async def upload_video(file: UploadFile = File(...)):
 
         defects = []
         for ts, frame_bytes in frames:
-            result = detector.analyze_frame(frame_bytes, ts)
+            result = await detector.analyze_frame(frame_bytes, ts)
             if result:
                 result["image_bytes"] = frame_bytes 
                 defects.append(result)
@@ -62,9 +56,8 @@ async def upload_video(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"AI Defect Detection failed: {e}")
 
     # 4. Build Report (Sanity)
-    builder = ReportBuilder()
     try:
-        report_id = builder.create_report(defects)
+        report_id = await builder.create_report(defects)
     except Exception as e:
         print(f"Report generation failed: {e}")
         traceback.print_exc()
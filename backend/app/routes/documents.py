@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, HTTPException, Response, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from app.documents.foxit_docgen import FoxitDocGenClient
 from app.sanity_client.client import SanityClient
 from app.law_engine.youcom_legal import YouComLegalSearch
+from app.law_engine.batch_verify import BatchVerifier, clause_id
+from app.dependencies import get_docgen, get_sanity, get_legal_search, get_batch_verifier
+from app.streaming import prime_stream
 
 router = APIRouter()
 
@@ -19,32 +23,55 @@ class NegotiationLetterRequest(BaseModel):
     marketAverage: float
     state: str
 
-@router.post("/generate/counter-letter")
-async def generate_counter_letter(request: CounterLetterRequest):
+def _apply_verification(clause: dict, verification: dict):
+    """Enhances the clause in place with the real legal sources and citation found."""
+    if verification.get("sources"):
+        clause["verified_sources"] = verification["sources"]
+    if verification.get("legal_analysis"):
+        clause["legal_analysis"] = verification["legal_analysis"]
+    if verification.get("citation"):
+        clause["citation"] = verification["citation"]
+
+async def _verify_clause(legal_search: YouComLegalSearch, state: str, clause: dict):
     """
-    Generates a counter-letter PDF for a specific clause.
-    Uses You.com to verify legal citations before generating.
+    Enhances the clause in place with real legal sources from You.com.
+    Verification is best effort; the letter is still generated without it.
     """
-    # 1. Verify legal reference with You.com
-    legal_search = YouComLegalSearch()
     try:
-        verification = legal_search.verify_red_flag(
-            request.state,
-            request.clause.get("clauseType", ""),
-            request.clause.get("originalText", "")
+        verification = await legal_search.verify_red_flag(
+            state,
+            clause.get("clauseType", ""),
+            clause.get("originalText", "")
         )
-        # Enhance clause with real legal sources
-        if verification.get("sources"):
-            request.clause["verified_sources"] = verification["sources"]
-        if verification.get("legal_analysis"):
-            request.clause["legal_analysis"] = verification["legal_analysis"]
+        _apply_verification(clause, verification)
     except Exception as e:
         print(f"You.com verification skipped: {e}")
 
+async def _get_analysis(sanity: SanityClient, analysis_id: str) -> dict:
+    try:
+        analysis = await sanity.get_analysis(analysis_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Sanity fetch failed: {e}")
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return analysis
+
+@router.post("/generate/counter-letter")
+async def generate_counter_letter(
+    request: CounterLetterRequest,
+    legal_search: YouComLegalSearch = Depends(get_legal_search),
+    client: FoxitDocGenClient = Depends(get_docgen),
+):
+    """
+    Generates a counter-letter PDF for a specific clause.
+    Uses You.com to verify legal citations before generating.
+    """
+    # 1. Verify legal reference with You.com
+    await _verify_clause(legal_search, request.state, request.clause)
+
     # 2. Generate PDF
-    client = FoxitDocGenClient()
     try:
-        pdf_bytes = client.create_counter_letter(
+        pdf_bytes = await client.create_counter_letter(
             request.tenantName,
             request.landlordName,
             request.clause,
@@ -59,15 +86,73 @@ async def generate_counter_letter(request: CounterLetterRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/generate/counter-letters/{analysis_id}")
+async def generate_counter_letters(
+    analysis_id: str,
+    tenantName: str | None = None,
+    landlordName: str | None = None,
+    sanity: SanityClient = Depends(get_sanity),
+    verifier: BatchVerifier = Depends(get_batch_verifier),
+    client: FoxitDocGenClient = Depends(get_docgen),
+):
+    """
+    Generates one PDF with a counter-letter for every red-flag clause of a stored analysis.
+    Clauses are verified as one batch (concurrent, rate-limited, with a deadline) and
+    rendered in a single conversion.
+    """
+    analysis = await _get_analysis(sanity, analysis_id)
+
+    clauses = [c for c in analysis.get("extractedClauses") or [] if c.get("riskLevel") == "red"]
+    if not clauses:
+        raise HTTPException(status_code=404, detail="No red-flag clauses in this analysis")
+
+    state = analysis.get("state") or "CA"
+    verifications = await verifier.verify(clauses, state, levels=("red",))
+    for clause in clauses:
+        _apply_verification(clause, verifications.get(clause_id(clause), {}))
+
+    try:
+        pdf_bytes = await client.create_counter_letters(
+            tenantName or analysis.get("tenantName") or "Tenant",
+            landlordName or analysis.get("landlordName") or "Landlord",
+            clauses,
+            state
+        )
+        return Response(
+            content=pdf_bytes,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f"attachment; filename=counter_letters_{analysis_id}.pdf"}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/verify/{analysis_id}")
+async def verify_analysis(
+    analysis_id: str,
+    sanity: SanityClient = Depends(get_sanity),
+    verifier: BatchVerifier = Depends(get_batch_verifier),
+):
+    """
+    Verifies all red and yellow clauses of a stored analysis against state law at once.
+    Results are keyed by clause_id(); clauses that miss the deadline come back
+    with status "timeout".
+    """
+    analysis = await _get_analysis(sanity, analysis_id)
+    state = analysis.get("state") or "CA"
+    results = await verifier.verify(analysis.get("extractedClauses") or [], state)
+    return {"analysisId": analysis_id, "state": state, "results": results}
+
 @router.get("/generate/report/{report_id}")
-async def generate_condition_report_pdf(report_id: str):
+async def generate_condition_report_pdf(
+    report_id: str,
+    sanity: SanityClient = Depends(get_sanity),
+    client: FoxitDocGenClient = Depends(get_docgen),
+):
     """
     Fetches condition report data from Sanity and generates a PDF.
     """
-    sanity = SanityClient()
-    
     try:
-        data = sanity.get_condition_report(report_id)
+        data = await sanity.get_condition_report(report_id)
         if not data:
             raise HTTPException(status_code=404, detail="Report not found")
     except HTTPException:
@@ -75,12 +160,11 @@ async def generate_condition_report_pdf(report_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Sanity fetch failed: {e}")
 
-    client = FoxitDocGenClient()
     try:
-        pdf_bytes = client.create_condition_report(data)
-        
-        return Response(
-            content=pdf_bytes,
+        html = await client.condition_report_html(data)
+        pdf = await prime_stream(client.stream_pdf(html))
+        return StreamingResponse(
+            pdf,
             media_type="application/pdf",
             headers={"Content-Disposition": f"attachment; filename=condition_report_{report_id}.pdf"}
         )
@@ -88,23 +172,25 @@ async def generate_condition_report_pdf(report_id: str):
         raise HTTPException(status_code=500, detail=f"PDF Generation failed: {e}")
 
 @router.post("/generate/negotiation-letter")
-async def generate_negotiation_letter(request: NegotiationLetterRequest):
+async def generate_negotiation_letter(
+    request: NegotiationLetterRequest,
+    legal_search: YouComLegalSearch = Depends(get_legal_search),
+    client: FoxitDocGenClient = Depends(get_docgen),
+):
     """
     Generates a rent negotiation letter PDF based on market data analysis.
     """
     # Get rent laws for the area
-    legal_search = YouComLegalSearch()
     try:
-        rent_laws = legal_search.search_statute(request.state, "rent_increase", "")
+        rent_laws = await legal_search.search_statute(request.state, "rent_increase", "")
         legal_context = rent_laws.get("explanation", "")
         citation = rent_laws.get("citation", "")
     except Exception:
         legal_context = ""
         citation = ""
 
-    client = FoxitDocGenClient()
     try:
-        pdf_bytes = client.create_negotiation_letter(
+        pdf_bytes = await client.create_negotiation_letter(
             request.tenantName,
             request.landlordName,
             request.currentRent,
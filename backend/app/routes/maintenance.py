@@ -1,20 +1,26 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from fastapi.responses import Response
+from fastapi import APIRouter, HTTPException, Form, Depends
+from fastapi.responses import StreamingResponse
 from app.chat.voice_service import DeepgramService
 from app.voice_qa.maintenance import MaintenanceDocumenter
 from app.documents.foxit_docgen import FoxitDocGenClient
 from app.sanity_client.client import SanityClient
+from app.dependencies import get_deepgram, get_maintenance_documenter, get_docgen, get_sanity
+from app.streaming import prime_stream
+from app.uploads import IngestedUpload, AUDIO_UPLOAD, ingest, multipart_openapi
 import base64
 
 router = APIRouter()
 
 
-@router.post("/maintenance/report")
+@router.post(
+    "/maintenance/report",
+    openapi_extra=multipart_openapi(tenant_name=False, landlord_name=False, property_address=False),
+)
 async def create_maintenance_request(
-    file: UploadFile = File(...),
-    tenant_name: str = Form("Tenant"),
-    landlord_name: str = Form("Property Manager"),
-    property_address: str = Form(""),
+    upload: IngestedUpload = Depends(ingest(AUDIO_UPLOAD)),
+    dg: DeepgramService = Depends(get_deepgram),
+    documenter: MaintenanceDocumenter = Depends(get_maintenance_documenter),
+    foxit: FoxitDocGenClient = Depends(get_docgen),
 ):
     """
     Voice-first maintenance request documenter.
@@ -23,17 +29,15 @@ async def create_maintenance_request(
     3. Generate professional PDF via Foxit
     4. Return structured data + PDF download
     """
-    # 1. Read audio
-    try:
-        audio_bytes = await file.read()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error reading audio: {e}")
+    # 1. Audio was streamed to a spool by the ingest dependency (size/type already checked)
+    tenant_name = upload.field("tenant_name", "Tenant")
+    landlord_name = upload.field("landlord_name", "Property Manager")
+    property_address = upload.field("property_address", "")
 
     # 2. Transcribe with Audio Intelligence
-    dg = DeepgramService()
     try:
-        intelligence = dg.transcribe_with_intelligence(
-            audio_bytes, mimetype=file.content_type or "audio/webm"
+        intelligence = await dg.transcribe_with_intelligence(
+            upload.view(), mimetype=upload.content_type or "audio/webm"
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Transcription failed: {e}")
@@ -43,8 +47,7 @@ async def create_maintenance_request(
         raise HTTPException(status_code=400, detail="Could not understand audio.")
 
     # 3. Structure into maintenance request
-    documenter = MaintenanceDocumenter()
-    request_data = documenter.structure_request(
+    request_data = await documenter.structure_request(
         transcript,
         topics=intelligence.get("topics", []),
         intents=intelligence.get("intents", [])
@@ -59,9 +62,8 @@ async def create_maintenance_request(
     )
 
     # 5. Generate PDF via Foxit
-    foxit = FoxitDocGenClient()
     try:
-        pdf_bytes = foxit.generate_pdf(html, {})
+        pdf_bytes = await foxit.generate_pdf(html, {})
         pdf_base64 = base64.b64encode(pdf_bytes).decode("utf-8")
     except Exception as e:
         print(f"PDF generation failed, returning data without PDF: {e}")
@@ -70,7 +72,7 @@ async def create_maintenance_request(
     # 6. Generate TTS summary for accessibility
     try:
         summary_text = f"Maintenance request created. {request_data['title']}. Urgency: {request_data['urgency']}. {request_data['description']}"
-        audio_response = dg.generate_speech(summary_text)
+        audio_response = await dg.generate_speech(summary_text)
         audio_base64 = base64.b64encode(audio_response).decode("utf-8")
     except Exception as e:
         print(f"TTS failed: {e}")
@@ -90,17 +92,16 @@ async def create_maintenance_request(
 
 
 @router.post("/tts/read-aloud")
-async def read_aloud(text: str = Form(...)):
+async def read_aloud(text: str = Form(...), dg: DeepgramService = Depends(get_deepgram)):
     """
     Text-to-Speech endpoint using Deepgram Aura-2.
     Converts any text to spoken audio (mp3).
     Use cases: read analysis results, counter-letters, rights summaries.
     """
-    dg = DeepgramService()
     try:
-        audio_bytes = dg.read_aloud(text)
-        return Response(
-            content=audio_bytes,
+        audio = await prime_stream(dg.read_aloud_stream(text))
+        return StreamingResponse(
+            audio,
             media_type="audio/mpeg",
             headers={"Content-Disposition": "inline; filename=read_aloud.mp3"}
         )
@@ -109,14 +110,17 @@ async def read_aloud(text: str = Form(...)):
 
 
 @router.post("/tts/read-analysis/{analysis_id}")
-async def read_analysis_aloud(analysis_id: str):
+async def read_analysis_aloud(
+    analysis_id: str,
+    sanity: SanityClient = Depends(get_sanity),
+    dg: DeepgramService = Depends(get_deepgram),
+):
     """
     Reads a lease analysis result aloud using Deepgram Aura-2 TTS.
     Summarizes clauses and provides voice-first accessibility.
     """
-    sanity = SanityClient()
     try:
-        analysis = sanity.get_analysis(analysis_id)
+        analysis = await sanity.get_analysis(analysis_id)
         if not analysis:
             raise HTTPException(status_code=404, detail="Analysis not found")
     except HTTPException:
@@ -151,11 +155,10 @@ async def read_analysis_aloud(analysis_id: str):
     
     full_text = " ".join(text_parts)
     
-    dg = DeepgramService()
     try:
-        audio_bytes = dg.read_aloud(full_text)
-        return Response(
-            content=audio_bytes,
+        audio = await prime_stream(dg.read_aloud_stream(full_text))
+        return StreamingResponse(
+            audio,
             media_type="audio/mpeg",
             headers={"Content-Disposition": "inline; filename=analysis_audio.mp3"}
         )
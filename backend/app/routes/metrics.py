@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from app.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Cache hit rates, bytes saved and other counters for this worker process.
+    """
+    return metrics.snapshot()
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from app.rent_radar.comparables import RentRadar
+from app.dependencies import get_rent_radar
 
 router = APIRouter()
 
@@ -12,17 +13,16 @@ class RentRequest(BaseModel):
     price: float
 
 @router.post("/rent/analyze")
-async def analyze_rent(request: RentRequest):
+async def analyze_rent(request: RentRequest, radar: RentRadar = Depends(get_rent_radar)):
     """
     Analyzes rent fairness using You.com Search API for real market data.
     """
-    radar = RentRadar()
     try:
         # 1. Get market data from You.com
-        market_data = radar.search_comparables(request.zipCode, request.bedrooms, request.state, request.city)
+        market_data = await radar.search_comparables(request.zipCode, request.bedrooms, request.state, request.city)
         
         # 2. Get rent control info from You.com
-        rent_laws = radar.search_rent_laws(request.state, request.zipCode)
+        rent_laws = await radar.search_rent_laws(request.state, request.zipCode)
         
         avg_price = market_data.get("average", 0)
         user_price = request.price
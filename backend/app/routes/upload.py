@@ -1,8 +1,21 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from app.documents.foxit_extract import FoxitClient
-from app.lease_analysis.analyzer import LeaseAnalyzer
+from app.lease_analysis.analyzer import AnalysisIncomplete, LeaseAnalyzer
 from app.sanity_client.client import SanityClient
-from app.config import settings
+from app.dependencies import get_foxit, get_lease_analyzer, get_sanity, get_gemini, get_red_flags
+from app.lease_analysis.red_flags import RedFlagRegistry, prescreen
+from app.lease_analysis.lease_classifier import classify_lease
+from app.lease_analysis.compaction import CompactedText, compact_lease
+from app.lease_analysis.revisions import fingerprint
+from app.uploads import IngestedUpload, PDF_UPLOAD, ingest, multipart_openapi
+from app.speculation import SpeculationRejected, speculate
+from app.streaming import SSE_HEADERS, sse
+from app.metrics import metrics
+from contextlib import aclosing
+import asyncio
+import re
+import time
 from google import genai
 from google.genai import types
 import shutil
@@ -11,14 +24,15 @@ import tempfile
 
 router = APIRouter()
 
+# Texts longer than this are scanned for red-flag patterns off the event loop
+PRESCREEN_THREAD_CHARS = 20000
 
-def _validate_is_lease(text: str) -> bool:
+
+async def _gemini_is_lease(client: genai.Client | None, text: str) -> bool:
     """Quick Gemini check to verify the document is a genuine lease/rental agreement."""
-    try:
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=f"""Analyze the following document text and determine if it is a residential lease, rental agreement, or tenancy contract.
+    response = await client.aio.models.generate_content(
+        model="gemini-2.0-flash",
+        contents=f"""Analyze the following document text and determine if it is a residential lease, rental agreement, or tenancy contract.
 
 Reply with ONLY "yes" or "no" — nothing else.
 
@@ -26,70 +40,253 @@ DOCUMENT TEXT (first 2000 chars):
 \"\"\"
 {text[:2000]}
 \"\"\"""",
-            config=types.GenerateContentConfig(
-                temperature=0.0,
-            )
+        config=types.GenerateContentConfig(
+            temperature=0.0,
         )
-        answer = response.text.strip().lower()
-        return answer.startswith("yes")
-    except Exception as e:
-        print(f"Lease validation check failed, allowing through: {e}")
-        return True  # Fail open — don't block if validation itself errors
+    )
+    answer = response.text.strip().lower()
+    return answer.startswith("yes")
 
 
-@router.post("/analyze")
-async def analyze_lease(
-    file: UploadFile = File(...),
-    state: str = Form(...)  # State is required for legal context
-):
+async def _validate_is_lease(client: genai.Client | None, text: str) -> bool:
     """
-    Uploads a lease PDF, extracts text via Foxit, validates it's a real lease,
-    analyzes via Gemini, and saves to Sanity.
+    Local classifier first; Gemini is only asked about documents the classifier
+    is unsure of, and if that call fails the classifier's leaning decides.
     """
-    
-    # 1. Read file
+    check = classify_lease(text)
+    if check.is_lease is not None:
+        metrics.incr("lease_check.local_accepted" if check.is_lease else "lease_check.local_rejected")
+        return check.is_lease
+    metrics.incr("lease_check.gemini_calls")
     try:
-        file_content = await file.read()
+        return await _gemini_is_lease(client, text)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error reading file: {str(e)}")
+        print(f"Lease validation check failed, using local estimate {check.probability:.2f}: {e}")
+        metrics.incr("lease_check.gemini_failed")
+        return check.leaning
 
-    # 2. Extract Text using Foxit
-    foxit_client = FoxitClient()
+
+async def _extract_lease_text(foxit_client: FoxitClient, upload: IngestedUpload, filename: str) -> str:
     try:
-        filename = file.filename or "lease.pdf"
-        extracted_text = foxit_client.extract_text(file_content, filename)
+        extracted_text = await foxit_client.extract_text(upload.view(), filename, content_hash=upload.sha256)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Foxit Extraction failed: {str(e)}")
 
     if not extracted_text:
         raise HTTPException(status_code=400, detail="Could not extract text from PDF. It might be empty or image-only.")
-    
+
     print(f"Extracted Text Length: {len(extracted_text)}")
+    return extracted_text
+
+
+def _compact(text: str) -> CompactedText:
+    """Strips headers, footers and blank-filling from the extracted text and logs the saving."""
+    compacted = compact_lease(text)
+    before, after = compacted.token_estimate(LeaseAnalyzer.CHARS_PER_TOKEN)
+    metrics.incr("compaction.documents")
+    metrics.incr("compaction.tokens_before", before)
+    metrics.incr("compaction.tokens_after", after)
+    print(f"Compacted lease text: ~{before} -> ~{after} tokens "
+          f"({1 - after / max(before, 1):.0%} saved, {compacted.removed_lines} lines dropped)")
+    return compacted
+
+
+def _with_source(compacted: CompactedText, clause: dict) -> dict:
+    """Adds where the quoted clause sits in the extracted (uncompacted) text."""
+    span = compacted.locate(clause.get("originalText") or "")
+    if span:
+        clause["sourceStart"], clause["sourceEnd"] = span
+    else:
+        # Clauses reused from an earlier revision may carry offsets into its text
+        clause.pop("sourceStart", None)
+        clause.pop("sourceEnd", None)
+    return clause
+
+
+async def _previous_analysis(sanity_client: SanityClient, analysis_id: str) -> dict:
+    """The stored analysis a revised lease is diffed against."""
+    if not re.fullmatch(r"[\w.-]+", analysis_id):
+        raise HTTPException(status_code=422, detail="Invalid previous_analysis_id")
+    try:
+        previous = await sanity_client.get_analysis(analysis_id)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Loading previous analysis failed: {str(e)}")
+    if not previous:
+        raise HTTPException(status_code=404, detail="Previous analysis not found")
+    return previous
+
+
+async def _prescreen(red_flags: RedFlagRegistry, text: str, state: str) -> dict:
+    """
+    Local red-flag pattern hits, available before Gemini answers. Callers run
+    it as a task next to the analysis, since the index may need a Sanity refresh.
+    """
+    index = await red_flags.index()
+    if len(text) > PRESCREEN_THREAD_CHARS:
+        hits = await asyncio.to_thread(index.scan, text, state)
+    else:
+        hits = index.scan(text, state)
+    return prescreen(hits)
+
 
-    # 3. Validate this is actually a lease document
-    if not _validate_is_lease(extracted_text):
+@router.post("/analyze", openapi_extra=multipart_openapi(state=True, previous_analysis_id=False))
+async def analyze_lease(
+    upload: IngestedUpload = Depends(ingest(PDF_UPLOAD)),
+    foxit_client: FoxitClient = Depends(get_foxit),
+    analyzer: LeaseAnalyzer = Depends(get_lease_analyzer),
+    sanity_client: SanityClient = Depends(get_sanity),
+    gemini: genai.Client | None = Depends(get_gemini),
+    red_flags: RedFlagRegistry = Depends(get_red_flags),
+):
+    """
+    Uploads a lease PDF, extracts text via Foxit, validates it's a real lease,
+    analyzes via Gemini, and saves to Sanity.
+    With previous_analysis_id (a revised version of an analyzed lease) only the
+    changed sections are analyzed, and the response includes a clause-level
+    change report.
+    """
+    
+    # 1. File was streamed to a spool by the ingest dependency (size/type already checked)
+    state = upload.field("state")  # State is required for legal context
+    filename = upload.filename or "lease.pdf"
+    previous_id = upload.field("previous_analysis_id", "")
+    previous = await _previous_analysis(sanity_client, previous_id) if previous_id else None
+
+    # 2. Extract Text using Foxit
+    extracted_text = await _extract_lease_text(foxit_client, upload, filename)
+    compacted = _compact(extracted_text)
+
+    # 3 + 4. Validate this is actually a lease document while the Gemini analysis
+    # (and the local red-flag prescreen) already runs; the analysis is cancelled
+    # if validation says no
+    prescreen_task = asyncio.create_task(_prescreen(red_flags, extracted_text, state))
+    if previous is not None:
+        work = analyzer.reanalyze_lease(compacted.text, state, previous)
+    else:
+        work = analyzer.analyze_lease(compacted.text, state)
+    try:
+        analysis_result = await speculate(
+            _validate_is_lease(gemini, compacted.text),
+            work,
+            "lease_analysis",
+            cost=analyzer.estimate_input_tokens(compacted.text),
+        )
+        preliminary = await prescreen_task
+    except SpeculationRejected:
         raise HTTPException(
             status_code=400,
             detail="This document does not appear to be a residential lease or rental agreement. Please upload a valid lease PDF."
         )
-
-    # 4. Analyze with Gemini
-    analyzer = LeaseAnalyzer()
-    try:
-        analysis_result = analyzer.analyze_lease(extracted_text, state)
+    except AnalysisIncomplete as e:
+        raise HTTPException(status_code=502, detail=f"Re-analysis of the revised lease failed, please try again: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI Analysis failed: {str(e)}")
+    finally:
+        prescreen_task.cancel()
+    changes = None
+    if previous is not None:
+        analysis_result, changes = analysis_result
+        analysis_result["revisionOf"] = previous_id
+    else:
+        fingerprint(compacted.text, analysis_result)
+    for clause in analysis_result.get("extractedClauses") or []:
+        _with_source(compacted, clause)
 
     # 4. Save to Sanity
-    sanity_client = SanityClient()
     try:
         user_id = "demo_user"  # TODO: auth integration
-        doc_id = sanity_client.save_analysis(analysis_result, user_id, filename, state=state)
+        doc_id = await sanity_client.save_analysis(analysis_result, user_id, filename, state=state)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Saving to Sanity failed: {str(e)}")
 
-    return {
+    response = {
         "status": "success",
         "analysisId": doc_id,
-        "results": analysis_result
+        "results": analysis_result,
+        "prescreen": preliminary,
     }
+    if changes is not None:
+        response["changes"] = changes
+    return response
+
+
+# Stream events named after the analysis fields they carry
+_FIELD_EVENTS = {"overallRiskScore": "score", "summary": "summary"}
+
+
+@router.post("/analyze/stream", openapi_extra=multipart_openapi(state=True))
+async def analyze_lease_stream(
+    upload: IngestedUpload = Depends(ingest(PDF_UPLOAD)),
+    foxit_client: FoxitClient = Depends(get_foxit),
+    analyzer: LeaseAnalyzer = Depends(get_lease_analyzer),
+    sanity_client: SanityClient = Depends(get_sanity),
+    gemini: genai.Client | None = Depends(get_gemini),
+    red_flags: RedFlagRegistry = Depends(get_red_flags),
+):
+    """
+    Same pipeline as /analyze, but the analysis comes back as server-sent events:
+    a "prescreen" event with the local red-flag pattern hits, then
+    a "clause" event per extracted clause as soon as Gemini has written it,
+    a "clause_update" ({"index", "clause"}) when a riskier duplicate replaces
+    the index-th clause sent,
+    "details" events for the property/party fields, then "score" and "summary",
+    and finally "done" with the Sanity analysisId (or "error").
+    Extraction errors are still returned as plain HTTP errors.
+    """
+    state = upload.field("state")
+    filename = upload.filename or "lease.pdf"
+    extracted_text = await _extract_lease_text(foxit_client, upload, filename)
+    compacted = _compact(extracted_text)
+
+    async def events():
+        metrics.incr("analysis_stream.requests")
+        # Validation and the prescreen run alongside the analysis; nothing is sent
+        # until validation passes. The tasks are created here, not before the
+        # response starts, so the finally below always gets to cancel them.
+        validation = asyncio.create_task(_validate_is_lease(gemini, compacted.text))
+        prescreening = asyncio.create_task(_prescreen(red_flags, extracted_text, state))
+        start = time.perf_counter()
+        validated = False
+        first_clause = True
+        try:
+            async with aclosing(analyzer.stream_lease(compacted.text, state)) as analysis:
+                async for kind, payload in analysis:
+                    if not validated:
+                        if not await validation:
+                            metrics.incr("analysis_stream.rejected")
+                            yield sse("error", {"detail": "This document does not appear to be a residential lease or rental agreement. Please upload a valid lease PDF."})
+                            return
+                        validated = True
+                        yield sse("prescreen", await prescreening)
+
+                    if kind == "clause":
+                        if first_clause:
+                            metrics.incr("analysis_stream.first_clause_ms", (time.perf_counter() - start) * 1000)
+                            first_clause = False
+                        yield sse("clause", _with_source(compacted, payload))
+                    elif kind == "clause_update":
+                        index, clause = payload
+                        yield sse("clause_update", {"index": index, "clause": _with_source(compacted, clause)})
+                    elif kind == "field":
+                        name, value = payload
+                        event = _FIELD_EVENTS.get(name, "details")
+                        yield sse(event, {name: value} if event == "details" else value)
+                    elif kind == "result":
+                        fingerprint(compacted.text, payload)
+                        for clause in payload.get("extractedClauses") or []:
+                            _with_source(compacted, clause)
+                        try:
+                            user_id = "demo_user"  # TODO: auth integration
+                            doc_id = await sanity_client.save_analysis(payload, user_id, filename, state=state)
+                        except Exception as e:
+                            yield sse("error", {"detail": f"Saving to Sanity failed: {str(e)}"})
+                            return
+                        yield sse("done", {"analysisId": doc_id, "clauseCount": len(payload.get("extractedClauses") or [])})
+        except Exception as e:
+            print(f"Analysis stream failed: {e}")
+            yield sse("error", {"detail": f"AI Analysis failed: {str(e)}"})
+        finally:
+            validation.cancel()
+            prescreening.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -1,4 +1,4 @@
-import requests
+import httpx
 import json
 import urllib.parse
 from datetime import datetime
@@ -7,14 +7,15 @@ import uuid
 
 
 class SanityClient:
-    def __init__(self):
+    def __init__(self, http: httpx.AsyncClient):
+        self.http = http
         self.project_id = settings.SANITY_PROJECT_ID
         self.dataset = settings.SANITY_DATASET
         self.token = settings.SANITY_API_TOKEN
         self.api_version = "2024-02-18"
         self.base_url = f"https://{self.project_id}.api.sanity.io/v{self.api_version}/data/mutate/{self.dataset}"
 
-    def _query(self, groq_query: str, params: dict = None) -> any:
+    async def _query(self, groq_query: str, params: dict = None) -> any:
         """
         Generic Sanity GROQ query method.
         """
@@ -30,11 +31,11 @@ class SanityClient:
             "Authorization": f"Bearer {self.token}",
         }
         
-        response = requests.get(url, headers=headers)
+        response = await self.http.get(url, headers=headers)
         response.raise_for_status()
         return response.json().get("result")
 
-    def save_analysis(self, analysis_data: dict, user_id: str, filename: str, state: str = "CA") -> str:
+    async def save_analysis(self, analysis_data: dict, user_id: str, filename: str, state: str = "CA") -> str:
         """
         Saves the analysis result to Sanity.
         """
@@ -52,7 +53,11 @@ class SanityClient:
             "extractedClauses": analysis_data.get("extractedClauses", []),
             "overallRiskScore": analysis_data.get("overallRiskScore", 0),
             "summary": analysis_data.get("summary", ""),
+            # Section fingerprints, so a revised lease can be re-analyzed incrementally
+            "sections": analysis_data.get("sections", []),
         }
+        if analysis_data.get("revisionOf"):
+            doc["revisionOf"] = analysis_data["revisionOf"]
 
         mutations = {
             "mutations": [
@@ -67,7 +72,7 @@ class SanityClient:
             "Content-Type": "application/json"
         }
 
-        response = requests.post(self.base_url, headers=headers, json=mutations)
+        response = await self.http.post(self.base_url, headers=headers, json=mutations)
         response.raise_for_status()
         
         result = response.json()
@@ -75,21 +80,21 @@ class SanityClient:
         
         return doc_id
 
-    def get_analysis(self, analysis_id: str) -> dict | None:
+    async def get_analysis(self, analysis_id: str) -> dict | None:
         """
         Fetches a lease analysis by ID.
         """
         query = f'*[_type == "leaseAnalysis" && _id == "{analysis_id}"][0]'
-        return self._query(query)
+        return await self._query(query)
 
-    def get_condition_report(self, report_id: str) -> dict | None:
+    async def get_condition_report(self, report_id: str) -> dict | None:
         """
         Fetches a condition report with expanded image assets.
         """
-        query = f'*[_type == "conditionReport" && _id == "{report_id}"][0]{{..., defects[]{{..., screenshot{{asset->{{url}}}}}}}}'
-        return self._query(query)
+        query = f'*[_type == "conditionReport" && _id == "{report_id}"][0]{{..., defects[]{{..., screenshot{{asset->{{url}}}}, thumbnail{{asset->{{url}}}}}}}}'
+        return await self._query(query)
 
-    def get_clause_library(self, state: str = None) -> list:
+    async def get_clause_library(self, state: str = None) -> list:
         """
         Fetches the clause library, optionally filtered by state.
         """
@@ -97,4 +102,32 @@ class SanityClient:
             query = f'*[_type == "leaseClause" && defined(stateRules.{state})]'
         else:
             query = '*[_type == "leaseClause"] | order(commonName asc)'
-        return self._query(query) or []
+        return await self._query(query) or []
+
+    async def get_counter_templates(self) -> list:
+        """
+        Fetches the counter-letter templates of the clause library with their revisions.
+        """
+        query = '*[_type == "leaseClause" && defined(counterTemplate)]{_id, _rev, clauseType, commonName, counterTemplate}'
+        return await self._query(query) or []
+
+    async def get_red_flag_patterns(self) -> list:
+        """
+        Fetches the red-flag patterns and state rules of the clause library with their revisions.
+        """
+        query = '*[_type == "leaseClause" && count(redFlagPatterns) > 0]{_id, _rev, clauseType, commonName, redFlagPatterns, stateRules}'
+        return await self._query(query) or []
+
+    async def get_state_rules(self) -> list:
+        """
+        Fetches the per-state rules of the clause library.
+        """
+        query = '*[_type == "leaseClause" && defined(stateRules)]{_id, _rev, clauseType, commonName, stateRules}'
+        return await self._query(query) or []
+
+    async def get_clause_library_version(self) -> dict:
+        """
+        Cheap change check for the clause library: document count and latest _updatedAt.
+        """
+        query = '{"count": count(*[_type == "leaseClause"]), "updatedAt": *[_type == "leaseClause"] | order(_updatedAt desc)[0]._updatedAt}'
+        return await self._query(query) or {}
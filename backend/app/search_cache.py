@@ -0,0 +1,96 @@
+"""
+Shared cache for You.com searches (legal research and rent market data).
+The same queries come in over and over ("CA tenant law regarding rent
+increase ..." for every negotiation letter in California), and each costs a
+research-mode call of up to 30s. Results are keyed by the kind of search and
+the normalized query text, and expire per kind: statutes change rarely,
+listings within hours. Empty results (what the clients return on errors) are
+never stored.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import time
+from app.cache import LRUCache, DiskCache
+from app.metrics import metrics
+
+HOUR = 3600
+
+# Seconds a result of each kind of search stays fresh
+SEARCH_TTLS = {
+    "statute": 3 * 24 * HOUR,
+    "tenant_rights": 3 * 24 * HOUR,
+    "verify": 24 * HOUR,
+    "rent_laws": 24 * HOUR,
+    "market": 6 * HOUR,
+    "listings": 2 * HOUR,
+}
+DEFAULT_TTL = HOUR
+
+
+def normalize_query(query: str) -> str:
+    """Case, spacing and trailing punctuation don't change what You.com returns."""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?.!").lower()
+
+
+def is_empty(result: dict) -> bool:
+    return not result or (not result.get("answer") and not result.get("hits"))
+
+
+class SearchCache:
+    def __init__(self, memory_items: int, directory: str = None, disk_bytes: int = 0):
+        # Entries are {"result": ..., "expires_at": ...}; the TTL depends on the kind of search
+        self.memory = LRUCache(max_items=memory_items, sizeof=lambda entry: 1)
+        self.disk = DiskCache(directory, max_bytes=disk_bytes, compress=True) if directory else None
+        metrics.gauge("search_cache.hit_rate", self.hit_rate)
+        metrics.gauge("search_cache.memory_items", lambda: len(self.memory))
+        if self.disk:
+            metrics.gauge("search_cache.disk_bytes", lambda: self.disk.bytes)
+
+    @staticmethod
+    def key(kind: str, query: str) -> str:
+        return hashlib.sha256(f"{kind}|{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def hit_rate(self) -> float:
+        hits = metrics.counters["search_cache.hits"]
+        total = hits + metrics.counters["search_cache.misses"]
+        return round(hits / total, 4) if total else 0.0
+
+    async def get(self, kind: str, query: str) -> dict | None:
+        key = self.key(kind, query)
+        entry = self.memory.get(key)
+        if entry is None and self.disk:
+            data = await asyncio.to_thread(self.disk.get, key)
+            if data is not None:
+                try:
+                    entry = json.loads(data)
+                    if entry["expires_at"] > time.time():
+                        self.memory.set(key, entry, ttl=entry["expires_at"] - time.time())
+                    else:
+                        entry = None
+                        await asyncio.to_thread(self.disk.pop, key)
+                except (ValueError, KeyError) as e:
+                    print(f"Search cache entry {key} unreadable: {e}")
+                    entry = None
+        if entry is None:
+            metrics.incr("search_cache.misses")
+            metrics.incr(f"search_cache.{kind}.misses")
+            return None
+        metrics.incr("search_cache.hits")
+        metrics.incr(f"search_cache.{kind}.hits")
+        # Callers build their responses from the result; keep the cached copy intact
+        return json.loads(json.dumps(entry["result"]))
+
+    async def put(self, kind: str, query: str, result: dict):
+        if is_empty(result):
+            return
+        ttl = SEARCH_TTLS.get(kind, DEFAULT_TTL)
+        key = self.key(kind, query)
+        entry = {"result": result, "expires_at": time.time() + ttl}
+        self.memory.set(key, json.loads(json.dumps(entry)), ttl=ttl)
+        if self.disk:
+            try:
+                await asyncio.to_thread(self.disk.set, key, json.dumps(entry).encode("utf-8"))
+            except OSError as e:
+                print(f"Search cache disk write failed: {e}")
@@ -0,0 +1,48 @@
+"""
+Single-flight coalescing of identical in-flight upstream calls.
+When a zip code or state is trending, many requests ask You.com and Gemini the
+same question at the same moment, before the first answer can reach a cache.
+Callers with the same key share one in-flight call instead of each making
+their own; the key is forgotten as soon as the call finishes, so later
+callers go through the caches as before.
+"""
+import asyncio
+import copy
+from typing import Awaitable, Callable, TypeVar
+from app.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Returns the result of `call()`, or of the identical call already in flight
+        under `key`. Every caller gets its own deep copy, so one caller mutating
+        its result can't affect another; exceptions are raised to all of them.
+        The shared call runs as a task and is not cancelled when one caller goes
+        away, since the others (and the caches it fills) still want the result.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            metrics.incr(f"single_flight.{self.name}.calls")
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            metrics.incr(f"single_flight.{self.name}.coalesced")
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception retrieved even if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,48 @@
+"""
+Speculative execution for pipeline steps that sit behind a cheap check.
+The expensive step starts at the same moment as the check instead of after it;
+if the check fails the step is cancelled and counted as wasted work.
+"""
+import asyncio
+import time
+from typing import Awaitable, TypeVar
+from app.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SpeculationRejected(Exception):
+    pass
+
+
+async def speculate(guard: Awaitable[bool], work: Awaitable[T], name: str, cost: float = 0) -> T:
+    """
+    Runs `work` concurrently with `guard` and returns the work's result once the
+    guard passes. Raises SpeculationRejected (after cancelling the work) if the
+    guard returns False; an exception from either is re-raised.
+    `cost` is the work's estimated spend (e.g. input tokens), recorded as
+    wasted under speculation.{name}.wasted_cost when the guard rejects.
+    """
+    start = time.perf_counter()
+    work_task = asyncio.ensure_future(work)
+    guard_task = asyncio.ensure_future(guard)
+    try:
+        ok = await guard_task
+        guard_elapsed = time.perf_counter() - start
+        if not ok:
+            work_task.cancel()
+            metrics.incr(f"speculation.{name}.rejected")
+            metrics.incr(f"speculation.{name}.wasted_ms", guard_elapsed * 1000)
+            metrics.incr(f"speculation.{name}.wasted_cost", cost)
+            raise SpeculationRejected(f"{name}: guard rejected")
+
+        result = await work_task
+        # The guard's latency no longer adds to the total, up to the length of the work itself
+        overlap = min(guard_elapsed, time.perf_counter() - start)
+        metrics.incr(f"speculation.{name}.accepted")
+        metrics.incr(f"speculation.{name}.saved_ms", overlap * 1000)
+        return result
+    finally:
+        for task in (guard_task, work_task):
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,29 @@
+"""
+Helpers for streamed response bodies.
+"""
+import json
+from typing import AsyncIterator
+
+# Keep proxies (nginx) from buffering event streams
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+async def prime_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Pulls the first chunk before the response starts, so upstream failures can
+    still be turned into an HTTP error instead of a truncated 200.
+    """
+    first = await anext(chunks, None)
+
+    async def replay():
+        if first is not None:
+            yield first
+        async for chunk in chunks:
+            yield chunk
+
+    return replay()
+
+
+def sse(event: str, data) -> bytes:
+    """Formats one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
@@ -0,0 +1,308 @@
+"""
+Streaming ingest for file uploads (lease PDFs, voice notes, walkthrough videos).
+The multipart body is parsed as it arrives: the file part is hashed and written
+to a spool that stays in memory while small and moves to a temp file on disk
+once it grows, and each endpoint's size and type limits are enforced as soon as
+they can be, so an oversized or wrong-type upload gets its 413/415 before the
+rest of the body is read. Handlers get the bytes as a memoryview or a file path,
+never as a copy.
+
+Usage:
+    upload: IngestedUpload = Depends(ingest(PDF_UPLOAD))
+"""
+import asyncio
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+from typing import AsyncIterator
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+from app.config import settings
+from app.metrics import metrics
+
+
+class UploadPolicy:
+    def __init__(self, name: str, max_bytes: int, content_types: tuple[str, ...], magic: tuple[bytes, ...] = (),
+                 suffix: str = ""):
+        self.name = name
+        self.max_bytes = max_bytes
+        # Accepted part Content-Type prefixes ("audio/" accepts any audio type)
+        self.content_types = content_types
+        # Accepted leading bytes of the file, checked once they arrive
+        self.magic = magic
+        self.suffix = suffix
+
+    def accepts(self, content_type: str) -> bool:
+        return content_type.lower().startswith(self.content_types)
+
+
+# curl and some mobile browsers send PDFs as octet-stream; the magic bytes still have to match
+PDF_UPLOAD = UploadPolicy("pdf", settings.UPLOAD_MAX_PDF_BYTES, ("application/pdf", "application/octet-stream"),
+                          magic=(b"%PDF-",), suffix=".pdf")
+AUDIO_UPLOAD = UploadPolicy("audio", settings.UPLOAD_MAX_AUDIO_BYTES, ("audio/", "video/webm"))
+VIDEO_UPLOAD = UploadPolicy("video", settings.UPLOAD_MAX_VIDEO_BYTES, ("video/",), suffix=".mp4")
+
+# Multipart framing and small form fields on top of the file itself
+FORM_OVERHEAD_BYTES = 64 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class IngestedUpload:
+    """An uploaded file plus the request's plain form fields."""
+
+    def __init__(self, spool_bytes: int, suffix: str):
+        self.filename = ""
+        self.content_type = ""
+        self.size = 0
+        self.sha256 = ""
+        self.fields: dict[str, str] = {}
+        self._suffix = suffix
+        self._spool_bytes = spool_bytes
+        self._memory = io.BytesIO()
+        self._file = None
+        self._path = None
+        self._mmap = None
+        self._views: list[memoryview] = []
+
+    @property
+    def on_disk(self) -> bool:
+        return self._path is not None
+
+    def field(self, name: str, default: str = None) -> str:
+        """A form field's value; raises 422 for a missing field with no default."""
+        value = self.fields.get(name, default)
+        if value is None:
+            raise HTTPException(status_code=422, detail=f"Missing form field: {name}")
+        return value
+
+    async def _write(self, data: bytes):
+        if self._file is None and self._memory.tell() + len(data) > self._spool_bytes:
+            await asyncio.to_thread(self._rollover)
+        if self._file is None:
+            self._memory.write(data)
+        else:
+            await asyncio.to_thread(self._file.write, data)
+
+    def _rollover(self):
+        fd, self._path = tempfile.mkstemp(prefix="leaseguard-upload-", suffix=self._suffix)
+        self._file = os.fdopen(fd, "wb")
+        self._file.write(self._memory.getbuffer())
+        self._memory = io.BytesIO()
+
+    def _finish(self):
+        if self._file is not None:
+            self._file.close()
+
+    def path(self) -> str:
+        """A file on disk holding the upload (written out first if it was small enough to stay in memory)."""
+        if self._path is None:
+            self._rollover()
+            self._file.close()
+        return self._path
+
+    def view(self) -> memoryview:
+        """The upload's bytes without copying them; valid until the request finishes."""
+        if self._path is None:
+            view = self._memory.getbuffer()
+        elif self.size == 0:
+            view = memoryview(b"")
+        else:
+            if self._mmap is None:
+                with open(self._path, "rb") as f:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(self._mmap)
+        self._views.append(view)
+        return view
+
+    async def chunks(self, size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Re-reads the upload in chunks, e.g. as a streamed request body for an upstream API."""
+        view = self.view()
+        for start in range(0, len(view), size):
+            yield bytes(view[start:start + size])
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._memory.close()
+        if self._file is not None:
+            self._file.close()
+        if self._path is not None:
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+
+
+class _IngestParser:
+    """Feeds the request stream through python-multipart, keeping the one file part."""
+
+    def __init__(self, policy: UploadPolicy, upload: IngestedUpload, file_field: str):
+        self.policy = policy
+        self.upload = upload
+        self.file_field = file_field
+        self.hasher = hashlib.sha256()
+        self.error: HTTPException | None = None
+        self.pending: list[bytes] = []
+        self.seen_file = False
+        self._header_name = b""
+        self._header_value = b""
+        self._headers: dict[bytes, bytes] = {}
+        self._part_name = ""
+        self._is_file = False
+        self._field_data = bytearray()
+        self._head = b""
+
+    def on_part_begin(self):
+        self._headers = {}
+        self._field_data = bytearray()
+        self._is_file = False
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._part_name = options.get(b"name", b"").decode("utf-8", "replace")
+        self._is_file = b"filename" in options
+        if not self._is_file:
+            return
+        if self._part_name != self.file_field or self.seen_file:
+            self.error = HTTPException(status_code=400, detail="Unexpected file in upload")
+            return
+        self.seen_file = True
+        content_type = self._headers.get(b"content-type", b"application/octet-stream").decode("latin-1")
+        if not self.policy.accepts(content_type):
+            self.error = HTTPException(status_code=415, detail=f"Unsupported {self.policy.name} upload type: {content_type}")
+            return
+        self.upload.filename = options[b"filename"].decode("utf-8", "replace")
+        self.upload.content_type = content_type
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self.error is not None:
+            return
+        chunk = data[start:end]
+        if not self._is_file:
+            self._field_data += chunk
+            if len(self._field_data) > FORM_OVERHEAD_BYTES:
+                self.error = HTTPException(status_code=413, detail=f"Form field {self._part_name} too large")
+            return
+        self.upload.size += len(chunk)
+        if self.upload.size > self.policy.max_bytes:
+            self.error = HTTPException(
+                status_code=413,
+                detail=f"{self.policy.name.upper()} upload exceeds {self.policy.max_bytes // (1024 * 1024)} MB",
+            )
+            return
+        if self.policy.magic and len(self._head) < 8:
+            self._head += chunk[:8]
+            if len(self._head) >= 8 and not self._head.startswith(self.policy.magic):
+                self.error = HTTPException(status_code=415, detail=f"Upload is not a valid {self.policy.name} file")
+                return
+        self.hasher.update(chunk)
+        self.pending.append(chunk)
+
+    def on_part_end(self):
+        if not self._is_file:
+            self.upload.fields[self._part_name] = self._field_data.decode("utf-8", "replace")
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+
+async def ingest_request(request: Request, policy: UploadPolicy, file_field: str = "file") -> IngestedUpload:
+    """
+    Parses a multipart request into an IngestedUpload. Raises 413/415 as soon as
+    a limit is crossed, without reading the rest of the body.
+    The caller owns the result and must close() it.
+    """
+    # Declared length: reject before reading a single body byte
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > policy.max_bytes + FORM_OVERHEAD_BYTES:
+        metrics.incr(f"uploads.{policy.name}.rejected")
+        raise HTTPException(
+            status_code=413, detail=f"{policy.name.upper()} upload exceeds {policy.max_bytes // (1024 * 1024)} MB"
+        )
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=415, detail="Expected a multipart/form-data upload")
+
+    upload = IngestedUpload(settings.UPLOAD_SPOOL_BYTES, policy.suffix)
+    state = _IngestParser(policy, upload, file_field)
+    parser = MultipartParser(params[b"boundary"], state.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if state.error is not None:
+                metrics.incr(f"uploads.{policy.name}.rejected")
+                raise state.error
+            for data in state.pending:
+                await upload._write(data)
+            state.pending.clear()
+        parser.finalize()
+        if not state.seen_file:
+            raise HTTPException(status_code=422, detail=f"Missing file field: {file_field}")
+        if policy.magic and not state._head.startswith(policy.magic):
+            raise HTTPException(status_code=415, detail=f"Upload is not a valid {policy.name} file")
+        upload._finish()
+    except BaseException:
+        upload.close()
+        raise
+
+    upload.sha256 = state.hasher.hexdigest()
+    metrics.incr(f"uploads.{policy.name}.accepted")
+    metrics.incr(f"uploads.{policy.name}.bytes", upload.size)
+    if upload.on_disk:
+        metrics.incr(f"uploads.{policy.name}.spooled_to_disk")
+    return upload
+
+
+def ingest(policy: UploadPolicy, file_field: str = "file"):
+    """Dependency factory: yields the IngestedUpload and cleans it up after the response."""
+
+    async def dependency(request: Request):
+        upload = await ingest_request(request, policy, file_field)
+        try:
+            yield upload
+        finally:
+            upload.close()
+
+    return dependency
+
+
+def multipart_openapi(file_field: str = "file", **fields: bool) -> dict:
+    """
+    openapi_extra describing a multipart body for routes that read it through
+    ingest() instead of File()/Form() parameters. fields maps name -> required.
+    """
+    properties = {file_field: {"type": "string", "format": "binary"}}
+    properties.update({name: {"type": "string"} for name in fields})
+    required = [file_field] + [name for name, is_required in fields.items() if is_required]
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"multipart/form-data": {"schema": {"type": "object", "properties": properties, "required": required}}},
+        }
+    }
@@ -0,0 +1,84 @@
+"""
+Time to the first clause: POST /api/v1/analyze (whole JSON, then respond)
+versus POST /api/v1/analyze/stream (SSE, one event per clause). Runs the real
+routes with fake extraction, Sanity and a streaming fake Gemini
+(benchmarks.bench_chunked_analysis) that writes at --tokens-per-s.
+
+Run from backend/:
+    python -m benchmarks.bench_analysis_stream --sections 20 60
+"""
+import argparse
+import time
+
+import httpx
+
+from app.config import settings
+from app.dependencies import get_foxit, get_gemini, get_lease_analyzer, get_sanity
+from app.lease_analysis.analyzer import LeaseAnalyzer
+from benchmarks.bench_chunked_analysis import FakeGemini, synthetic_lease_text
+from benchmarks.mock_foxit import MockServer
+
+PDF = b"%PDF-1.4\n% placeholder, extraction is faked\n"
+
+
+class FakeFoxit:
+    def __init__(self, text: str):
+        self.text = text
+
+    async def extract_text(self, file_content, filename: str, content_hash: str = None) -> str:
+        return self.text
+
+
+class FakeSanity:
+    async def save_analysis(self, analysis: dict, user_id: str, filename: str, state: str = None) -> str:
+        return "analysis-bench"
+
+
+def build_app(text: str, tokens_per_s: float):
+    from app.main import app
+
+    gemini = FakeGemini(tokens_per_s)
+    app.dependency_overrides[get_foxit] = lambda: FakeFoxit(text)
+    app.dependency_overrides[get_sanity] = FakeSanity
+    app.dependency_overrides[get_gemini] = lambda: gemini
+    # No result cache: every request pays for the full generation
+    app.dependency_overrides[get_lease_analyzer] = lambda: LeaseAnalyzer(gemini)
+    return app
+
+
+def measure(client: httpx.Client, path: str) -> tuple[float, float, int]:
+    """Returns (seconds to the first clause, seconds to the end, clauses)."""
+    start = time.perf_counter()
+    first = None
+    clauses = 0
+    with client.stream("POST", path, files={"file": ("lease.pdf", PDF, "application/pdf")}, data={"state": "CA"}) as response:
+        response.raise_for_status()
+        if path.endswith("/stream"):
+            for line in response.iter_lines():
+                if line == "event: clause":
+                    clauses += 1
+                    first = first or time.perf_counter() - start
+        else:
+            clauses = len(response.read() and response.json()["results"]["extractedClauses"])
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start, clauses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, nargs="+", default=[20, 60])
+    parser.add_argument("--tokens-per-s", type=float, default=400)
+    args = parser.parse_args()
+
+    settings.FOXIT_CLIENT_ID = None
+    for sections in args.sections:
+        app = build_app(synthetic_lease_text(sections), args.tokens_per_s)
+        with MockServer(app) as server, httpx.Client(base_url=server.url, timeout=120) as client:
+            for path in ("/api/v1/analyze", "/api/v1/analyze/stream"):
+                first, total, clauses = measure(client, path)
+                print(f"{sections:>3} sections {path:<24}: first clause {first * 1000:7.0f}ms  "
+                      f"complete {total * 1000:7.0f}ms  clauses={clauses}")
+
+
+if __name__ == "__main__":
+    main()
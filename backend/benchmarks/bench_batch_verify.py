@@ -0,0 +1,108 @@
+"""
+Verifying all flagged clauses of an analysis: one You.com search after another
+(as counter letters used to) versus BatchVerifier, which runs them concurrently
+under the shared token bucket and the batch deadline. A stub You.com (FastAPI
+on a local uvicorn server) answers /smart after --latency-ms. Reports batch wall
+time per clause count, the stub's peak concurrency, and how many clauses timed
+out or could not get a rate limit token in time.
+
+Run from backend/:
+    python -m benchmarks.bench_batch_verify --clauses 5 10 20 40 --rate 5 --burst 10
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.config import settings
+from app.law_engine.batch_verify import BatchVerifier
+from app.law_engine.youcom_legal import YouComLegalSearch
+from app.rate_limit import TokenBucket
+from benchmarks.mock_foxit import MockServer
+
+CLAUSE_TYPES = ["late_fee", "security_deposit", "entry_notice", "rent_increase", "auto_renewal", "repairs"]
+
+
+def create_stub_you_com(latency_ms: float) -> FastAPI:
+    app = FastAPI()
+    app.state.active = 0
+    app.state.peak = 0
+    rng = random.Random(5)
+
+    @app.post("/smart")
+    async def smart(payload: dict):
+        app.state.active += 1
+        app.state.peak = max(app.state.peak, app.state.active)
+        try:
+            await asyncio.sleep(rng.lognormvariate(0, 0.25) * latency_ms / 1000)
+        finally:
+            app.state.active -= 1
+        return {"answer": f"Under Civil Code § 1950.5 this is limited. ({payload['query'][:40]})", "hits": [
+            {"title": "Civil Code § 1950.5", "url": "https://example.org/1950.5"},
+        ]}
+
+    return app
+
+
+def flagged_clauses(count: int) -> list[dict]:
+    return [{
+        "_key": f"c{i}",
+        "clauseType": CLAUSE_TYPES[i % len(CLAUSE_TYPES)],
+        "originalText": f"Clause {i}: tenant shall pay ${50 + i} for each day rent is late.",
+        "riskLevel": "red" if i % 2 else "yellow",
+    } for i in range(count)]
+
+
+async def sequential(legal: YouComLegalSearch, clauses: list[dict]) -> int:
+    for clause in clauses:
+        await legal.verify_red_flag("CA", clause["clauseType"], clause["originalText"])
+    return 0
+
+
+async def batched(legal: YouComLegalSearch, clauses: list[dict], args) -> int:
+    verifier = BatchVerifier(legal, deadline=args.deadline, concurrency=args.concurrency,
+                             query_timeout=args.query_timeout)
+    results = await verifier.verify(clauses, "CA")
+    return sum(r["status"] in ("timeout", "rate_limited") for r in results.values())
+
+
+async def run(args, url: str, app: FastAPI):
+    settings.YOU_COM_API_KEY = settings.YOU_COM_API_KEY or "bench"
+    settings.YOU_COM_BASE_URL = f"{url}/smart"
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=100)) as http:
+        for count in args.clauses:
+            clauses = flagged_clauses(count)
+            for label in ("sequential", "batch"):
+                # Fresh limiter and no search cache, so every run pays for every search
+                legal = YouComLegalSearch(http, limiter=TokenBucket(args.rate, args.burst))
+                app.state.peak = 0
+                start = time.perf_counter()
+                if label == "sequential":
+                    timeouts = await sequential(legal, clauses)
+                else:
+                    timeouts = await batched(legal, clauses, args)
+                elapsed = time.perf_counter() - start
+                print(f"{count:>3} clauses {label:10}: {elapsed:6.2f}s  peak {app.state.peak:2} in flight  "
+                      f"{timeouts} timed out or rate limited")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clauses", type=int, nargs="+", default=[5, 10, 20, 40])
+    parser.add_argument("--latency-ms", type=float, default=600)
+    parser.add_argument("--rate", type=float, default=settings.YOU_COM_RATE)
+    parser.add_argument("--burst", type=int, default=settings.YOU_COM_BURST)
+    parser.add_argument("--deadline", type=float, default=settings.VERIFY_BATCH_DEADLINE)
+    parser.add_argument("--query-timeout", type=float, default=settings.VERIFY_QUERY_TIMEOUT)
+    parser.add_argument("--concurrency", type=int, default=settings.VERIFY_BATCH_CONCURRENCY)
+    args = parser.parse_args()
+    app = create_stub_you_com(args.latency_ms)
+    with MockServer(app) as server:
+        asyncio.run(run(args, server.url, app))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Long-lease analysis: one Gemini call over the whole lease versus the chunked
+map-reduce path in LeaseAnalyzer. The fake Gemini returns one clause per
+numbered section it is shown, takes time proportional to its output (about
+--tokens-per-s), and cuts its JSON off at max_output_tokens like the real API.
+Reports latency and how many of the lease's clauses come back.
+
+Run from backend/:
+    python -m benchmarks.bench_chunked_analysis --sections 20 80 200
+"""
+import argparse
+import asyncio
+import json
+import re
+import time
+
+from app.config import settings
+from app.lease_analysis.analyzer import LeaseAnalyzer
+from benchmarks.bench_local_extract import SECTIONS
+
+HEADING = re.compile(r"^(\d+)\. (.+)$", re.MULTILINE)
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModels:
+    def __init__(self, tokens_per_s: float):
+        self.tokens_per_s = tokens_per_s
+
+    async def generate_content(self, model: str, contents: str, config=None):
+        if "Reply with ONLY" in contents:
+            # /analyze's lease check
+            await asyncio.sleep(0.5)
+            return FakeResponse("yes")
+        if "PART SUMMARIES" in contents:
+            await asyncio.sleep(0.4 + 80 / self.tokens_per_s)
+            return FakeResponse("Merged summary of the lease.")
+        body = self._body(contents, getattr(config, "max_output_tokens", None) or 8192)
+        await asyncio.sleep(0.4 + len(body) / 4 / self.tokens_per_s)
+        return FakeResponse(body)
+
+    async def generate_content_stream(self, model: str, contents: str, config=None):
+        """Same output as generate_content, delivered in ~50-token pieces at the same pace."""
+        body = self._body(contents, getattr(config, "max_output_tokens", None) or 8192)
+
+        async def pieces():
+            await asyncio.sleep(0.4)
+            for start in range(0, len(body), 200):
+                await asyncio.sleep(50 / self.tokens_per_s)
+                yield FakeResponse(body[start:start + 200])
+
+        return pieces()
+
+    @staticmethod
+    def _body(contents: str, limit: int) -> str:
+        clauses = [
+            {
+                "clauseType": title,
+                "originalText": f"Section {number}: " + SECTIONS[int(number) % len(SECTIONS)][1],
+                "riskLevel": "red" if int(number) % 7 == 0 else "green",
+                "explanation": "Tenant pays this amount on the stated schedule under the stated conditions.",
+                "citation": "Standard term",
+            }
+            for number, title in HEADING.findall(contents.split("The lease text is:")[-1])
+        ]
+        body = json.dumps({
+            "propertyAddress": "1 Main St", "landlordName": "Acme", "tenantName": "Pat",
+            "extractedClauses": clauses, "overallRiskScore": 40, "summary": "Part summary.",
+        }, indent=2)
+        return body[:limit * 4]
+
+
+class FakeGemini:
+    def __init__(self, tokens_per_s: float):
+        self.aio = type("Aio", (), {"models": FakeModels(tokens_per_s)})()
+
+
+def synthetic_lease_text(sections: int) -> str:
+    parts = ["RESIDENTIAL LEASE AGREEMENT\nThis lease is made between Acme (Landlord) and Pat (Tenant).\n"]
+    for n in range(1, sections + 1):
+        title, body = SECTIONS[n % len(SECTIONS)]
+        text = body.format(amount=1500 + n, fee=50 + n, days=30)
+        parts.append(f"{n}. {title}\n{text} {text} {text}\n")
+    return "\n".join(parts)
+
+
+async def run(args):
+    analyzer = LeaseAnalyzer(FakeGemini(args.tokens_per_s))
+    for sections in args.sections:
+        text = synthetic_lease_text(sections)
+        results = {}
+        for label, chunk_chars in [("single call", 10 ** 9), ("chunked", args.chunk_chars)]:
+            settings.ANALYSIS_CHUNK_CHARS = chunk_chars
+            start = time.perf_counter()
+            analysis = await analyzer.analyze_lease(text, "CA")
+            results[label] = (time.perf_counter() - start, len(analysis["extractedClauses"]))
+        print(f"{sections:>4} sections ({len(text) // 1000}k chars): " + "  ".join(
+            f"{label} {elapsed:6.2f}s {found:>3}/{sections} clauses" for label, (elapsed, found) in results.items()
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, nargs="+", default=[20, 80, 200])
+    parser.add_argument("--chunk-chars", type=int, default=settings.ANALYSIS_CHUNK_CHARS)
+    parser.add_argument("--tokens-per-s", type=float, default=400)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
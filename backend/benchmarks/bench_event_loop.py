@@ -0,0 +1,118 @@
+"""
+Concurrency benchmark: /api/v1/health latency while /analyze requests are in flight.
+
+Foxit is served by the local mock (slow tasks), Gemini and Sanity are replaced by
+async stand-ins with realistic latency. If any route blocks the event loop, health
+latency jumps to the duration of the blocking call.
+
+Run from backend/:
+    python -m benchmarks.bench_event_loop --concurrency 8
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.config import settings
+from benchmarks.mock_foxit import MockServer, create_mock_app
+
+
+class FakeAnalyzer:
+    """Stands in for LeaseAnalyzer; awaits like a Gemini round-trip would."""
+    delay = 1.5
+
+    async def analyze_lease(self, extracted_text: str, state: str) -> dict:
+        await asyncio.sleep(self.delay)
+        return {"extractedClauses": [], "overallRiskScore": 10, "summary": "ok"}
+
+
+async def fake_validate(client, text: str) -> bool:
+    await asyncio.sleep(0.3)
+    return True
+
+
+async def fake_save(self, analysis_data: dict, user_id: str, filename: str, state: str = "CA") -> str:
+    await asyncio.sleep(0.1)
+    return "bench-analysis"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def sample_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list[float]:
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/api/v1/health")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def run(concurrency: int, interval: float):
+    from app.main import app
+    from app.dependencies import get_lease_analyzer
+    from app.routes import upload
+    from app.sanity_client.client import SanityClient
+
+    app.dependency_overrides[get_lease_analyzer] = FakeAnalyzer
+    upload._validate_is_lease = fake_validate
+    SanityClient.save_analysis = fake_save
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        # Idle baseline
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_health(client, stop, interval))
+        await asyncio.sleep(2)
+        stop.set()
+        idle = await sampler
+
+        # Under load
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_health(client, stop, interval))
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post(
+                "/api/v1/analyze",
+                files={"file": ("lease.pdf", b"%PDF-1.4 bench", "application/pdf")},
+                data={"state": "CA"},
+            )
+            for _ in range(concurrency)
+        ])
+        wall = time.perf_counter() - start
+        stop.set()
+        loaded = await sampler
+
+    ok = sum(1 for r in responses if r.status_code == 200)
+    print(f"/analyze: {ok}/{concurrency} succeeded in {wall:.2f}s wall")
+    for label, samples in (("idle", idle), ("under load", loaded)):
+        print(
+            f"/api/v1/health {label:>10}: n={len(samples):4d} "
+            f"p50={statistics.median(samples):7.2f}ms "
+            f"p95={percentile(samples, 0.95):7.2f}ms "
+            f"max={max(samples):7.2f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--task-seconds", type=float, default=3.0, help="mock Foxit task duration")
+    parser.add_argument("--interval", type=float, default=0.05, help="health probe interval (s)")
+    args = parser.parse_args()
+
+    with MockServer(create_mock_app(task_seconds=args.task_seconds)) as server:
+        settings.FOXIT_API_BASE_URL = server.url
+        settings.FOXIT_CLIENT_ID = "bench"
+        settings.FOXIT_CLIENT_SECRET = "bench"
+        asyncio.run(run(args.concurrency, args.interval))
+
+
+if __name__ == "__main__":
+    main()
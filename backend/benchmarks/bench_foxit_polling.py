@@ -0,0 +1,94 @@
+"""
+Time-to-PDF against the local mock Foxit server: the old fixed 1s poll loop
+versus the shared FoxitTaskTracker with adaptive backoff.
+
+Run from backend/:
+    python -m benchmarks.bench_foxit_polling --requests 40 --min-task 0.2 --max-task 2.5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.config import settings
+from app.documents.foxit_auth import FoxitAuth
+from app.documents.foxit_docgen import FoxitDocGenClient
+from app.documents.foxit_tasks import FoxitTaskTracker
+from benchmarks.mock_foxit import MockServer, create_mock_app
+
+HTML = "<html><body><h1>Lease Clause Objection</h1><p>Benchmark letter.</p></body></html>"
+
+
+class FixedIntervalDocGen(FoxitDocGenClient):
+    """The previous poll_status: check once a second, up to 30 times."""
+
+    async def wait_for_result(self, task_id: str, timeout: float = 60) -> str:
+        url = f"{self.base_url}/pdf-services/api/tasks/{task_id}"
+        for _ in range(30):
+            headers = await self.auth.headers()
+            data = (await self.http.get(url, headers=headers)).json()
+            if data.get("status") in ("COMPLETED", "SUCCEEDED"):
+                return data["resultDocumentId"]
+            await asyncio.sleep(1)
+        raise Exception("Conversion timed out")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def measure(client: FoxitDocGenClient, requests: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            pdf = await client.generate_pdf(HTML, {})
+            assert pdf.startswith(b"%PDF")
+            return time.perf_counter() - start
+
+    return await asyncio.gather(*[one() for _ in range(requests)])
+
+
+async def run(args, mock_app):
+    async with httpx.AsyncClient(timeout=30) as http:
+        auth = FoxitAuth(http)
+        tracker = FoxitTaskTracker(http, auth)
+        backends = {
+            "fixed 1s poll": FixedIntervalDocGen(http, auth, tracker),
+            "task tracker": FoxitDocGenClient(http, auth, tracker),
+        }
+        for label, client in backends.items():
+            mock_app.state.status_calls = 0
+            samples = await measure(client, args.requests, args.concurrency)
+            print(
+                f"{label:>14}: p50={statistics.median(samples) * 1000:7.0f}ms "
+                f"p95={percentile(samples, 0.95) * 1000:7.0f}ms "
+                f"status calls={mock_app.state.status_calls}"
+            )
+        await tracker.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--min-task", type=float, default=0.2, help="shortest mock conversion (s)")
+    parser.add_argument("--max-task", type=float, default=2.5, help="longest mock conversion (s)")
+    args = parser.parse_args()
+
+    mock_app = create_mock_app(task_seconds=(args.min_task, args.max_task))
+    with MockServer(mock_app) as server:
+        settings.FOXIT_API_BASE_URL = server.url
+        settings.FOXIT_CLIENT_ID = "bench"
+        settings.FOXIT_CLIENT_SECRET = "bench"
+        # Measure the Foxit flow itself, not the local renderer
+        settings.PDF_RENDERER = "foxit"
+        asyncio.run(run(args, mock_app))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Lease text extraction latency: the previous Foxit-first flow (local pypdf only
+after Foxit fails) versus the hedged flow in FoxitClient, on text PDFs and on
+scan-like PDFs with no text layer. Foxit is the mock server, with extraction
+tasks that take --foxit-seconds. Prints the extract.* metrics afterwards.
+
+Run from backend/:
+    python -m benchmarks.bench_hedged_extract --docs 4 --foxit-seconds 3
+"""
+import argparse
+import asyncio
+import base64
+import statistics
+import time
+
+import httpx
+
+from app.config import settings
+from app.documents.foxit_auth import FoxitAuth
+from app.documents.foxit_extract import FoxitClient
+from app.documents.foxit_tasks import FoxitTaskTracker
+from app.documents.local_extract import LocalPdfExtractor
+from app.documents.local_pdf import render_html_to_pdf
+from app.deposit_defender.thumbnails import make_thumbnail
+from app.metrics import metrics
+from benchmarks.bench_local_extract import synthetic_lease
+from benchmarks.bench_report_images import synthetic_frame
+from benchmarks.mock_foxit import MOCK_TEXT, MockServer, create_mock_app
+
+
+def scanned_lease(pages: int, seed: int) -> bytes:
+    """Image-only pages, like a phone scan of a printed lease."""
+    src = "data:image/jpeg;base64," + base64.b64encode(make_thumbnail(synthetic_frame(seed))).decode()
+    body = "".join(f'<div style="page-break-before: always"><img src="{src}" /></div>' for _ in range(pages))
+    return render_html_to_pdf(f"<html><body>{body}</body></html>")
+
+
+async def foxit_first(client: FoxitClient, pdf: bytes) -> str:
+    """The previous FoxitClient.extract_text."""
+    try:
+        return await client.extract_text_foxit(pdf, "lease.pdf")
+    except Exception:
+        extracted = await client.local.extract(pdf)
+        return extracted.text
+
+
+async def run(args, corpus: dict[str, list[bytes]]):
+    async with httpx.AsyncClient(timeout=60) as http:
+        auth = FoxitAuth(http)
+        tracker = FoxitTaskTracker(http, auth)
+        extractor = LocalPdfExtractor()
+        client = FoxitClient(http, auth, tracker, extractor)
+        await extractor.extract(corpus["text"][0])  # start the pool
+        try:
+            for kind, pdfs in corpus.items():
+                for name, fn in [("foxit-first", foxit_first), ("hedged", lambda c, pdf: c.extract_text(pdf, "lease.pdf"))]:
+                    times = []
+                    for pdf in pdfs:
+                        start = time.perf_counter()
+                        text = await fn(client, pdf)
+                        times.append(time.perf_counter() - start)
+                        assert text, f"{name} returned no text for a {kind} PDF"
+                    print(f"{kind:>7} {name:>11}: median {statistics.median(times) * 1000:8.1f}ms  max {max(times) * 1000:8.1f}ms")
+        finally:
+            await tracker.aclose()
+            await auth.aclose()
+            extractor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=4, help="documents of each kind")
+    parser.add_argument("--pages", type=int, default=12)
+    parser.add_argument("--foxit-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    corpus = {
+        "text": [synthetic_lease(args.pages, seed) for seed in range(args.docs)],
+        "scanned": [scanned_lease(args.pages, seed) for seed in range(args.docs)],
+    }
+    mock_app = create_mock_app(task_seconds=args.foxit_seconds, result=(MOCK_TEXT * 40).encode())
+    with MockServer(mock_app) as server:
+        settings.FOXIT_API_BASE_URL = server.url
+        settings.FOXIT_CLIENT_ID = "bench"
+        settings.FOXIT_CLIENT_SECRET = "bench"
+        asyncio.run(run(args, corpus))
+
+    print({name: round(value, 1) for name, value in metrics.snapshot().items() if name.startswith("extract.")})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Revised-lease analysis: analyzing the whole revision again versus
+LeaseAnalyzer.reanalyze_lease, which reuses the stored clauses of unchanged
+sections and only sends edited or added sections to Gemini. The fake Gemini
+(from bench_chunked_analysis) quotes one clause per section it is shown and
+takes time proportional to its output. The redline edits --edits sections and
+adds one. Reports latency and the change report's counts.
+
+Run from backend/:
+    python -m benchmarks.bench_incremental_analysis --sections 40 120 --edits 2
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.lease_analysis.analyzer import LeaseAnalyzer
+from app.lease_analysis.chunking import split_sections
+from app.lease_analysis.revisions import fingerprint
+from benchmarks.bench_chunked_analysis import HEADING, FakeGemini, FakeModels, synthetic_lease_text
+
+
+class QuotingModels(FakeModels):
+    @staticmethod
+    def _body(contents: str, limit: int) -> str:
+        clauses = []
+        for section in split_sections(contents.split("The lease text is:")[-1]):
+            heading = HEADING.search(section)
+            if heading is None:
+                continue
+            _, title = heading.groups()
+            clauses.append({
+                "clauseType": title,
+                "originalText": " ".join(section.split())[:160],
+                "riskLevel": "red" if "$999" in section else "green",
+                "explanation": "Tenant pays this amount on the stated schedule under the stated conditions.",
+                "citation": "Standard term",
+            })
+        body = json.dumps({
+            "propertyAddress": "1 Main St", "landlordName": "Acme", "tenantName": "Pat",
+            "extractedClauses": clauses, "overallRiskScore": 40, "summary": "Part summary.",
+        }, indent=2)
+        return body[:limit * 4]
+
+
+def redline(text: str, edits: int) -> str:
+    """Raises an amount in `edits` evenly spaced sections to $999 and appends one section."""
+    sections = split_sections(text)
+    priced = [i for i, section in enumerate(sections) if "$" in section]
+    step = max(len(priced) // (edits + 1), 1)
+    for i in priced[step::step][:edits]:
+        sections[i] = sections[i].replace("$", "$999 plus $", 1)
+    sections.append(f"{len(sections)}. Parking\nTenant shall pay $999 per month for one parking space.\n")
+    return "".join(sections)
+
+
+async def run(args):
+    gemini = FakeGemini(args.tokens_per_s)
+    gemini.aio.models = QuotingModels(args.tokens_per_s)
+    analyzer = LeaseAnalyzer(gemini)
+    for count in args.sections:
+        original = synthetic_lease_text(count)
+        previous = fingerprint(original, await analyzer.analyze_lease(original, "CA"))
+        previous["state"] = "CA"
+        revised = redline(original, args.edits)
+
+        start = time.perf_counter()
+        full = await analyzer.analyze_lease(revised, "CA")
+        full_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        incremental, report = await analyzer.reanalyze_lease(revised, "CA", previous)
+        incremental_s = time.perf_counter() - start
+
+        print(f"{count:>4} sections: full {full_s:6.2f}s ({len(full['extractedClauses'])} clauses)  "
+              f"incremental {incremental_s:6.2f}s ({len(incremental['extractedClauses'])} clauses, "
+              f"{report['sectionsAnalyzed']} sections analyzed, {len(report['added'])} added, "
+              f"{len(report['modified'])} modified, {len(report['removed'])} removed, {report['unchanged']} unchanged, "
+              f"score {report['scoreBefore']} -> {report['scoreAfter']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, nargs="+", default=[40, 120])
+    parser.add_argument("--edits", type=int, default=2)
+    parser.add_argument("--tokens-per-s", type=float, default=400)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
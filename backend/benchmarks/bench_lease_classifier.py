@@ -0,0 +1,111 @@
+"""
+Lease / not-lease validation: the local classifier (with Gemini only for the
+documents it is unsure of) versus asking Gemini about every document.
+Reports precision and recall on the labeled fixtures in
+fixtures/lease_classification.jsonl, how many documents were answered locally,
+and per-document latency. Gemini is faked with --gemini-ms latency and the
+fixture label as its answer, unless --live is given and GEMINI_API_KEY is set.
+
+Run from backend/:
+    python -m benchmarks.bench_lease_classifier
+    python -m benchmarks.bench_lease_classifier --live
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+
+from app.lease_analysis.lease_classifier import classify_lease
+from app.routes.upload import _gemini_is_lease, _validate_is_lease
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "lease_classification.jsonl")
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModels:
+    def __init__(self, labels: dict[str, bool], gemini_ms: float):
+        self.labels = labels
+        self.gemini_ms = gemini_ms
+        self.rng = random.Random(5)
+
+    async def generate_content(self, model: str, contents: str, config=None):
+        await asyncio.sleep(self.rng.lognormvariate(0, 0.25) * self.gemini_ms / 1000)
+        answer = next((label for text, label in self.labels.items() if text[:2000] in contents), True)
+        return FakeResponse("yes" if answer else "no")
+
+
+class FakeGemini:
+    def __init__(self, models: FakeModels):
+        self.aio = type("Aio", (), {"models": models})()
+
+
+def load_fixtures() -> list[dict]:
+    with open(FIXTURES, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def scores(labels: list[bool], predictions: list[bool]) -> tuple[float, float]:
+    tp = sum(1 for y, p in zip(labels, predictions) if y and p)
+    fp = sum(1 for y, p in zip(labels, predictions) if not y and p)
+    fn = sum(1 for y, p in zip(labels, predictions) if y and not p)
+    return tp / max(tp + fp, 1), tp / max(tp + fn, 1)
+
+
+async def timed(check, gemini, text: str) -> tuple[bool, float]:
+    start = time.perf_counter()
+    answer = await check(gemini, text)
+    return answer, (time.perf_counter() - start) * 1000
+
+
+async def run(args):
+    fixtures = load_fixtures()
+    labels = [f["label"] for f in fixtures]
+    if args.live:
+        from google import genai
+        gemini = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+    else:
+        gemini = FakeGemini(FakeModels({f["text"]: f["label"] for f in fixtures}, args.gemini_ms))
+
+    checks = [classify_lease(f["text"]) for f in fixtures]
+    confident = [(y, c.is_lease) for y, c in zip(labels, checks) if c.is_lease is not None]
+    precision, recall = scores([y for y, _ in confident], [p for _, p in confident])
+    print(f"{len(fixtures)} fixtures ({sum(labels)} leases)")
+    print(f"  local only   : answered {len(confident)}/{len(fixtures)}, precision {precision:.2f}, recall {recall:.2f}")
+    for fixture, check in zip(fixtures, checks):
+        if check.is_lease is None or check.is_lease != fixture["label"]:
+            state = "unsure" if check.is_lease is None else "WRONG"
+            print(f"    {state:6} p={check.probability:.2f} {fixture['name']}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for fixture in fixtures:
+            classify_lease(fixture["text"])
+    local_us = (time.perf_counter() - start) / (args.repeat * len(fixtures)) * 1e6
+    print(f"  classifier   : {local_us:.0f} us per document")
+
+    for name, check in [("gemini only", _gemini_is_lease), ("local+gemini", _validate_is_lease)]:
+        results = [await timed(check, gemini, f["text"]) for f in fixtures]
+        precision, recall = scores(labels, [answer for answer, _ in results])
+        latencies = sorted(ms for _, ms in results)
+        print(f"  {name:13}: precision {precision:.2f}, recall {recall:.2f}, "
+              f"mean {statistics.mean(latencies):7.1f}ms, p95 {latencies[int(len(latencies) * 0.95)]:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--gemini-ms", type=float, default=700)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Local PDF text extraction throughput on a corpus of synthetic leases (rendered
+with the local PDF renderer): the previous serial loop with `text +=` versus
+the process-pool LocalPdfExtractor. Reports pages per second.
+
+Run from backend/:
+    python -m benchmarks.bench_local_extract --pages 40 80 --docs 3 --workers 4
+"""
+import argparse
+import asyncio
+import io
+import random
+import time
+
+from pypdf import PdfReader
+
+from app.documents.local_extract import LocalPdfExtractor
+from app.documents.local_pdf import render_html_to_pdf
+
+SECTIONS = [
+    ("Rent", "Tenant shall pay monthly rent of ${amount} on the first day of each month. Rent paid after the "
+             "fifth day of the month shall incur a late fee of ${fee}."),
+    ("Security Deposit", "Tenant shall deposit ${amount} as security for the performance of this Lease. The deposit "
+                         "shall be returned within {days} days after Tenant vacates, less lawful deductions."),
+    ("Maintenance", "Tenant shall keep the Premises clean and sanitary and shall promptly notify Landlord of any "
+                    "defect. Landlord shall make repairs within {days} days of written notice."),
+    ("Entry", "Landlord may enter the Premises upon {days} hours notice for inspection, repairs, or showing the "
+              "Premises to prospective tenants or purchasers."),
+    ("Pets", "No animals shall be kept on the Premises without prior written consent. An additional pet deposit "
+             "of ${fee} applies to each approved animal."),
+    ("Subletting", "Tenant shall not assign this Lease or sublet any portion of the Premises without the prior "
+                   "written consent of Landlord, which shall not be unreasonably withheld."),
+    ("Termination", "Either party may terminate this Lease at the end of the term by giving {days} days written "
+                    "notice. Early termination requires payment of ${fee} as liquidated damages."),
+]
+
+
+def synthetic_lease(pages: int, seed: int) -> bytes:
+    """Renders a lease long enough to fill roughly `pages` pages."""
+    rng = random.Random(seed)
+    parts = ["<html><body><h1>Residential Lease Agreement</h1>"]
+    for n in range(pages * 4):
+        title, body = SECTIONS[n % len(SECTIONS)]
+        text = body.format(amount=rng.randint(1200, 4800), fee=rng.randint(25, 400), days=rng.choice([14, 21, 30]))
+        parts.append(f"<h3>{n + 1}. {title}</h3><p>{text} {text}</p>")
+    parts.append("</body></html>")
+    return render_html_to_pdf("".join(parts))
+
+
+def serial_extract(pdf_bytes: bytes) -> str:
+    """The previous FoxitClient._extract_text_local_sync."""
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text() + "\n"
+    return text
+
+
+async def pool_extract(extractor: LocalPdfExtractor, corpus: list[bytes]):
+    for pdf in corpus:
+        await extractor.extract(pdf)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[40, 80])
+    parser.add_argument("--docs", type=int, default=3, help="documents per size")
+    parser.add_argument("--workers", type=int, default=0, help="0 = one per CPU (max 4)")
+    args = parser.parse_args()
+
+    for pages in args.pages:
+        corpus = [synthetic_lease(pages, seed) for seed in range(args.docs)]
+        total_pages = sum(len(PdfReader(io.BytesIO(pdf)).pages) for pdf in corpus)
+
+        start = time.perf_counter()
+        for pdf in corpus:
+            serial_extract(pdf)
+        serial_s = time.perf_counter() - start
+
+        extractor = LocalPdfExtractor(workers=args.workers)
+        # Warm the pool so process start-up isn't billed to the first document
+        asyncio.run(pool_extract(extractor, corpus[:1]))
+        start = time.perf_counter()
+        asyncio.run(pool_extract(extractor, corpus))
+        pool_s = time.perf_counter() - start
+        extractor.shutdown()
+
+        print(
+            f"{pages:>3}-page leases ({total_pages} pages): serial {total_pages / serial_s:7.1f} pages/s, "
+            f"pool[{extractor.workers}] {total_pages / pool_s:7.1f} pages/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
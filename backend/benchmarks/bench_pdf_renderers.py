@@ -0,0 +1,125 @@
+"""
+Renders the real letter templates through each PDF backend: Foxit (against the
+local mock server) and the in-process LocalRenderer. Reports latency percentiles,
+output size, and checks that the local output's text survives a pypdf round-trip.
+
+Run from backend/:
+    python -m benchmarks.bench_pdf_renderers --requests 30 --min-task 0.2 --max-task 1.5
+"""
+import argparse
+import asyncio
+import io
+import statistics
+import time
+
+import httpx
+from pypdf import PdfReader
+
+from app.config import settings
+from app.documents.foxit_auth import FoxitAuth
+from app.documents.foxit_docgen import FoxitDocGenClient
+from app.documents.foxit_tasks import FoxitTaskTracker
+from app.documents.renderers import FoxitRenderer, LocalRenderer
+from app.voice_qa.maintenance import MaintenanceDocumenter
+from benchmarks.mock_foxit import MockServer, create_mock_app
+
+CLAUSE = {
+    "clauseType": "late_fee",
+    "originalText": "Tenant shall pay a late fee of fifteen percent (15%) of monthly rent for any payment "
+                    "received after the 1st day of the month.",
+    "citation": "Cal. Civ. Code 1671(d)",
+    "explanation": "Late fees must be a reasonable estimate of the landlord's actual damages.",
+}
+
+
+class CapturingDocGen(FoxitDocGenClient):
+    """Captures the HTML each create_* method would render instead of rendering it."""
+
+    async def generate_pdf(self, template_html: str, data: dict) -> bytes:
+        self.captured = template_html
+        return b""
+
+
+async def letter_templates(http, auth, tracker) -> dict[str, str]:
+    capture = CapturingDocGen(http, auth, tracker)
+    templates = {}
+    await capture.create_counter_letter("Alex Tenant", "Pat Landlord", CLAUSE, "CA")
+    templates["counter-letter"] = capture.captured
+    await capture.create_negotiation_letter(
+        "Alex Tenant", "Pat Landlord", 2850, 2400, "CA",
+        "California AB 1482 caps annual increases for covered units.", "Cal. Civ. Code 1947.12",
+    )
+    templates["negotiation"] = capture.captured
+    # generate_request_html doesn't touch the Gemini client
+    templates["maintenance"] = MaintenanceDocumenter.generate_request_html(None, {
+        "issue_type": "plumbing",
+        "urgency": "urgent",
+        "location_in_unit": "kitchen",
+        "description": "The kitchen sink has been leaking under the cabinet for a week.",
+        "requested_action": "Repair the leak and replace the damaged cabinet floor.",
+        "legal_basis": "Landlord must maintain plumbing in good working order.",
+        "timeline": "Within 7 days",
+    }, "Alex Tenant", "Pat Landlord", "12 Main St, Oakland, CA")
+    return templates
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def measure(renderer, html: str, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            pdf = await renderer.render(html)
+            return time.perf_counter() - start, pdf
+
+    results = await asyncio.gather(*[one() for _ in range(requests)])
+    return [elapsed for elapsed, _ in results], results[0][1]
+
+
+async def run(args):
+    async with httpx.AsyncClient(timeout=30) as http:
+        auth = FoxitAuth(http)
+        tracker = FoxitTaskTracker(http, auth)
+        templates = await letter_templates(http, auth, tracker)
+        backends = [FoxitRenderer(FoxitDocGenClient(http, auth, tracker)), LocalRenderer()]
+
+        for name, html in templates.items():
+            print(f"{name}:")
+            for renderer in backends:
+                samples, pdf = await measure(renderer, html, args.requests, args.concurrency)
+                line = (
+                    f"  {renderer.name:>6}: p50={statistics.median(samples) * 1000:8.1f}ms "
+                    f"p95={percentile(samples, 0.95) * 1000:8.1f}ms size={len(pdf):6d}B"
+                )
+                if renderer.name == "local":
+                    # The mock Foxit result is a placeholder, only the local output is checked
+                    pages = PdfReader(io.BytesIO(pdf)).pages
+                    text = " ".join(page.extract_text() or "" for page in pages)
+                    line += f" pages={len(pages)} text chars={len(text)}"
+                print(line)
+        await tracker.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--min-task", type=float, default=0.2, help="shortest mock conversion (s)")
+    parser.add_argument("--max-task", type=float, default=1.5, help="longest mock conversion (s)")
+    args = parser.parse_args()
+
+    mock_app = create_mock_app(task_seconds=(args.min_task, args.max_task))
+    with MockServer(mock_app) as server:
+        settings.FOXIT_API_BASE_URL = server.url
+        settings.FOXIT_CLIENT_ID = "bench"
+        settings.FOXIT_CLIENT_SECRET = "bench"
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Red-flag pre-screen throughput in MB of lease text per second: the compiled
+single-pass RedFlagIndex versus running each pattern as its own regex over the
+text. The corpus is synthetic lease text with red-flag sentences mixed in.
+
+Run from backend/:
+    python -m benchmarks.bench_red_flags --mb 4
+"""
+import argparse
+import random
+import re
+import time
+
+from app.lease_analysis.red_flags import RedFlagIndex, _pattern_source, load_seed_clauses
+from benchmarks.bench_local_extract import SECTIONS
+
+RED_FLAG_SENTENCES = [
+    "A late fee of $95 applies, plus $15 per day until paid.",
+    "The security deposit is non-refundable.",
+    "Landlord may enter the premises at any time without notice.",
+    "Tenant is responsible for all repairs regardless of cause.",
+    "This lease shall renew automatically for successive one-year terms.",
+    "Tenant waives all rights to a jury trial and agrees to pay attorney's fees.",
+]
+
+
+def corpus(mb: float, seed: int = 3) -> str:
+    rng = random.Random(seed)
+    parts, size = [], 0
+    while size < mb * 1024 * 1024:
+        title, body = rng.choice(SECTIONS)
+        text = f"{title}. " + body.format(amount=rng.randint(900, 4000), fee=rng.randint(20, 200), days=30)
+        if rng.random() < 0.15:
+            text += " " + rng.choice(RED_FLAG_SENTENCES)
+        parts.append(text)
+        size += len(text) + 1
+    return "\n".join(parts)
+
+
+def per_pattern(clauses: list[dict], text: str) -> int:
+    hits = 0
+    for clause in clauses:
+        for pattern in clause["redFlagPatterns"]:
+            hits += sum(1 for _ in re.finditer(_pattern_source(pattern), text, re.IGNORECASE))
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=4)
+    args = parser.parse_args()
+
+    clauses = load_seed_clauses()
+    text = corpus(args.mb)
+    mb = len(text.encode("utf-8")) / 1024 / 1024
+
+    start = time.perf_counter()
+    index = RedFlagIndex(clauses)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    hits = index.scan(text, "CA")
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loop_hits = per_pattern(clauses, text)
+    loop = time.perf_counter() - start
+
+    print(f"{len(index)} patterns, compiled in {compile_ms:.1f}ms, corpus {mb:.1f} MB")
+    print(f"  single pass : {mb / single:7.1f} MB/s  ({len(hits)} hits)")
+    print(f"  per pattern : {mb / loop:7.1f} MB/s  ({loop_hits} hits)")
+
+
+if __name__ == "__main__":
+    main()
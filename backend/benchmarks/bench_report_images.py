@@ -0,0 +1,78 @@
+"""
+Condition-report image cost: full video frames versus the thumbnails that
+ReportBuilder now uploads. Reports per-image bytes, the HTML payload sent to the
+renderer, and local PDF render time and size for a report with N defects.
+
+Run from backend/:
+    python -m benchmarks.bench_report_images --defects 8
+"""
+import argparse
+import base64
+import io
+import time
+
+import numpy as np
+from PIL import Image
+
+from app.deposit_defender.thumbnails import make_thumbnail
+from app.documents.local_pdf import render_html_to_pdf
+from app.documents.templating import render_template
+
+
+def synthetic_frame(seed: int, width: int = 1920, height: int = 1080) -> bytes:
+    """A camera-like frame: smooth gradients plus sensor noise, JPEG at OpenCV's default quality."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([(x / width) * 200, (y / height) * 180, ((x + y) / (width + height)) * 160], axis=-1)
+    pixels = np.clip(base + rng.normal(0, 12, base.shape) + seed * 5, 0, 255).astype(np.uint8)
+    out = io.BytesIO()
+    Image.fromarray(pixels).save(out, format="JPEG", quality=95)
+    return out.getvalue()
+
+
+def report_html(images: list[bytes]) -> str:
+    return render_template("condition_report", {
+        "date": "2025-06-01",
+        "defect_count": len(images),
+        "defects": [
+            {
+                "title": "Wall Damage",
+                "severity": "moderate",
+                "severity_label": "Moderate",
+                "description": "Scuffs and a small hole near the door frame.",
+                "location": "Living room",
+                "image_src": "data:image/jpeg;base64," + base64.b64encode(image).decode(),
+            }
+            for image in images
+        ],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--defects", type=int, default=8)
+    args = parser.parse_args()
+
+    frames = [synthetic_frame(i) for i in range(args.defects)]
+    start = time.perf_counter()
+    thumbnails = [make_thumbnail(frame) for frame in frames]
+    thumb_ms = (time.perf_counter() - start) * 1000 / len(frames)
+    print(
+        f"per image: original={sum(map(len, frames)) / len(frames) / 1024:7.1f}KB "
+        f"thumbnail={sum(map(len, thumbnails)) / len(thumbnails) / 1024:6.1f}KB "
+        f"(thumbnailing {thumb_ms:.1f}ms/image)"
+    )
+
+    for label, images in (("full frames", frames), ("thumbnails", thumbnails)):
+        html = report_html(images)
+        start = time.perf_counter()
+        pdf = render_html_to_pdf(html)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(
+            f"{label:>12}: html={len(html) / 1024:8.1f}KB pdf={len(pdf) / 1024:8.1f}KB "
+            f"local render={elapsed:6.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
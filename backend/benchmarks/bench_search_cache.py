@@ -0,0 +1,90 @@
+"""
+You.com search traffic with and without the shared SearchCache, and with the
+state law table answering statute lookups in front of it. Replays
+--requests negotiation-letter / rent-radar lookups spread over a few states
+and zip codes against a fake You.com (httpx.MockTransport) that answers after
+--latency-ms and fails --error-rate of the calls. Reports upstream calls and
+mean lookup latency; failed (empty) results are not cached, so they are
+retried by the next request.
+
+Run from backend/:
+    python -m benchmarks.bench_search_cache --requests 200
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+import httpx
+
+from app.config import settings
+from app.law_engine.state_laws import StateLawRegistry
+from app.law_engine.youcom_legal import YouComLegalSearch
+from app.rent_radar.comparables import RentRadar
+from app.search_cache import SearchCache
+
+STATES = ["CA", "NY", "TX", "WA", "IL"]
+
+
+class FakeYouCom:
+    def __init__(self, latency_ms: float, error_rate: float):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.calls = 0
+        self.rng = random.Random(11)
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(self.rng.lognormvariate(0, 0.3) * self.latency_ms / 1000)
+        if self.rng.random() < self.error_rate:
+            return httpx.Response(503, text="busy")
+        return httpx.Response(200, json={"answer": "Cal. Civ. Code § 1947.12 limits increases.", "hits": [
+            {"title": "Statute", "url": "https://example.org/statute"},
+        ]})
+
+
+async def workload(legal: YouComLegalSearch, radar: RentRadar, requests: int) -> list[float]:
+    rng = random.Random(3)
+    latencies = []
+    for _ in range(requests):
+        state = rng.choice(STATES)
+        zip_code = f"9{rng.randint(0, 19):04d}"
+        start = time.perf_counter()
+        if rng.random() < 0.6:
+            await legal.search_statute(state, "rent_increase", "")
+        else:
+            await radar.search_rent_laws(state, zip_code)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run(args):
+    settings.YOU_COM_API_KEY = settings.YOU_COM_API_KEY or "bench"
+    with tempfile.TemporaryDirectory() as directory:
+        setups = [
+            ("no cache", None, None),
+            ("search cache", SearchCache(1024, directory, 8 * 1024 * 1024), None),
+            ("+ state laws", SearchCache(1024, None), StateLawRegistry()),
+        ]
+        for label, cache, laws in setups:
+            upstream = FakeYouCom(args.latency_ms, args.error_rate)
+            async with httpx.AsyncClient(transport=httpx.MockTransport(upstream)) as http:
+                legal = YouComLegalSearch(http, cache, laws)
+                radar = RentRadar(http, None, cache)
+                latencies = await workload(legal, radar, args.requests)
+            print(f"{label:13}: {upstream.calls:4} You.com calls for {args.requests} lookups, "
+                  f"mean {sum(latencies) / len(latencies) * 1000:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
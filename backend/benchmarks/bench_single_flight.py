@@ -0,0 +1,104 @@
+"""
+Bursts of identical upstream calls with and without single-flight coalescing.
+Fires --burst concurrent /rent/analyze lookups (comparables plus rent laws) and
+negotiation-letter statute searches spread over --areas zip codes, the way a
+trending area arrives, against a fake You.com (httpx.MockTransport) behind the
+app's You.com rate limit and a fake Gemini. The search cache is on in both
+runs; it only helps once the first answer for a query is in. Reports upstream
+calls and p50/p95 latency.
+
+Run from backend/:
+    python -m benchmarks.bench_single_flight --burst 100 --areas 3
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import httpx
+
+from app.config import settings
+from app.law_engine.youcom_legal import YouComLegalSearch
+from app.rate_limit import TokenBucket
+from app.rent_radar.comparables import RentRadar
+from app.search_cache import SearchCache
+from benchmarks.bench_search_cache import FakeYouCom
+
+
+class NoFlight:
+    """Stands in for SingleFlight: every caller makes its own call."""
+
+    async def do(self, key, call):
+        return await call()
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModels:
+    def __init__(self, latency_ms: float):
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    async def generate_content(self, model: str, contents: str, config=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency_ms / 1000)
+        return FakeResponse(json.dumps({
+            "average": 2450, "min": 2100, "max": 2900, "confidence": "medium", "comparables": [],
+            "rent_control_applies": True, "max_legal_increase": "10%", "market_summary": "Stable market.",
+        }))
+
+
+class FakeGemini:
+    def __init__(self, latency_ms: float):
+        self.aio = type("Aio", (), {"models": FakeModels(latency_ms)})()
+
+
+async def lookup(legal: YouComLegalSearch, radar: RentRadar, zip_code: str, negotiation: bool) -> float:
+    start = time.perf_counter()
+    if negotiation:
+        await legal.search_statute("CA", "rent_increase", "")
+    else:
+        await radar.search_comparables(zip_code, 2, "CA")
+        await radar.search_rent_laws("CA", zip_code)
+    return time.perf_counter() - start
+
+
+async def run(args):
+    settings.YOU_COM_API_KEY = settings.YOU_COM_API_KEY or "bench"
+    rng = random.Random(9)
+    burst = [(f"9{rng.randrange(args.areas):04d}", rng.random() < 0.3) for _ in range(args.burst)]
+    for label in ("no coalescing", "single-flight"):
+        upstream = FakeYouCom(args.latency_ms, error_rate=0)
+        gemini = FakeGemini(args.gemini_latency_ms)
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream)) as http:
+            cache = SearchCache(1024)
+            limiter = TokenBucket(args.rate, args.rate_burst)
+            legal = YouComLegalSearch(http, cache, limiter=limiter)
+            radar = RentRadar(http, gemini, cache, limiter)
+            if label == "no coalescing":
+                legal.flights = radar.flights = radar.comparables_flights = NoFlight()
+            latencies = sorted(await asyncio.gather(*(lookup(legal, radar, z, n) for z, n in burst)))
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"{label:13}: {upstream.calls:4} You.com + {gemini.aio.models.calls:3} Gemini calls for "
+              f"{args.burst} requests, p50 {statistics.median(latencies) * 1000:6.0f}ms  p95 {p95 * 1000:6.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=100)
+    parser.add_argument("--areas", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--gemini-latency-ms", type=float, default=1200)
+    parser.add_argument("--rate", type=float, default=settings.YOU_COM_RATE)
+    parser.add_argument("--rate-burst", type=int, default=settings.YOU_COM_BURST)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
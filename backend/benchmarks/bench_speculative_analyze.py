@@ -0,0 +1,106 @@
+"""
+/analyze Gemini stage latency: lease validation followed by analysis (the
+previous flow) versus analysis started speculatively alongside validation.
+Gemini is faked with latencies drawn around --validate-s and --analyze-s; a
+--reject-rate share of the documents are not leases. Reports p50/p95 latency
+for accepted documents and the analysis input tokens spent on rejected ones.
+
+Run from backend/:
+    python -m benchmarks.bench_speculative_analyze --docs 40 --reject-rate 0.1
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from app.lease_analysis.analyzer import LeaseAnalyzer
+from app.metrics import metrics
+from app.routes.upload import _gemini_is_lease
+from app.speculation import SpeculationRejected, speculate
+from benchmarks.bench_local_extract import SECTIONS
+
+NOT_A_LEASE = "QUARTERLY INVOICE"
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModels:
+    def __init__(self, validate_s: float, analyze_s: float, rng: random.Random):
+        self.validate_s = validate_s
+        self.analyze_s = analyze_s
+        self.rng = rng
+
+    async def generate_content(self, model: str, contents: str, config=None):
+        if "Reply with ONLY" in contents:
+            await asyncio.sleep(self.rng.lognormvariate(0, 0.25) * self.validate_s)
+            return FakeResponse("no" if NOT_A_LEASE in contents else "yes")
+        await asyncio.sleep(self.rng.lognormvariate(0, 0.25) * self.analyze_s)
+        return FakeResponse('{"extractedClauses": [], "overallRiskScore": 10, "summary": "ok"}')
+
+
+class FakeGemini:
+    def __init__(self, models: FakeModels):
+        self.aio = type("Aio", (), {"models": models})()
+
+
+async def serial(gemini, analyzer: LeaseAnalyzer, text: str):
+    if not await _gemini_is_lease(gemini, text):
+        raise SpeculationRejected("not a lease")
+    return await analyzer.analyze_lease(text, "CA")
+
+
+async def speculative(gemini, analyzer: LeaseAnalyzer, text: str):
+    return await speculate(
+        _gemini_is_lease(gemini, text), analyzer.analyze_lease(text, "CA"), "lease_analysis",
+        cost=analyzer.estimate_input_tokens(text),
+    )
+
+
+async def run(args):
+    rng = random.Random(7)
+    gemini = FakeGemini(FakeModels(args.validate_s, args.analyze_s, rng))
+    analyzer = LeaseAnalyzer(gemini)
+    docs = []
+    for n in range(args.docs):
+        body = " ".join(text for _, text in SECTIONS) * 30
+        docs.append((NOT_A_LEASE + " " if rng.random() < args.reject_rate else "") + body)
+
+    for name, flow in [("serial", serial), ("speculative", speculative)]:
+        accepted, rejected_tokens = [], 0
+
+        async def one(text: str):
+            nonlocal rejected_tokens
+            start = time.perf_counter()
+            try:
+                await flow(gemini, analyzer, text)
+                accepted.append(time.perf_counter() - start)
+            except SpeculationRejected:
+                if flow is speculative:
+                    rejected_tokens += analyzer.estimate_input_tokens(text)
+
+        await asyncio.gather(*(one(text) for text in docs))
+        accepted.sort()
+        print(
+            f"{name:>11}: p50={statistics.median(accepted) * 1000:7.0f}ms "
+            f"p95={accepted[int(len(accepted) * 0.95) - 1] * 1000:7.0f}ms "
+            f"rejected docs={args.docs - len(accepted)} analysis tokens spent on them={rejected_tokens}"
+        )
+    print({k: round(v, 1) for k, v in metrics.snapshot().items() if k.startswith("speculation.")})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=40)
+    parser.add_argument("--reject-rate", type=float, default=0.1)
+    parser.add_argument("--validate-s", type=float, default=0.8)
+    parser.add_argument("--analyze-s", type=float, default=6.0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Time-to-first-byte and peak RSS for the large-body endpoints, buffered versus
+streamed: /generate/report/{id} (PDF downloaded from the mock Foxit server) and
+/tts/read-aloud (audio from a fake Deepgram client that produces chunks at a
+fixed pace). The buffered variants reproduce the previous handlers, which built
+the whole body before responding.
+
+Each mode runs in its own process because peak RSS is a high-water mark.
+
+Run from backend/:
+    python -m benchmarks.bench_streaming --pdf-mb 48 --audio-mb 8
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends, Form
+from fastapi.responses import Response
+
+from app.chat.voice_service import DeepgramService
+from app.config import settings
+from app.dependencies import Upstreams, get_deepgram, get_docgen, get_sanity, get_upstreams
+from benchmarks.mock_foxit import MockServer, create_mock_app
+
+AUDIO_CHUNK = 32 * 1024
+REPORT = {
+    "inspectionDate": "2025-06-01T10:00:00Z",
+    "defects": [
+        {"type": "wall_damage", "severity": "major", "description": "Hole near the door frame.",
+         "location": "Living room"},
+    ],
+}
+
+
+class FakeSpeak:
+    def __init__(self, chunks: int, delay: float):
+        self.chunks = chunks
+        self.delay = delay
+
+    async def generate(self, text: str, model: str, encoding: str):
+        for _ in range(self.chunks):
+            await asyncio.sleep(self.delay)
+            yield b"\xff" * AUDIO_CHUNK
+
+
+class FakeDeepgramClient:
+    def __init__(self, chunks: int, delay: float):
+        self.speak = type("Speak", (), {"v1": type("V1", (), {"audio": FakeSpeak(chunks, delay)})()})()
+
+
+class FakeSanity:
+    async def get_condition_report(self, report_id: str) -> dict:
+        return REPORT
+
+
+def build_app(mode: str, audio_chunks: int, audio_delay: float):
+    from app.main import app
+
+    def docgen_without_cache(upstreams: Upstreams = Depends(get_upstreams)):
+        # Keep the PDF cache out of the measurement
+        upstreams.docgen.cache = None
+        return upstreams.docgen
+
+    app.dependency_overrides[get_sanity] = FakeSanity
+    app.dependency_overrides[get_docgen] = docgen_without_cache
+    app.dependency_overrides[get_deepgram] = lambda: DeepgramService(FakeDeepgramClient(audio_chunks, audio_delay))
+
+    if mode == "buffered":
+        @app.get("/buffered/report/{report_id}")
+        async def buffered_report(report_id: str, docgen=Depends(get_docgen)):
+            pdf_bytes = await docgen.create_condition_report(REPORT)
+            return Response(content=pdf_bytes, media_type="application/pdf")
+
+        @app.post("/buffered/read-aloud")
+        async def buffered_read_aloud(text: str = Form(...), dg=Depends(get_deepgram)):
+            audio_bytes = await dg.read_aloud(text)
+            return Response(content=audio_bytes, media_type="audio/mpeg")
+    return app
+
+
+def timed_request(client: httpx.Client, method: str, url: str, **kwargs) -> tuple[float, float, int]:
+    start = time.perf_counter()
+    ttfb = None
+    size = 0
+    with client.stream(method, url, **kwargs) as response:
+        response.raise_for_status()
+        for chunk in response.iter_raw():
+            if ttfb is None:
+                ttfb = time.perf_counter() - start
+            size += len(chunk)
+    return ttfb, time.perf_counter() - start, size
+
+
+def serve_mock_foxit(pdf_mb: float, urls, stop):
+    mock_app = create_mock_app(task_seconds=0.1, result=b"%PDF-1.4\n" + b"0" * int(pdf_mb * 1024 * 1024))
+    with MockServer(mock_app) as foxit:
+        urls.put(foxit.url)
+        stop.wait()
+
+
+def worker(args):
+    settings.PDF_RENDERER = "foxit"
+    settings.FOXIT_CLIENT_ID = "bench"
+    settings.FOXIT_CLIENT_SECRET = "bench"
+    settings.PDF_CACHE_DIR = tempfile.mkdtemp()
+    audio_chunks = int(args.audio_mb * 1024 * 1024 / AUDIO_CHUNK)
+
+    # The mock Foxit server runs in its own process so its buffers don't count
+    urls, stop = multiprocessing.Queue(), multiprocessing.Event()
+    foxit = multiprocessing.Process(target=serve_mock_foxit, args=(args.pdf_mb, urls, stop), daemon=True)
+    foxit.start()
+    try:
+        settings.FOXIT_API_BASE_URL = urls.get(timeout=30)
+        app = build_app(args.worker, audio_chunks, args.audio_delay)
+        with MockServer(app) as server, httpx.Client(base_url=server.url, timeout=120) as client:
+            prefix = "/buffered" if args.worker == "buffered" else "/api/v1"
+            report_url = f"{prefix}/report/demo" if args.worker == "buffered" else f"{prefix}/generate/report/demo"
+            audio_url = f"{prefix}/read-aloud" if args.worker == "buffered" else f"{prefix}/tts/read-aloud"
+
+            baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            results = {}
+            for name, method, url, kwargs in [
+                ("report", "GET", report_url, {}),
+                ("read-aloud", "POST", audio_url, {"data": {"text": "Your lease has three red flags."}}),
+            ]:
+                runs = [timed_request(client, method, url, **kwargs) for _ in range(args.requests)]
+                results[name] = {
+                    "ttfb_ms": sorted(r[0] for r in runs)[len(runs) // 2] * 1000,
+                    "total_ms": sorted(r[1] for r in runs)[len(runs) // 2] * 1000,
+                    "bytes": runs[0][2],
+                }
+            results["peak_rss_growth_mb"] = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024
+    finally:
+        stop.set()
+        foxit.join(timeout=5)
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf-mb", type=float, default=48)
+    parser.add_argument("--audio-mb", type=float, default=8)
+    parser.add_argument("--audio-delay", type=float, default=0.005, help="seconds per fake TTS chunk")
+    parser.add_argument("--requests", type=int, default=3)
+    parser.add_argument("--worker", choices=["buffered", "streaming"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    for mode in ("buffered", "streaming"):
+        command = [sys.executable, "-m", "benchmarks.bench_streaming", "--worker", mode,
+                   "--pdf-mb", str(args.pdf_mb), "--audio-mb", str(args.audio_mb),
+                   "--audio-delay", str(args.audio_delay), "--requests", str(args.requests)]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        results = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode}: peak RSS growth {results['peak_rss_growth_mb']:.1f} MB")
+        for name in ("report", "read-aloud"):
+            r = results[name]
+            print(f"  {name:>10}: ttfb={r['ttfb_ms']:8.1f}ms total={r['total_ms']:8.1f}ms body={r['bytes'] / 1e6:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
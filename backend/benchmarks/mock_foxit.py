@@ -0,0 +1,95 @@
+"""
+Local mock of the Foxit PDF Services endpoints used by LeaseGuard.
+Tasks complete after a configurable delay so polling behaviour can be measured
+without touching the real API. Used by the scripts in this folder.
+"""
+import asyncio
+import itertools
+import random
+import socket
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+MOCK_PDF = b"%PDF-1.4\n% LeaseGuard mock\n" + b"0" * 2048 + b"\n%%EOF\n"
+MOCK_TEXT = "RESIDENTIAL LEASE AGREEMENT\nThis lease is made between Landlord and Tenant.\n"
+
+
+def create_mock_app(task_seconds: float | tuple[float, float] = 0.3, latency: float = 0.02, result: bytes = None) -> FastAPI:
+    """
+    Builds the mock app. `task_seconds` is how long each conversion/extraction
+    stays IN_PROGRESS (a (min, max) tuple draws uniformly per task), `latency`
+    is added to every request to mimic network RTT.
+    """
+    app = FastAPI()
+    ids = itertools.count(1)
+    tasks: dict[str, float] = {}
+    app.state.status_calls = 0
+
+    async def rtt():
+        if latency:
+            await asyncio.sleep(latency)
+
+    @app.post("/api/v1/oauth2/token")
+    async def token():
+        await rtt()
+        return {"access_token": "mock-access-token", "expires_in": 3600}
+
+    @app.post("/pdf-services/api/documents/upload")
+    async def upload(request: Request):
+        await request.body()
+        await rtt()
+        return {"documentId": f"doc-{next(ids)}"}
+
+    @app.post("/pdf-services/api/documents/convert/pdf-to-text")
+    @app.post("/pdf-services/api/documents/create/pdf-from-html")
+    async def start_task():
+        await rtt()
+        task_id = f"task-{next(ids)}"
+        duration = random.uniform(*task_seconds) if isinstance(task_seconds, tuple) else task_seconds
+        tasks[task_id] = time.monotonic() + duration
+        return {"taskId": task_id}
+
+    @app.get("/pdf-services/api/tasks/{task_id}")
+    async def task_status(task_id: str):
+        await rtt()
+        app.state.status_calls += 1
+        ready_at = tasks.get(task_id)
+        if ready_at is None:
+            return {"status": "FAILED", "taskId": task_id}
+        if time.monotonic() < ready_at:
+            return {"status": "IN_PROGRESS", "taskId": task_id}
+        return {"status": "COMPLETED", "taskId": task_id, "resultDocumentId": f"result-{task_id}"}
+
+    @app.get("/pdf-services/api/documents/{doc_id}/download")
+    async def download(doc_id: str):
+        await rtt()
+        body = result if result is not None else MOCK_PDF
+        return Response(content=body, media_type="application/pdf")
+
+    return app
+
+
+class MockServer:
+    """Runs a mock app with uvicorn on a background thread for the duration of a `with` block."""
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
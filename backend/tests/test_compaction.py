@@ -0,0 +1,107 @@
+import re
+import time
+
+from app.lease_analysis.compaction import _is_fill_line, compact_lease
+
+
+def test_fill_lines_are_dropped():
+    text = "Rent is due monthly.\nTenant Initials: ______\nDate: ______   Signature: ________\nLate fees apply."
+    compacted = compact_lease(text)
+    assert compacted.text == "Rent is due monthly.\nLate fees apply."
+    assert compacted.removed_lines == 2
+
+
+def test_fill_line_needs_a_blank_at_the_end():
+    assert _is_fill_line("Landlord ..........")
+    assert not _is_fill_line("Rent is ____ per month")
+    assert not _is_fill_line("Tenant Initials")
+
+
+def test_near_miss_fill_line_is_linear():
+    # Used to backtrack exponentially in the label-then-blank regex
+    line = "a ___  " * 40 + "!"
+    start = time.perf_counter()
+    assert not _is_fill_line(line.strip())
+    compact_lease(line)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_line_break_hyphen_is_kept():
+    compacted = compact_lease("The well-\nknown month-to-\nmonth lease.")
+    assert compacted.text == "The well-known month-to-month lease."
+
+
+TERMS = [
+    ("Tenant   shall pay a late fee of $50 if rent is received after the fifth", "day of the month."),
+    ("Landlord may enter the premises with twenty-four hours' notice for repairs, inspec-", "tions and showings."),
+    ("The security deposit of $3,000 is returned within twenty-one days after", "Tenant moves out."),
+    ("Tenant may not sublet the premises or assign this lease without the written", "consent of Landlord."),
+]
+
+
+def _paged_lease(pages: int) -> str:
+    out = []
+    for page in range(1, pages + 1):
+        first, second = TERMS[(page - 1) % len(TERMS)]
+        out.append("Acme Properties    Residential Lease    Unit 4B")
+        out.append("")
+        out.append(f"{page}.  {first}")
+        out.append(second)
+        out.append("Tenant Initials: ________")
+        out.append(f"Page {page} of {pages}\f")
+    return "\n".join(out)
+
+
+def test_running_headers_and_page_numbers_are_dropped():
+    compacted = compact_lease(_paged_lease(4))
+    assert "Acme Properties" not in compacted.text
+    assert "Page 2 of 4" not in compacted.text
+    assert "Initials" not in compacted.text
+    assert "1. Tenant shall pay a late fee of $50" in compacted.text
+
+
+def test_every_copied_word_maps_back_to_itself():
+    compacted = compact_lease(_paged_lease(4))
+    for word in re.finditer(r"\S+", compacted.text):
+        start, end = compacted.original_span(word.start(), word.end())
+        # A word rejoined across a line break keeps the break in the original
+        assert "".join(compacted.original[start:end].split()) == word.group()
+
+
+def test_locate_maps_quotes_across_collapsed_whitespace_and_line_breaks():
+    compacted = compact_lease(_paged_lease(3))
+    start, end = compacted.locate("late fee of $50 if rent is received after the fifth day of the month")
+    assert compacted.original[start:end] == "late fee of $50 if rent is received after the fifth\nday of the month"
+    start, end = compacted.locate("repairs, inspections and showings")
+    assert compacted.original[start:end] == "repairs, inspec-\ntions and showings"
+    assert compacted.locate("a clause that is not there") is None
+    assert compacted.locate("   ") is None
+
+
+def test_offsets_at_the_edges():
+    compacted = compact_lease("Lease.\n\n\n\nRent is $1,500.")
+    assert compacted.text == "Lease.\n\nRent is $1,500."
+    assert compacted.original_offset(0) == 0
+    assert compacted.original_span(3, 3) == (3, 3)
+    start, end = compacted.locate("Rent is $1,500.")
+    assert compacted.original[start:end] == "Rent is $1,500."
+    assert compact_lease("").text == ""
+
+
+def test_standalone_numbers_in_body_text_survive():
+    text = ("1. Rent\nTenant shall pay monthly rent in the amount of\n1800\ndollars. Security deposit equal to\n"
+            "3600\nis due at signing.\n2. Term\nThe lease runs for\n12\nmonths.")
+    compacted = compact_lease(text)
+    for value in ("1800", "3600", "12"):
+        assert f"\n{value}\n" in compacted.text
+    assert compacted.removed_lines == 0
+
+
+def test_bare_page_numbers_are_dropped():
+    body = ["Tenant pays rent monthly.", "Landlord maintains the roof.", "Pets need consent.", "Smoking is banned."]
+    # A 1, 2, 3, 4 run without form feeds, and a bare number right before a form feed
+    run = "\n".join(f"{line}\n{n}" for n, line in enumerate(body, 1))
+    assert compact_lease(run).text == "\n".join(body)
+    assert compact_lease("Tenant pays rent monthly.\n7\fLandlord maintains the roof.").text == (
+        "Tenant pays rent monthly.\nLandlord maintains the roof."
+    )
@@ -0,0 +1,42 @@
+import io
+
+from pypdf import PdfReader
+
+from app.documents.local_pdf import render_html_to_pdf, text_width
+
+
+def read(pdf: bytes) -> PdfReader:
+    assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+    return PdfReader(io.BytesIO(pdf), strict=True)
+
+
+def page_text(pdf: bytes) -> str:
+    return " ".join(" ".join(page.extract_text().split()) for page in read(pdf).pages)
+
+
+def test_string_delimiters_are_escaped():
+    html = r"<p>Fee (see \ Section 4(b)) is due ((twice)) and ) unbalanced (</p>"
+    text = page_text(render_html_to_pdf(html))
+    assert r"Fee (see \ Section 4(b)) is due ((twice)) and ) unbalanced (" in text
+
+
+def test_title_is_escaped():
+    pdf = render_html_to_pdf("<p>Hello</p>", title=r"Counter letter (draft) \ v2")
+    assert read(pdf).metadata.title == r"Counter letter (draft) \ v2"
+
+
+def test_characters_outside_winansi_are_dropped():
+    text = page_text(render_html_to_pdf("<p>Rent – $1,500 “due” 🏠 now</p>"))
+    assert "Rent – $1,500 “due” now" in text
+
+
+def test_long_text_wraps_onto_more_pages():
+    html = "".join(f"<p>Paragraph {n} (with parentheses) of the lease terms.</p>" for n in range(200))
+    reader = read(render_html_to_pdf(html))
+    assert len(reader.pages) > 1
+    assert "Paragraph 199 (with parentheses)" in " ".join(reader.pages[-1].extract_text().split())
+
+
+def test_text_width_uses_font_metrics():
+    assert text_width("iiii", False, False, 10) < text_width("MMMM", False, False, 10)
+    assert text_width("Rent", True, False, 10) > text_width("Rent", False, False, 10)
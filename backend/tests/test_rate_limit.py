@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import pytest
+
+from app.rate_limit import TokenBucket
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_burst_is_served_immediately():
+    async def burst():
+        bucket = TokenBucket(rate=1, burst=5)
+        start = time.monotonic()
+        assert all([await bucket.acquire() for _ in range(5)])
+        return time.monotonic() - start
+
+    assert run(burst()) < 0.05
+
+
+def test_waiters_are_paced_at_the_rate():
+    async def paced():
+        bucket = TokenBucket(rate=50, burst=1)
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+        return time.monotonic() - start
+
+    # One token in the bucket, then five more at 20ms each
+    assert run(paced()) == pytest.approx(0.1, abs=0.04)
+
+
+def test_deadline_rejects_without_taking_a_token():
+    async def rejected():
+        bucket = TokenBucket(rate=10, burst=1)
+        assert await bucket.acquire()
+        start = time.monotonic()
+        assert not await bucket.acquire(deadline=time.monotonic() + 0.05)
+        assert time.monotonic() - start < 0.01
+        # The rejected call didn't reserve anything: the next token is still 100ms out
+        assert await bucket.acquire(deadline=time.monotonic() + 0.2)
+
+    run(rejected())
+
+
+def test_cancelled_waiter_returns_its_token():
+    async def cancelled():
+        bucket = TokenBucket(rate=10, burst=1)
+        await bucket.acquire()
+        waiter = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        start = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - start
+
+    # Without the refund this caller would wait behind the cancelled reservation (~190ms)
+    assert run(cancelled()) < 0.12
+
+
+def test_tokens_refill_up_to_the_burst():
+    async def refill():
+        bucket = TokenBucket(rate=100, burst=3)
+        for _ in range(3):
+            await bucket.acquire()
+        await asyncio.sleep(0.2)
+        bucket._fill(time.monotonic())
+        return bucket.tokens
+
+    assert run(refill()) == 3
@@ -0,0 +1,66 @@
+from app.lease_analysis.red_flags import RedFlagIndex, load_seed_clauses, prescreen
+
+CLAUSES = [
+    {"clauseType": "late_fee", "commonName": "Late Fee", "redFlagPatterns": ["late fee", "late fee of", "re:\\$\\d{3,} late"],
+     "stateRules": {"CA": {"maxLateFee": "reasonable"}}},
+    {"clauseType": "entry", "redFlagPatterns": ["enter at any time", "without notice", "re:[unclosed"]},
+]
+
+
+def scan(text: str, state: str = None):
+    return RedFlagIndex(CLAUSES).scan(text, state)
+
+
+def test_phrases_match_case_and_whitespace_insensitively():
+    text = "Tenant agrees Landlord may ENTER  AT\nany Time."
+    hits = scan(text)
+    assert [(h.clause_type, h.pattern) for h in hits] == [("entry", "enter at any time")]
+    assert text[hits[0].start:hits[0].end] == "ENTER  AT\nany Time"
+
+
+def test_longest_shared_prefix_phrase_wins():
+    hits = scan("A late fee of $50 applies.")
+    assert [h.pattern for h in hits] == ["late fee of"]
+
+
+def test_word_boundaries():
+    assert scan("Related fees and late feed are fine.") == []
+
+
+def test_regex_patterns_and_document_order():
+    text = "Landlord may enter without notice. A $150 late charge applies, plus a late fee."
+    hits = scan(text, "ca")
+    assert [h.pattern for h in hits] == ["without notice", "re:\\$\\d{3,} late", "late fee"]
+    assert hits[1].state_rule == {"maxLateFee": "reasonable"}
+    assert hits[0].state_rule is None
+
+
+def test_invalid_regex_is_skipped():
+    assert len(RedFlagIndex(CLAUSES)) == 5
+
+
+def test_offsets_survive_case_folding_that_changes_length():
+    # "İ" lower-cases to two characters, which would shift offsets in the lowered text
+    text = "İİİ Tenant pays a LATE FEE."
+    hit, = scan(text)
+    assert text[hit.start:hit.end] == "LATE FEE"
+
+
+def test_hit_span_is_the_sentence():
+    text = "Rent is due on the first. Landlord may enter without notice to inspect. Pets allowed."
+    hit, = scan(text)
+    assert hit.text == "Landlord may enter without notice to inspect."
+
+
+def test_prescreen_merges_overlapping_passages():
+    report = prescreen(scan("A late fee of $100 late and more. Also a late fee."))
+    late, = report["flags"]
+    assert report["flagCount"] == 3
+    assert late["clauseType"] == "Late Fee"
+    assert [len(p["patterns"]) for p in late["passages"]] == [2, 1]
+
+
+def test_seed_library_compiles():
+    index = RedFlagIndex(load_seed_clauses())
+    assert len(index) > 0
+    assert index.scan("") == []
@@ -0,0 +1,62 @@
+import json
+import random
+
+from app.lease_analysis.stream_parser import AnalysisStreamParser
+
+ANALYSIS = {
+    "propertyAddress": "12 Elm St, Apt {3}",
+    "extractedClauses": [
+        {"clauseType": "late_fee", "originalText": "A fee of $75 (\"late charge\") applies}", "riskLevel": "red",
+         "sources": [{"title": "Civ. Code [1671]", "url": "https://example.org"}]},
+        {"clauseType": "entry", "originalText": "Landlord may enter: \\ anytime, {no notice}.", "riskLevel": "yellow"},
+    ],
+    "overallRiskScore": 72,
+    "summary": "Two clauses, \"one\" red.\nSee details.",
+}
+
+
+def feed_all(text: str, sizes) -> tuple[AnalysisStreamParser, list]:
+    parser, events, position = AnalysisStreamParser(), [], 0
+    for size in sizes:
+        events += parser.feed(text[position:position + size])
+        position += size
+        if position >= len(text):
+            break
+    return parser, events
+
+
+def test_events_match_the_document_for_any_chunking():
+    text = json.dumps(ANALYSIS, indent=2)
+    rng = random.Random(4)
+    for sizes in ([1] * len(text), [len(text)], [rng.randint(1, 40) for _ in range(len(text))]):
+        parser, events = feed_all(text, sizes)
+        assert [p for kind, p in events if kind == "clause"] == ANALYSIS["extractedClauses"]
+        assert dict(p for kind, p in events if kind == "field") == {
+            k: v for k, v in ANALYSIS.items() if k != "extractedClauses"
+        }
+        assert parser.complete
+        assert parser.result() == ANALYSIS
+
+
+def test_clause_is_reported_when_its_brace_arrives():
+    text = json.dumps(ANALYSIS)
+    end = text.index("}]}", text.index("late_fee")) + 3
+    parser = AnalysisStreamParser()
+    events = parser.feed(text[:end - 1])
+    assert [kind for kind, _ in events] == ["field"]
+    assert parser.feed(text[end - 1:end]) == [("clause", ANALYSIS["extractedClauses"][0])]
+
+
+def test_truncated_stream_keeps_completed_clauses():
+    text = json.dumps(ANALYSIS)
+    cut = text.index('"entry"') + 20
+    parser, _ = feed_all(text[:cut], [cut])
+    assert not parser.complete
+    assert parser.result() == {"propertyAddress": ANALYSIS["propertyAddress"],
+                               "extractedClauses": ANALYSIS["extractedClauses"][:1]}
+
+
+def test_malformed_value_becomes_none():
+    parser = AnalysisStreamParser()
+    events = parser.feed('{"overallRiskScore": 7x, "summary": "ok"}')
+    assert events == [("field", ("overallRiskScore", None)), ("field", ("summary", "ok"))]
@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app import uploads
+from app.uploads import UploadPolicy, ingest_request
+
+BOUNDARY = "leaseguardtestboundary"
+PDF = b"%PDF-1.7\n" + b"0123456789" * 50 + b"\n%%EOF"
+SMALL_PDF = UploadPolicy("pdf", 1024, ("application/pdf", "application/octet-stream"), magic=(b"%PDF-",), suffix=".pdf")
+
+
+def multipart(*parts: tuple[str, bytes, str | None, str | None]) -> bytes:
+    """parts: (field name, data, filename or None for a plain field, content type)."""
+    body = b""
+    for name, data, filename, content_type in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+        body += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n".encode()
+        if content_type:
+            body += f"Content-Type: {content_type}\r\n".encode()
+        body += b"\r\n" + data + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+def make_request(body: bytes, chunk: int = 7, content_type: str = None, length: int = None) -> Request:
+    headers = [(b"content-type", (content_type or f"multipart/form-data; boundary={BOUNDARY}").encode())]
+    headers.append((b"content-length", str(len(body) if length is None else length).encode()))
+    pieces = [body[i:i + chunk] for i in range(0, len(body), chunk)] or [b""]
+
+    async def receive():
+        data = pieces.pop(0) if pieces else b""
+        return {"type": "http.request", "body": data, "more_body": bool(pieces)}
+
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers}, receive)
+
+
+def ingest(body: bytes, policy: UploadPolicy = SMALL_PDF, **kwargs):
+    return asyncio.run(ingest_request(make_request(body, **kwargs), policy))
+
+
+def status_of(body: bytes, policy: UploadPolicy = SMALL_PDF, **kwargs) -> int:
+    with pytest.raises(HTTPException) as error:
+        ingest(body, policy, **kwargs)
+    return error.value.status_code
+
+
+def test_file_and_fields_are_parsed():
+    upload = ingest(multipart(("state", b"CA", None, None), ("file", PDF, "lease.pdf", "application/pdf")))
+    try:
+        assert upload.fields == {"state": "CA"}
+        assert upload.filename == "lease.pdf"
+        assert upload.size == len(PDF)
+        assert upload.sha256 == hashlib.sha256(PDF).hexdigest()
+        assert bytes(upload.view()) == PDF
+        assert not upload.on_disk
+    finally:
+        upload.close()
+
+
+def test_large_upload_spools_to_disk(monkeypatch):
+    monkeypatch.setattr(uploads.settings, "UPLOAD_SPOOL_BYTES", 64)
+    upload = ingest(multipart(("file", PDF, "lease.pdf", "application/pdf")), chunk=100)
+    try:
+        assert upload.on_disk
+        assert bytes(upload.view()) == PDF
+    finally:
+        upload.close()
+
+
+def test_magic_bytes_split_across_chunks():
+    upload = ingest(multipart(("file", PDF, "lease.pdf", "application/octet-stream")), chunk=1)
+    upload.close()
+    assert status_of(multipart(("file", b"GIF89a" + PDF, "lease.pdf", "application/pdf")), chunk=1) == 415
+
+
+def test_file_shorter_than_the_sniffed_head():
+    upload = ingest(multipart(("file", b"%PDF-", "tiny.pdf", "application/pdf")))
+    upload.close()
+    assert status_of(multipart(("file", b"%PD", "tiny.pdf", "application/pdf"))) == 415
+
+
+def test_wrong_part_content_type():
+    assert status_of(multipart(("file", PDF, "lease.pdf", "image/png"))) == 415
+
+
+def test_oversized_file_while_streaming():
+    body = multipart(("file", PDF * 3, "lease.pdf", "application/pdf"))
+    # Declared length within the form overhead allowance, so the streaming check has to catch it
+    assert status_of(body) == 413
+
+
+def test_declared_length_rejected_before_reading():
+    assert status_of(b"", length=SMALL_PDF.max_bytes + uploads.FORM_OVERHEAD_BYTES + 1) == 413
+
+
+def test_oversized_form_field(monkeypatch):
+    monkeypatch.setattr(uploads, "FORM_OVERHEAD_BYTES", 16)
+    assert status_of(multipart(("state", b"x" * 64, None, None), ("file", PDF, "lease.pdf", "application/pdf"))) == 413
+
+
+def test_missing_and_unexpected_files():
+    assert status_of(multipart(("state", b"CA", None, None))) == 422
+    assert status_of(multipart(("other", PDF, "lease.pdf", "application/pdf"))) == 400
+    two = multipart(("file", PDF, "a.pdf", "application/pdf"), ("file", PDF, "b.pdf", "application/pdf"))
+    assert status_of(two) == 400
+
+
+def test_not_multipart():
+    assert status_of(PDF, content_type="application/pdf") == 415
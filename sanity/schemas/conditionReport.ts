@@ -37,6 +37,8 @@ export default {
                             options: { list: ['minor', 'moderate', 'major'] }
                         },
                         { name: 'screenshotUrl', title: 'Screenshot URL', type: 'url' },
+                        { name: 'screenshot', title: 'Screenshot', type: 'image' },
+                        { name: 'thumbnail', title: 'Thumbnail (used in PDF reports)', type: 'image' },
                         { name: 'timestamp', title: 'Video Timestamp (s)', type: 'number' },
                         { name: 'confidence', title: 'AI Confidence', type: 'number' }
                     ]
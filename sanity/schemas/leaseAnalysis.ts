@@ -22,12 +22,17 @@ export default {
                         { name: 'originalText', title: 'Original Text', type: 'text' },
                         { name: 'riskLevel', title: 'Risk Level', type: 'string', options: { list: ['green', 'yellow', 'red'] } },
                         { name: 'explanation', title: 'Explanation', type: 'text' },
-                        { name: 'citation', title: 'Legal Citation', type: 'string' }
+                        { name: 'citation', title: 'Legal Citation', type: 'string' },
+                        { name: 'sectionHash', title: 'Section Hash', type: 'string', readOnly: true },
+                        { name: 'sourceStart', title: 'Source Start Offset', type: 'number', readOnly: true },
+                        { name: 'sourceEnd', title: 'Source End Offset', type: 'number', readOnly: true }
                     ]
                 }
             ]
         },
         { name: 'overallRiskScore', title: 'Risk Score', type: 'number' },
+        { name: 'sections', title: 'Section Hashes', type: 'array', of: [{ type: 'string' }], readOnly: true },
+        { name: 'revisionOf', title: 'Revision Of (Analysis ID)', type: 'string', readOnly: true },
         {
             name: 'generatedDocuments',
             title: 'Generated Documents',